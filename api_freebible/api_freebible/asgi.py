@@ -8,9 +8,26 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
 
 import os
+import threading
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_freebible.settings')
 
 application = get_asgi_application()
+
+# Corpus em memória carregado na inicialização do worker, como em wsgi.py
+if settings.CORPUS_ATIVO:
+    # Importação após o setup do Django (get_asgi_application), pois depende dos modelos
+    from bible.corpus import carregar, liberar_conexoes
+
+    def carga():
+        carregar()
+        liberar_conexoes()  # Conexões desta thread e os pools da carga (do processo, como em wsgi.py)
+
+    # O servidor ASGI pode importar este módulo com o laço de eventos já em execução, onde o ORM
+    # síncrono é recusado: a carga roda em uma thread, e a inicialização aguarda o término
+    thread = threading.Thread(target=carga, name='corpus')
+    thread.start()
+    thread.join()
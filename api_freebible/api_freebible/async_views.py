@@ -0,0 +1,176 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api_freebible.conditional import NaoModificado, ValidacaoCondicional, aplicar_validadores
+
+
+class RequisicaoInvalida(exceptions.APIException):
+    '''
+    Parâmetros ausentes ou inválidos: 400 com `{"detail": ...}`, como as respostas de erro das ações dos viewsets
+    '''
+
+    status_code = 400
+    default_detail = 'Requisição inválida.'
+    default_code = 'invalid'
+
+
+class LeituraAssincronaView(ValidacaoCondicional, View):
+    '''
+    Base das leituras assíncronas, servidas por um servidor ASGI (ver api_freebible/asgi.py).
+
+    O `get` de cada view é uma corrotina que lê com o ORM assíncrono e retorna os dados da resposta;
+    a base reproduz o restante das ações dos viewsets: autenticação e permissões do REST_FRAMEWORK,
+    negociação do formato, GET condicional, paginação por cursor e erros no formato do DRF.
+
+    Enquanto uma consulta aguarda o Postgres, o laço de eventos segue atendendo outras requisições:
+    o número de requisições em curso deixa de ser limitado pelas threads do servidor. Os
+    autenticadores do DRF (Basic, Session) usam o ORM síncrono e rodam em uma thread.
+    '''
+
+    http_method_names = ['get', 'head']
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
+    throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
+    content_negotiation_class = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+
+    # A API navegável monta formulários a partir de um viewset: fica fora das leituras assíncronas
+    renderer_classes = [renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer.format != 'api']
+
+    # Ordenação indexada e única usada pela paginação por cursor (keyset)
+    ordering = ('id',)
+
+    # Ação equivalente do viewset, que define a classe de custo nos limites de requisições
+    action = None
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.request = Request(request, authenticators=[classe() for classe in self.authentication_classes])
+        self.validadores = None
+
+        try:
+            self.negociar()
+            await sync_to_async(self.inicial)()
+
+            if request.method.lower() not in self.http_method_names:
+                raise exceptions.MethodNotAllowed(request.method)
+
+            response = self.renderizar(await self.get(self.request, *args, **kwargs))
+        except NaoModificado as exc:
+            return exc.resposta
+        except Exception as exc:
+            return self.tratar_excecao(exc)
+
+        if self.validadores:
+            aplicar_validadores(response, *self.validadores)
+
+        return response
+
+    def negociar(self):
+        '''
+        Renderer pelo `Accept` ou pelo `?format=`; sem um formato aceito, o erro 406 sai no primeiro renderer
+        '''
+
+        renderers = [classe() for classe in self.renderer_classes]
+        self.request.accepted_renderer, self.request.accepted_media_type = renderers[0], renderers[0].media_type
+
+        self.request.accepted_renderer, self.request.accepted_media_type = \
+            self.content_negotiation_class().select_renderer(self.request, renderers)
+
+    def inicial(self):
+        '''
+        Etapas anteriores à view, na ordem de APIView.initial; rodam em uma thread (ORM síncrono e cache)
+        '''
+
+        self.verificar_permissoes()
+        self.verificar_limites()
+
+    def verificar_permissoes(self):
+        '''
+        Autenticação (executada aqui, ainda na thread) e permissões, como em APIView.check_permissions
+        '''
+
+        self.request.user
+
+        for classe in self.permission_classes:
+            permissao = classe()
+            if not permissao.has_permission(self.request, self):
+                if self.request.authenticators and not self.request.successful_authenticator:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permissao, 'message', None))
+
+    def verificar_limites(self):
+        '''
+        Limites de requisições, como em APIView.check_throttles: 429 com a maior espera entre os excedidos
+        '''
+
+        esperas = []
+        for classe in self.throttle_classes:
+            throttle = classe()
+            if not throttle.allow_request(self.request, self):
+                esperas.append(throttle.wait())
+
+        if esperas:
+            esperas = [espera for espera in esperas if espera is not None]
+            raise exceptions.Throttled(max(esperas, default=None))
+
+    async def paginar(self, queryset):
+        '''
+        Página atual, a partir do cursor informado, já conferida pelos validadores do GET condicional
+        '''
+
+        self.paginator = self.pagination_class()
+        pagina = await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+        self.validar_registros(pagina, datado=False)
+
+        return pagina
+
+    def renderizar(self, dados, status=200, headers=None):
+        renderer = self.request.accepted_renderer
+        conteudo = renderer.render(dados, self.request.accepted_media_type, {'request': self.request, 'view': self})
+
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+
+        response = HttpResponse(conteudo, status=status, content_type=content_type, headers=headers)
+        if len(self.renderer_classes) > 1:
+            patch_vary_headers(response, ('Accept',))
+
+        return response
+
+    def tratar_excecao(self, exc):
+        '''
+        Erros no mesmo formato das ações dos viewsets (rest_framework.views.exception_handler)
+        '''
+
+        if isinstance(exc, Http404):
+            exc = exceptions.NotFound()
+        elif isinstance(exc, PermissionDenied):
+            exc = exceptions.PermissionDenied()
+
+        if not isinstance(exc, exceptions.APIException):
+            raise exc
+
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # Sem um autenticador que peça credenciais (WWW-Authenticate), o DRF responde 403
+            cabecalho = (self.request.authenticators[0].authenticate_header(self.request)
+                         if self.request.authenticators else None)
+            if cabecalho:
+                headers['WWW-Authenticate'] = cabecalho
+            else:
+                exc.status_code = 403
+        if getattr(exc, 'wait', None):
+            headers['Retry-After'] = '%d' % exc.wait
+
+        dados = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+
+        return self.renderizar(dados, exc.status_code, headers)
@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Está no requirements.txt; em uma instalação parcial, apenas gzip
+    brotli = None
+
+# Tipos de conteúdo comprimidos. HTML (API navegável) fica de fora: o corpo traz o token CSRF,
+# e a compressão de segredos junto de conteúdo refletido abre espaço para o ataque BREACH
+TIPOS_COMPRIMIVEIS = (
+    'application/json',
+    'application/x-ndjson',
+    'application/msgpack',
+    'application/cbor',
+    'text/plain',
+    'text/csv',
+)
+
+
+def codificacoes_suportadas():
+    # Ordem de preferência em caso de empate nos pesos do Accept-Encoding
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def codificacao_aceita(request, disponiveis=None):
+    '''
+    Melhor codificação entre as `disponiveis` segundo o Accept-Encoding (pesos `q` e `*`), ou None
+    '''
+
+    disponiveis = disponiveis or codificacoes_suportadas()
+
+    pesos = {}
+    for parte in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        nome, _, parametros = parte.strip().partition(';')
+        peso = 1.0
+        if parametros.strip().startswith('q='):
+            try:
+                peso = float(parametros.strip()[2:])
+            except ValueError:
+                peso = 0.0
+        if nome:
+            pesos[nome.strip().lower()] = peso
+
+    candidatas = [(pesos.get(nome, pesos.get('*', 0.0)), -indice, nome) for indice, nome in enumerate(disponiveis)]
+    peso, _, nome = max(candidatas)
+
+    return nome if peso > 0 else None
+
+
+def comprimir(conteudo, codificacao):
+    if codificacao == 'br':
+        return brotli.compress(conteudo, quality=settings.COMPRESSAO_NIVEL_BROTLI)
+    return gzip.compress(conteudo, compresslevel=settings.COMPRESSAO_NIVEL_GZIP, mtime=0)
+
+
+def compressor_fluxo(codificacao):
+    '''
+    Funções (comprimir uma parte, finalizar) de um compressor em fluxo, com flush por parte
+    '''
+
+    if codificacao == 'br':
+        compressor = brotli.Compressor(quality=settings.COMPRESSAO_NIVEL_BROTLI)
+        return (lambda parte: compressor.process(parte) + compressor.flush()), compressor.finish
+
+    compressor = zlib.compressobj(settings.COMPRESSAO_NIVEL_GZIP, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (lambda parte: compressor.compress(parte) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+
+def comprimir_fluxo(partes, codificacao):
+    '''
+    Compressão em fluxo: cada parte recebida sai comprimida logo em seguida (flush por parte),
+    sem juntar a resposta inteira em memória
+    '''
+
+    comprimir_parte, finalizar = compressor_fluxo(codificacao)
+    for parte in partes:
+        saida = comprimir_parte(parte)
+        if saida:
+            yield saida
+    yield finalizar()
+
+
+async def acomprimir_fluxo(partes, codificacao):
+    '''
+    `comprimir_fluxo` para as respostas em fluxo assíncronas (ASGI)
+    '''
+
+    comprimir_parte, finalizar = compressor_fluxo(codificacao)
+    async for parte in partes:
+        saida = comprimir_parte(parte)
+        if saida:
+            yield saida
+    yield finalizar()
+
+
+class CompressaoMiddleware(MiddlewareMixin):
+    '''
+    Compressão gzip/brotli negociada pelo Accept-Encoding, para respostas acima de COMPRESSAO_MINIMO
+    bytes e respostas em fluxo.
+
+    Respostas com ETag forte (as leituras da Bíblia, ver RespostaCondicionalMixin) têm o corpo
+    comprimido guardado no cache pela ETag e pela codificação: a ETag identifica a representação
+    (URL, formato e estado dos registros), então a entrada nunca fica desatualizada e um capítulo
+    muito lido é comprimido uma única vez. Respostas que já chegam com Content-Encoding (variantes
+    pré-comprimidas dos snapshots) passam direto.
+    '''
+
+    def process_response(self, request, response):
+        if response.status_code != 200 or response.has_header('Content-Encoding'):
+            return response
+
+        tipo = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if tipo not in TIPOS_COMPRIMIVEIS:
+            return response
+
+        if not response.streaming and len(response.content) < settings.COMPRESSAO_MINIMO:
+            return response
+
+        # A partir daqui a representação depende do Accept-Encoding, mesmo que este cliente receba sem compressão
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        codificacao = codificacao_aceita(request)
+        if codificacao is None:
+            return response
+
+        if response.streaming:
+            comprimir = acomprimir_fluxo if response.is_async else comprimir_fluxo
+            response.streaming_content = comprimir(response.streaming_content, codificacao)
+            del response['Content-Length']
+        else:
+            corpo = self.comprimido(request, response, codificacao)
+            if len(corpo) >= len(response.content):
+                return response
+
+            response.content = corpo
+            response['Content-Length'] = str(len(corpo))
+
+        # O corpo comprimido não é idêntico byte a byte ao original: a ETag passa a ser fraca
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        response['Content-Encoding'] = codificacao
+        return response
+
+    def comprimido(self, request, response, codificacao):
+        '''
+        Corpo comprimido, do cache quando a resposta tem ETag forte
+        '''
+
+        etag = response.get('ETag')
+        if not etag or etag.startswith('W/') or len(response.content) > settings.COMPRESSAO_CACHE_MAXIMO:
+            return comprimir(response.content, codificacao)
+
+        chave = 'compressao:' + hashlib.md5(f'{request.get_full_path()}|{etag}|{codificacao}'.encode()).hexdigest()
+
+        corpo = cache.get(chave)
+        if corpo is None:
+            corpo = comprimir(response.content, codificacao)
+            cache.set(chave, corpo, timeout=settings.CACHE_RESPOSTAS_TIMEOUT)
+
+        return corpo
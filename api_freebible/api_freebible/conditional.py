@@ -0,0 +1,153 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class NaoModificado(Exception):
+    '''
+    Interrompe a ação antes da serialização quando os validadores da requisição ainda valem
+    '''
+
+    def __init__(self, resposta):
+        self.resposta = resposta
+
+
+def gerar_etag(request, *partes):
+    '''
+    ETag forte da representação: URL completa, formato de saída e o estado dos registros
+    '''
+
+    formato = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+    conteudo = '|'.join(str(parte) for parte in (request.get_full_path(), formato) + partes)
+
+    return '"%s"' % hashlib.md5(conteudo.encode()).hexdigest()
+
+
+def aplicar_validadores(response, etag, ultima):
+    response['ETag'] = etag
+    if ultima is not None:
+        response['Last-Modified'] = http_date(ultima.timestamp())
+    return response
+
+
+def resposta_nao_modificada(request, etag, ultima):
+    '''
+    Resposta 304 se `If-None-Match`/`If-Modified-Since` ainda valem, senão None
+    '''
+
+    resposta = get_conditional_response(
+        request, etag=etag, last_modified=int(ultima.timestamp()) if ultima is not None else None)
+
+    if resposta is not None:
+        return aplicar_validadores(resposta, etag, ultima)
+
+
+def somar_agregados(agregados):
+    '''
+    Combina os `aggregate(ultima=Max, total=Count)` de vários escopos: (maior data, soma das quantidades)
+    '''
+
+    ultima, total = None, 0
+    for agregado in agregados:
+        total += agregado['total']
+        if agregado['ultima'] is not None and (ultima is None or agregado['ultima'] > ultima):
+            ultima = agregado['ultima']
+
+    return ultima, total
+
+
+class ValidacaoCondicional:
+    '''
+    Validadores do GET condicional (ETag e Last-Modified) das leituras, sobre `self.request`.
+
+    Os validadores vêm de `updated_at` e da quantidade de registros do escopo da resposta: dos
+    registros já carregados (página, objeto) ou de um `aggregate(Max, Count)` sobre o escopo. São
+    conferidos antes da serialização; se a requisição ainda tiver a versão atual, a leitura termina
+    com 304 (`NaoModificado`) e a serialização não acontece.
+
+    Em páginas e listas filtradas, o maior `updated_at` pode diminuir (um registro sai da lista e
+    outro mais antigo entra), e um `If-Modified-Since` responderia 304 com a lista alterada: nelas
+    (`datado=False`) não há Last-Modified, e a data entra apenas na ETag, que também leva os ids.
+    '''
+
+    def validar_registros(self, registros, datado=True):
+        '''
+        Validadores a partir de registros carregados (instâncias ou linhas de `values()` com `id` e
+        `updated_at`): os ids entram na ETag, pois a troca de um registro por outro mais antigo não
+        muda o máximo nem a quantidade
+        '''
+
+        if registros and isinstance(registros[0], dict):
+            ultima = max((registro['updated_at'] for registro in registros), default=None)
+            ids = [registro['id'] for registro in registros]
+        else:
+            ultima = max((registro.updated_at for registro in registros), default=None)
+            ids = [registro.pk for registro in registros]
+
+        self.validar(ultima, len(registros), ids, datado=datado)
+
+    def validar_escopo(self, *querysets):
+        '''
+        Validadores a partir de `max(updated_at)` e `count(*)` dos escopos (uma consulta por queryset).
+
+        Use querysets de `all_objects`: registros excluídos logicamente mantêm a data da exclusão.
+        '''
+
+        self.validar(*somar_agregados(
+            queryset.aggregate(ultima=Max('updated_at'), total=Count('pk')) for queryset in querysets))
+
+    async def avalidar_escopo(self, *querysets):
+        '''
+        `validar_escopo` com o ORM assíncrono
+        '''
+
+        self.validar(*somar_agregados(
+            [await queryset.aaggregate(ultima=Max('updated_at'), total=Count('pk')) for queryset in querysets]))
+
+    def validar(self, ultima, total, *extras, datado=True):
+        # Apenas leituras: nas gravações, `If-None-Match` tem outro significado (pré-condição)
+        if self.request.method not in ('GET', 'HEAD'):
+            return
+
+        etag = gerar_etag(self.request, ultima and ultima.isoformat(), total, *extras)
+        self.validadores = (etag, ultima if datado else None)
+
+        resposta = resposta_nao_modificada(self.request, *self.validadores)
+        if resposta is not None:
+            raise NaoModificado(resposta)
+
+
+class RespostaCondicionalMixin(ValidacaoCondicional):
+    '''
+    GET condicional (ETag e Last-Modified) para as ações de leitura dos viewsets: a página e o
+    objeto de `get_object` são validados automaticamente, e o 304 interrompe a ação
+    '''
+
+    ## Integração com o DRF
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None:
+            self.validar_registros(page, datado=False)
+        return page
+
+    def get_object(self):
+        instance = super().get_object()
+        self.validar_registros([instance])
+        return instance
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NaoModificado):
+            return exc.resposta
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        validadores = getattr(self, 'validadores', None)
+        if validadores and response.status_code == 200 and request.method in ('GET', 'HEAD'):
+            aplicar_validadores(response, *validadores)
+
+        return response
@@ -0,0 +1,158 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Consultas e tempo de banco por requisição.
+#
+# Um execute wrapper em cada conexão (instalado quando ela é aberta) soma as consultas na medição da
+# requisição atual, guardada em uma ContextVar: a medição acompanha a requisição também nas views
+# assíncronas, cujas consultas rodam em outra thread (sync_to_async copia o contexto). O middleware
+# devolve os totais no cabeçalho Server-Timing (visível nas ferramentas do navegador e no teste de
+# carga), registra cada requisição em uma linha JSON e emite um alarme (WARNING) quando a rota passa
+# do orçamento de consultas, com a consulta mais repetida (o sinal de um N+1).
+#
+# Respostas em fluxo (exportação) são medidas até o envio dos cabeçalhos; as leituras do cursor do
+# servidor durante o envio do corpo ficam de fora.
+
+_medicao = ContextVar('medicao', default=None)
+
+
+class Medicao:
+    '''
+    Consultas, tempo de banco (segundos) e contagem por SQL de uma requisição
+    '''
+
+    __slots__ = ('consultas', 'banco', 'sqls')
+
+    def __init__(self):
+        self.consultas = 0
+        self.banco = 0.0
+        self.sqls = Counter()
+
+    def mais_repetida(self):
+        if not self.sqls:
+            return None
+        sql, vezes = self.sqls.most_common(1)[0]
+        return {'sql': sql[:300], 'vezes': vezes}
+
+
+def medir_execucao(execute, sql, params, many, context):
+    '''
+    Execute wrapper: soma a consulta na medição da requisição atual (fora de uma requisição, apenas executa)
+    '''
+
+    medicao = _medicao.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.banco += time.perf_counter() - inicio
+        medicao.consultas += 1
+        medicao.sqls[sql] += 1
+
+
+def instalar(connection, **kwargs):
+    # A mesma conexão (DatabaseWrapper) é reaberta ao longo da vida do worker: instala uma única vez
+    if medir_execucao not in connection.execute_wrappers:
+        connection.execute_wrappers.append(medir_execucao)
+
+
+connection_created.connect(instalar)
+
+
+def orcamento(rota):
+    '''
+    Orçamento de consultas da rota: o próprio em ORCAMENTO_CONSULTAS_ROTAS ou o geral (0: sem orçamento)
+    '''
+
+    return settings.ORCAMENTO_CONSULTAS_ROTAS.get(rota, settings.ORCAMENTO_CONSULTAS)
+
+
+class InstrumentacaoMiddleware:
+    '''
+    Mede as consultas e o tempo de banco de cada requisição (views síncronas e assíncronas) e os
+    publica no cabeçalho Server-Timing e no log `api_freebible.instrumentation`
+    '''
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+        # Conexões abertas antes do middleware (na inicialização do worker) não passaram pelo sinal
+        for connection in connections.all(initialized_only=True):
+            instalar(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        medicao, inicio = Medicao(), time.perf_counter()
+        token = _medicao.set(medicao)
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicao.reset(token)
+
+        return self.publicar(request, response, medicao, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        medicao, inicio = Medicao(), time.perf_counter()
+        token = _medicao.set(medicao)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicao.reset(token)
+
+        return self.publicar(request, response, medicao, time.perf_counter() - inicio)
+
+    def publicar(self, request, response, medicao, total):
+        banco_ms, total_ms = medicao.banco * 1000, total * 1000
+
+        if settings.INSTRUMENTACAO_SERVER_TIMING:
+            metricas = (f'db;dur={banco_ms:.1f};desc="consultas: {medicao.consultas}", '
+                        f'app;dur={max(0.0, total_ms - banco_ms):.1f}, total;dur={total_ms:.1f}')
+            anterior = response.get('Server-Timing')
+            response['Server-Timing'] = f'{anterior}, {metricas}' if anterior else metricas
+
+        # Nome da rota (ex.: versiculo-search), o mesmo dos orçamentos; o caminho quando não houve resolução
+        correspondencia = getattr(request, 'resolver_match', None)
+        rota = correspondencia.view_name if correspondencia else request.path
+
+        limite = orcamento(rota)
+        excedido = bool(limite) and medicao.consultas > limite
+        nivel = logging.WARNING if excedido else logging.INFO
+        if not logger.isEnabledFor(nivel):
+            return response
+
+        dados = {
+            'evento': 'orcamento_excedido' if excedido else 'requisicao',
+            'metodo': request.method,
+            'rota': rota,
+            'caminho': request.path,
+            'status': response.status_code,
+            'consultas': medicao.consultas,
+            'banco_ms': round(banco_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }
+        if excedido:
+            dados.update(orcamento=limite, mais_repetida=medicao.mais_repetida())
+
+        logger.log(nivel, json.dumps(dados, ensure_ascii=False), extra={'instrumentacao': dados})
+
+        return response
@@ -0,0 +1,281 @@
+import asyncio
+import base64
+import io
+import ssl
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Gerador de carga HTTP/1.1 sobre asyncio, sem dependências: cada conexão simulada é uma corrotina
+# que repete a requisição (keep-alive, reconectando quando o servidor fecha) até o fim da medição.
+# Um único processo sustenta milhares de conexões abertas; acima de algumas dezenas de milhares de
+# requisições por segundo o próprio gerador vira o gargalo (acompanhe o uso de CPU).
+#
+# Para comparar configurações da própria aplicação sem o custo do HTTP, `medir_wsgi` envia as
+# requisições direto ao WSGIHandler do Django, em threads.
+
+
+def basic(usuario):
+    '''
+    Valor do cabeçalho Authorization para credenciais no formato email:senha
+    '''
+
+    return 'Basic ' + base64.b64encode(usuario.encode()).decode()
+
+
+class Alvo:
+    '''
+    Requisição repetida pelas conexões: URL, cabeçalhos extras, credenciais Basic opcionais e, nas
+    gravações, o método e o corpo (JSON)
+    '''
+
+    def __init__(self, url, cabecalhos=None, usuario=None, metodo='GET', corpo=None):
+        partes = urlsplit(url)
+        if partes.scheme not in ('http', 'https') or not partes.hostname:
+            raise ValueError(f'URL inválida: {url}')
+
+        self.url = url
+        self.host = partes.hostname
+        self.ssl = partes.scheme == 'https'
+        self.porta = partes.port or (443 if self.ssl else 80)
+
+        caminho = (partes.path or '/') + (f'?{partes.query}' if partes.query else '')
+        cabecalhos = dict(cabecalhos or {})
+        if usuario:
+            cabecalhos['Authorization'] = basic(usuario)
+
+        if corpo is not None:
+            cabecalhos.setdefault('Content-Type', 'application/json')
+            cabecalhos['Content-Length'] = str(len(corpo))
+
+        linhas = [f'{metodo} {caminho} HTTP/1.1', f'Host: {partes.netloc}', 'Connection: keep-alive']
+        linhas += [f'{nome}: {valor}' for nome, valor in cabecalhos.items()]
+        self.requisicao = ('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + (corpo or b'')
+
+    async def conectar(self):
+        return await asyncio.open_connection(self.host, self.porta, ssl=ssl.create_default_context() if self.ssl else None)
+
+
+class Resultado:
+    '''
+    Latências (segundos) das respostas recebidas, contagem por status e erros de conexão
+    '''
+
+    def __init__(self):
+        self.latencias = []
+        self.status = {}
+        self.erros = {}
+        self.duracao = 0.0
+
+    def registrar(self, status, latencia):
+        self.latencias.append(latencia)
+        self.status[status] = self.status.get(status, 0) + 1
+
+    def erro(self, excecao):
+        nome = type(excecao).__name__
+        self.erros[nome] = self.erros.get(nome, 0) + 1
+
+    @property
+    def total(self):
+        return len(self.latencias)
+
+    @property
+    def vazao(self):
+        return self.total / self.duracao if self.duracao else 0.0
+
+    @property
+    def falhas(self):
+        '''
+        Erros de conexão mais respostas fora da faixa 2xx/304
+        '''
+
+        return sum(self.erros.values()) + sum(
+            quantidade for status, quantidade in self.status.items() if not (200 <= status < 300 or status == 304))
+
+    @property
+    def concorrencia(self):
+        '''
+        Requisições em curso em média (lei de Little: vazão x latência média)
+        '''
+
+        return self.vazao * (sum(self.latencias) / self.total) if self.total else 0.0
+
+    def percentil(self, p):
+        '''
+        Percentil `p` (0-100) das latências, pelo método do posto mais próximo
+        '''
+
+        if not self.latencias:
+            return None
+
+        ordenadas = sorted(self.latencias)
+        return ordenadas[min(len(ordenadas) - 1, max(0, int(round(p / 100 * len(ordenadas))) - 1))]
+
+
+async def ler_resposta(reader):
+    '''
+    Lê uma resposta HTTP/1.1 completa: (status, se o servidor vai fechar a conexão)
+    '''
+
+    linha = await reader.readline()
+    if not linha:
+        raise ConnectionResetError('Conexão encerrada pelo servidor.')
+
+    versao, status = linha.split(None, 2)[:2]
+
+    cabecalhos = {}
+    while True:
+        linha = await reader.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    if cabecalhos.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            tamanho = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(tamanho + 2)  # Bloco e o CRLF final
+            if tamanho == 0:
+                break
+    elif 'content-length' in cabecalhos:
+        await reader.readexactly(int(cabecalhos['content-length']))
+    elif int(status) not in (204, 304):
+        # Sem tamanho nem blocos, o corpo termina com o fechamento da conexão
+        await reader.read()
+        return int(status), True
+
+    fechar = cabecalhos.get('connection', '').lower() == 'close' or versao == b'HTTP/1.0'
+    return int(status), fechar
+
+
+async def conexao(alvo, fim, resultado, tempo_limite):
+    '''
+    Uma conexão simulada: envia a próxima requisição assim que a resposta anterior termina
+    '''
+
+    reader = writer = None
+
+    while time.monotonic() < fim:
+        inicio = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(alvo.conectar(), tempo_limite)
+            writer.write(alvo.requisicao)
+            status, fechar = await asyncio.wait_for(ler_resposta(reader), tempo_limite)
+        except (OSError, EOFError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as excecao:
+            resultado.erro(excecao)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)  # Servidor recusando conexões: sem laço ocupado
+            continue
+
+        resultado.registrar(status, time.perf_counter() - inicio)
+
+        if fechar:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def medir(alvo, conexoes, duracao, tempo_limite=30.0, aquecimento=0.0):
+    '''
+    Mantém `conexoes` conexões simultâneas contra o alvo por `duracao` segundos; o aquecimento
+    (conexões abertas, caches e corpus carregados) roda antes e fica fora do resultado
+    '''
+
+    if aquecimento > 0:
+        await rodada(alvo, conexoes, aquecimento, tempo_limite, Resultado())
+
+    resultado = Resultado()
+    await rodada(alvo, conexoes, duracao, tempo_limite, resultado)
+
+    return resultado
+
+
+async def rodada(alvo, conexoes, duracao, tempo_limite, resultado):
+    inicio = time.monotonic()
+    fim = inicio + duracao
+
+    await asyncio.gather(*(conexao(alvo, fim, resultado, tempo_limite) for _ in range(conexoes)))
+
+    # Inclui a espera pelas últimas respostas em curso no fim da janela
+    resultado.duracao = time.monotonic() - inicio
+
+
+## Medição em processo
+
+def ambiente_wsgi(url, host, cabecalhos=None):
+    '''
+    Ambiente WSGI mínimo de um GET para a URL, com cabeçalhos extras
+    '''
+
+    caminho, _, query = url.partition('?')
+
+    ambiente = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': caminho,
+        'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': host,
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for nome, valor in (cabecalhos or {}).items():
+        ambiente['HTTP_' + nome.upper().replace('-', '_')] = valor
+
+    return ambiente
+
+
+def medir_wsgi(url, cabecalhos, threads, duracao):
+    '''
+    Requisições pelo WSGIHandler (middlewares, autenticação, view e os sinais de início e fim de
+    requisição, que fecham ou devolvem as conexões como em um servidor), em `threads` threads
+    '''
+
+    # Importação tardia: o restante do módulo não depende do Django
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+
+    # Host aceito pelo ALLOWED_HOSTS
+    hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '')]
+    host = hosts[0].lstrip('.') if hosts else 'localhost'
+
+    handler = WSGIHandler()
+    fim = time.monotonic() + duracao
+    contagem = {'requisicoes': 0, 'falhas': 0}
+    trava = threading.Lock()
+
+    def cliente():
+        requisicoes = falhas = 0
+        while time.monotonic() < fim:
+            estado = []
+            resposta = handler(ambiente_wsgi(url, host, cabecalhos), lambda status, cabecalhos: estado.append(status))
+            b''.join(resposta)
+            resposta.close()  # Dispara request_finished, como o servidor WSGI
+
+            requisicoes += 1
+            if not estado[0].startswith('200'):
+                falhas += 1
+
+        with trava:
+            contagem['requisicoes'] += requisicoes
+            contagem['falhas'] += falhas
+
+    inicio = time.monotonic()
+    trabalhadores = [threading.Thread(target=cliente) for _ in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+
+    return {**contagem, 'segundos': time.monotonic() - inicio}
@@ -0,0 +1,185 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    '''
+    Paginação por cursor (keyset) compartilhada por todos os viewsets.
+
+    O cursor guarda os valores da ordenação do último registro da página, e a página seguinte
+    é obtida com `WHERE (ordenação) > (cursor) ORDER BY ordenação LIMIT n`. Assim a página N custa
+    o mesmo que a primeira, sem `OFFSET` nem `COUNT(*)`.
+
+    A ordenação vem do atributo `ordering` do viewset e deve ser única e coberta por um índice,
+    por exemplo `('capitulo_id', 'numero', 'id')` em `Versiculo`. Em querysets de `values()`, os
+    campos da ordenação devem estar entre os campos lidos.
+    '''
+
+    page_size = api_settings.PAGE_SIZE or 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Cursor inválido.'
+
+    # Ordenação usada quando o viewset não define `ordering`
+    ordering = ('id',)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        '''
+        Retorna a página atual como lista, buscando um registro a mais para saber se há próxima página
+        '''
+
+        return self.separar(list(self.consulta_pagina(queryset, request, view)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        '''
+        `paginate_queryset` com o ORM assíncrono (leituras em bible.views.asynchronous)
+        '''
+
+        return self.separar([registro async for registro in self.consulta_pagina(queryset, request, view)])
+
+    def consulta_pagina(self, queryset, request, view=None):
+        '''
+        Queryset da página a partir do cursor, com um registro além do tamanho da página
+        '''
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = tuple(getattr(view, 'ordering', None) or self.ordering)
+
+        queryset = queryset.order_by(*self.ordering)
+
+        posicao = self.decode_cursor(request, queryset.model)
+        if posicao is not None:
+            queryset = queryset.filter(self.filtro_posicao(posicao))
+
+        return queryset[:self.page_size + 1]
+
+    def separar(self, resultados):
+        self.has_next = len(resultados) > self.page_size
+        self.page = resultados[:self.page_size]
+
+        return self.page
+
+    def get_page_size(self, request):
+        '''
+        Tamanho da página, opcionalmente informado pelo cliente e limitado a `max_page_size`
+        '''
+
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return max(1, min(page_size, self.max_page_size))
+
+    def filtro_posicao(self, posicao):
+        '''
+        Equivalente a `(a, b, c) > (x, y, z)`.
+
+        O termo `a >= x` é redundante, mas deixa explícita para o planejador a faixa
+        inicial do índice, evitando que a disjunção vire uma varredura completa.
+        '''
+
+        filtro = Q()
+
+        for indice, campo in enumerate(self.ordering):
+            condicao = Q(**{f'{campo}__gt': posicao[indice]})
+            for anterior, valor in zip(self.ordering[:indice], posicao[:indice]):
+                condicao &= Q(**{anterior: valor})
+            filtro |= condicao
+
+        return Q(**{f'{self.ordering[0]}__gte': posicao[0]}) & filtro
+
+    def decode_cursor(self, request, model=None):
+        '''
+        Decodifica o cursor recebido na query string (base64 de uma lista JSON), com cada valor
+        convertido pelo campo correspondente da ordenação
+        '''
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            posicao = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(posicao, list) or len(posicao) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return [self.valor_cursor(model, campo, valor) for campo, valor in zip(self.ordering, posicao)]
+
+    def valor_cursor(self, model, campo, valor):
+        '''
+        Valor do cursor para o campo da ordenação. Nulos, objetos, listas e valores que o campo não
+        aceita (texto em um campo inteiro, inteiros fora do intervalo do banco) tornam o cursor inválido.
+        '''
+
+        if valor is None or isinstance(valor, (bool, dict, list)):
+            raise NotFound(self.invalid_cursor_message)
+
+        try:
+            valor = model._meta.get_field(campo).to_python(valor) if model is not None else valor
+        except FieldDoesNotExist:
+            pass  # Anotação ou lookup entre modelos: segue o valor recebido
+        except ValidationError:
+            raise NotFound(self.invalid_cursor_message)
+
+        if isinstance(valor, int) and not -2 ** 63 <= valor < 2 ** 63:
+            raise NotFound(self.invalid_cursor_message)
+        if isinstance(valor, str) and '\x00' in valor:
+            raise NotFound(self.invalid_cursor_message)
+
+        return valor
+
+    def encode_cursor(self, obj):
+        '''
+        Gera o cursor a partir dos valores da ordenação do registro informado (instância ou linha de `values()`)
+        '''
+
+        if isinstance(obj, dict):
+            posicao = [obj[campo] for campo in self.ordering]
+        else:
+            posicao = [getattr(obj, campo) for campo in self.ordering]
+        encoded = base64.urlsafe_b64encode(json.dumps(posicao, default=str).encode('ascii'))
+
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+
+        return self.encode_cursor(self.page[-1])
+
+    def dados_paginados(self, data):
+        return OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ])
+
+    def get_paginated_response(self, data):
+        return Response(self.dados_paginados(data))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                },
+                'results': schema,
+            },
+        }
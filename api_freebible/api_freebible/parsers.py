@@ -0,0 +1,28 @@
+from django.conf import settings
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from api_freebible.renderers import JSONRapidoRenderer, orjson
+
+
+class JSONRapidoParser(JSONParser):
+    '''
+    JSONParser com orjson para corpos em UTF-8 (as gravações em lote chegam a milhares de itens).
+
+    Outras codificações, ou a ausência da biblioteca, ficam com o JSONParser do DRF. Assim como no
+    modo estrito do DRF, NaN e Infinity são rejeitados.
+    '''
+
+    renderer_class = JSONRapidoRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+
+        if orjson is None or not self.strict or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,91 @@
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+# Bibliotecas opcionais: sem elas, o JSON volta ao `json` da biblioteca padrão e os formatos
+# binários ficam fora da negociação (ver DEFAULT_RENDERER_CLASSES em settings.py)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+
+def converter(valor):
+    '''
+    Tipos que os codificadores não conhecem (datas, Decimal, UUID, textos traduzíveis...), na mesma
+    representação do JSONEncoder do DRF
+    '''
+
+    return encoders.JSONEncoder().default(valor)
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    '''
+    JSONRenderer com orjson: mesma saída do renderer padrão na forma compacta, em uma fração do tempo.
+
+    Com indentação (`Accept: application/json; indent=4`, API navegável), configurações de JSON fora
+    do padrão do projeto, valores que o orjson não representa (inteiros acima de 64 bits) ou sem a
+    biblioteca instalada, a renderização fica com o JSONRenderer do DRF.
+    '''
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Datas passam pelo conversor para manter o formato do DRF (milissegundos, "Z" em UTC)
+            ret = orjson.dumps(data, default=converter,
+                               option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Mesmo escape de U+2028 e U+2029 do renderer padrão (JSON como subconjunto estrito de JavaScript)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    '''
+    MessagePack (`Accept: application/msgpack` ou `?format=msgpack`): listas de versículos menores
+    e mais rápidas de decodificar que JSON. Exige o pacote `msgpack`.
+    '''
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=converter, use_bin_type=True, datetime=False)
+
+
+class CBORRenderer(BaseRenderer):
+    '''
+    CBOR, RFC 8949 (`Accept: application/cbor` ou `?format=cbor`). Exige o pacote `cbor2`.
+    '''
+
+    media_type = 'application/cbor'
+    format = 'cbor'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        # Datas como texto, no mesmo formato das respostas JSON
+        return cbor2.dumps(data, default=lambda codificador, valor: codificador.encode(converter(valor)))
@@ -0,0 +1,210 @@
+import json
+from urllib.parse import quote, urlencode
+
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from bible.models import Biblia, Versiculo
+from user.models import CustomUser
+
+# Catálogo do teste de carga das rotas da API (benchmark_rotas): um ou mais cenários para cada par
+# (nome da rota, método HTTP) de api_freebible/urls.py, ou uma exclusão com o motivo. Uma rota nova sem
+# cenário nem exclusão interrompe o teste (ver `descobertas`), para que a cobertura acompanhe as URLs.
+#
+# Os caminhos usam registros reais do banco (ver `parametros`); as leituras vêm antes das gravações,
+# que repetem a mesma atualização (idempotente) e invalidam caches e o corpus em memória.
+
+METODOS = ('get', 'post', 'put', 'patch', 'delete')
+
+
+class Cenario:
+    '''
+    Requisição repetida no teste: rota e método cobertos, caminho, corpo (gravações) e conexões
+    simultâneas próprias (respostas grandes, como a exportação)
+    '''
+
+    def __init__(self, nome, rota, metodo, caminho, corpo=None, conexoes=None):
+        self.nome = nome
+        self.rota = rota
+        self.metodo = metodo
+        self.caminho = caminho
+        self.corpo = None if corpo is None else json.dumps(corpo).encode()
+        self.conexoes = conexoes
+
+
+# Rotas sem cenário: cada requisição repetida cria um registro novo ou exclui o mesmo registro (404
+# a partir da segunda), o que não mede a mesma operação ao longo do teste
+NAO_IDEMPOTENTE = 'não idempotente: repetida, cria registros novos ou exclui o mesmo registro'
+
+EXCLUSOES = {
+    **{(f'{modelo}-list', 'post'): NAO_IDEMPOTENTE for modelo in ('customuser', 'biblia', 'livro', 'capitulo', 'versiculo')},
+    **{(f'{modelo}-create-with-code', 'post'): NAO_IDEMPOTENTE for modelo in ('customuser', 'biblia', 'livro', 'capitulo', 'versiculo')},
+    **{(f'{modelo}-delete-by-id', 'delete'): NAO_IDEMPOTENTE for modelo in ('customuser', 'biblia', 'livro', 'capitulo', 'versiculo')},
+    **{(f'{modelo}-detail', 'delete'): NAO_IDEMPOTENTE for modelo in ('customuser', 'biblia', 'livro', 'capitulo', 'versiculo')},
+    **{(f'{modelo}-bulk-delete', 'post'): NAO_IDEMPOTENTE for modelo in ('capitulo', 'versiculo')},
+    ('apitoken-create-token', 'post'): NAO_IDEMPOTENTE,
+    ('apitoken-revoke', 'delete'): NAO_IDEMPOTENTE,
+    ('customuser-detail', 'put'): 'o PUT exige o email, recusado por CustomUserSerializer.validate_email mesmo sendo o do próprio usuário',
+    ('customuser-update-by-id', 'put'): 'o PUT exige a senha: redefiniria a senha do usuário do teste a cada requisição',
+}
+
+
+def parametros(email):
+    '''
+    Registros usados nos caminhos: o primeiro versículo ativo, seus ancestrais, até duas versões para a
+    comparação e o usuário do teste
+    '''
+
+    versiculo = (Versiculo.objects.select_related('capitulo__livro__biblia').filter(
+        capitulo__is_active=True, capitulo__livro__is_active=True, capitulo__livro__biblia__is_active=True).order_by('id').first())
+    usuario = CustomUser.objects.filter(email=email).first()
+    if versiculo is None or usuario is None:
+        return None
+
+    capitulo = versiculo.capitulo
+    livro = capitulo.livro
+    biblia = livro.biblia
+    versoes = list(Biblia.objects.order_by('id').values_list('versao', flat=True)[:2])
+
+    return {
+        'usuario': usuario, 'biblia': biblia, 'livro': livro, 'capitulo': capitulo, 'versiculo': versiculo,
+        'versoes': ','.join(versoes),
+    }
+
+
+def cenarios(p):
+    '''
+    Cenários na ordem de execução, a partir dos `parametros`
+    '''
+
+    usuario, biblia, livro, capitulo, versiculo = p['usuario'], p['biblia'], p['livro'], p['capitulo'], p['versiculo']
+    versao = quote(biblia.versao, safe='')
+    chave_capitulo = f'{versao}/{livro.livro}/{capitulo.numero}'
+    referencia = f'{livro.livro} {capitulo.numero}:1-{versiculo.numero + 9}'
+    termos = ' '.join([palavra for palavra in (versiculo.versiculo or '').split() if palavra.isalpha() and len(palavra) > 3][:2]) or 'luz'
+
+    leituras = [
+        # Usuários e tokens
+        Cenario('api-root', 'api-root', 'get', '/api/v1/user/'),
+        Cenario('customuser-list', 'customuser-list', 'get', '/api/v1/user/custom_user/'),
+        Cenario('customuser-detail', 'customuser-detail', 'get', f'/api/v1/user/custom_user/{usuario.pk}/'),
+        Cenario('customuser-get-by-id', 'customuser-get-by-id', 'get', f'/api/v1/user/custom_user/get_by_id/{usuario.pk}/'),
+        Cenario('customuser-list-active', 'customuser-list-active', 'get', '/api/v1/user/custom_user/list_active/'),
+        Cenario('customuser-list-inactive', 'customuser-list-inactive', 'get', '/api/v1/user/custom_user/list_inactive/'),
+        Cenario('customuser-search', 'customuser-search', 'get', '/api/v1/user/custom_user/search/?' + urlencode({'email': usuario.email})),
+        Cenario('apitoken-list-active', 'apitoken-list-active', 'get', '/api/v1/user/api_token/list_active/'),
+
+        # Versões
+        Cenario('biblia-list', 'biblia-list', 'get', '/api/v1/bible/bible_version/'),
+        Cenario('biblia-detail', 'biblia-detail', 'get', f'/api/v1/bible/bible_version/{biblia.pk}/'),
+        Cenario('biblia-get-by-id', 'biblia-get-by-id', 'get', f'/api/v1/bible/bible_version/get_by_id/{biblia.pk}/'),
+        Cenario('biblia-get-by-key', 'biblia-get-by-key', 'get', f'/api/v1/bible/bible_version/get_by_key/{versao}/'),
+        Cenario('biblia-list-active', 'biblia-list-active', 'get', '/api/v1/bible/bible_version/list_active/'),
+        Cenario('biblia-list-inactive', 'biblia-list-inactive', 'get', '/api/v1/bible/bible_version/list_inactive/'),
+        Cenario('biblia-search', 'biblia-search', 'get', '/api/v1/bible/bible_version/search/?' + urlencode({'lingua': biblia.lingua})),
+        Cenario('biblia-export', 'biblia-export', 'get', f'/api/v1/bible/bible_version/export/{versao}/', conexoes=2),
+
+        # Livros
+        Cenario('livro-list', 'livro-list', 'get', '/api/v1/bible/book/'),
+        Cenario('livro-detail', 'livro-detail', 'get', f'/api/v1/bible/book/{livro.pk}/'),
+        Cenario('livro-get-by-id', 'livro-get-by-id', 'get', f'/api/v1/bible/book/get_by_id/{livro.pk}/'),
+        Cenario('livro-get-by-key', 'livro-get-by-key', 'get', f'/api/v1/bible/book/get_by_key/{versao}/{livro.livro}/'),
+        Cenario('livro-list-active', 'livro-list-active', 'get', '/api/v1/bible/book/list_active/'),
+        Cenario('livro-list-inactive', 'livro-list-inactive', 'get', '/api/v1/bible/book/list_inactive/'),
+        Cenario('livro-search', 'livro-search', 'get', f'/api/v1/bible/book/search/?biblia={biblia.pk}&testamento={livro.testamento}'),
+
+        # Capítulos
+        Cenario('capitulo-list', 'capitulo-list', 'get', '/api/v1/bible/chapter/'),
+        Cenario('capitulo-detail', 'capitulo-detail', 'get', f'/api/v1/bible/chapter/{capitulo.pk}/'),
+        Cenario('capitulo-get-by-id', 'capitulo-get-by-id', 'get', f'/api/v1/bible/chapter/get_by_id/{capitulo.pk}/'),
+        Cenario('capitulo-get-by-key', 'capitulo-get-by-key', 'get', f'/api/v1/bible/chapter/get_by_key/{chave_capitulo}/'),
+        Cenario('capitulo-read', 'capitulo-read', 'get', f'/api/v1/bible/chapter/read/{chave_capitulo}/'),
+        Cenario('capitulo-list-active', 'capitulo-list-active', 'get', '/api/v1/bible/chapter/list_active/'),
+        Cenario('capitulo-list-inactive', 'capitulo-list-inactive', 'get', '/api/v1/bible/chapter/list_inactive/'),
+        Cenario('capitulo-search', 'capitulo-search', 'get', f'/api/v1/bible/chapter/search/?livro={livro.pk}'),
+
+        # Versículos
+        Cenario('versiculo-list', 'versiculo-list', 'get', '/api/v1/bible/versicle/'),
+        Cenario('versiculo-detail', 'versiculo-detail', 'get', f'/api/v1/bible/versicle/{versiculo.pk}/'),
+        Cenario('versiculo-get-by-id', 'versiculo-get-by-id', 'get', f'/api/v1/bible/versicle/get_by_id/{versiculo.pk}/'),
+        Cenario('versiculo-get-by-key', 'versiculo-get-by-key', 'get',
+                f'/api/v1/bible/versicle/get_by_key/{chave_capitulo}/{versiculo.numero}/'),
+        Cenario('versicle-natural-key', 'versicle-natural-key', 'get', f'/api/v1/bible/{chave_capitulo}/{versiculo.numero}/'),
+        Cenario('versiculo-list-active', 'versiculo-list-active', 'get', '/api/v1/bible/versicle/list_active/'),
+        Cenario('versiculo-list-inactive', 'versiculo-list-inactive', 'get', '/api/v1/bible/versicle/list_inactive/'),
+        Cenario('versiculo-search', 'versiculo-search', 'get', f'/api/v1/bible/versicle/search/?capitulo={capitulo.pk}'),
+        Cenario('versiculo-search q', 'versiculo-search', 'get',
+                '/api/v1/bible/versicle/search/?' + urlencode({'q': termos, 'biblia': biblia.pk})),
+        Cenario('versiculo-range', 'versiculo-range', 'get', '/api/v1/bible/versicle/range/?' + urlencode({'biblia': biblia.pk, 'ref': referencia})),
+        Cenario('versiculo-compare', 'versiculo-compare', 'get',
+                '/api/v1/bible/versicle/compare/?' + urlencode({'versoes': p['versoes'], 'ref': referencia})),
+
+        # Leituras assíncronas (servidas pelo worker síncrono também; medem a diferença do servidor ASGI quando ele é o alvo)
+        Cenario('async-versicle-get-by-id', 'async-versicle-get-by-id', 'get', f'/api/v1/bible/async/versicle/get_by_id/{versiculo.pk}/'),
+        Cenario('async-versicle-list-active', 'async-versicle-list-active', 'get', '/api/v1/bible/async/versicle/list_active/'),
+        Cenario('async-versicle-search', 'async-versicle-search', 'get', f'/api/v1/bible/async/versicle/search/?capitulo={capitulo.pk}'),
+        Cenario('async-versicle-range', 'async-versicle-range', 'get',
+                '/api/v1/bible/async/versicle/range/?' + urlencode({'biblia': biblia.pk, 'ref': referencia})),
+        Cenario('async-chapter-get-by-id', 'async-chapter-get-by-id', 'get', f'/api/v1/bible/async/chapter/get_by_id/{capitulo.pk}/'),
+        Cenario('async-chapter-list-active', 'async-chapter-list-active', 'get', '/api/v1/bible/async/chapter/list_active/'),
+        Cenario('async-chapter-search', 'async-chapter-search', 'get', f'/api/v1/bible/async/chapter/search/?livro={livro.pk}'),
+        Cenario('async-chapter-read', 'async-chapter-read', 'get', f'/api/v1/bible/async/chapter/read/{chave_capitulo}/'),
+    ]
+
+    # Gravações: a mesma atualização repetida, com os valores atuais dos registros
+    corpos = {
+        'customuser': (f'/api/v1/user/custom_user/{usuario.pk}', {'nome': usuario.nome}),
+        'biblia': (f'/api/v1/bible/bible_version/{biblia.pk}', {'lingua': biblia.lingua, 'versao': biblia.versao}),
+        'livro': (f'/api/v1/bible/book/{livro.pk}', {'biblia': biblia.pk, 'livro': livro.livro, 'testamento': livro.testamento}),
+        'capitulo': (f'/api/v1/bible/chapter/{capitulo.pk}', {'livro': livro.pk, 'autor': capitulo.autor, 'numero': capitulo.numero}),
+        'versiculo': (f'/api/v1/bible/versicle/{versiculo.pk}',
+                      {'capitulo': capitulo.pk, 'numero': versiculo.numero, 'versiculo': versiculo.versiculo}),
+    }
+
+    gravacoes = []
+    for modelo, (caminho, corpo) in corpos.items():
+        for metodo in ('patch', 'put'):
+            for rota, sufixo in ((f'{modelo}-detail', '/'), (f'{modelo}-update-by-id', '/update_by_id/')):
+                if (rota, metodo) not in EXCLUSOES:
+                    gravacoes.append(Cenario(f'{rota} {metodo}', rota, metodo, caminho + sufixo, corpo))
+
+    gravacoes += [
+        Cenario('capitulo-bulk-upsert', 'capitulo-bulk-upsert', 'post', '/api/v1/bible/chapter/bulk_upsert/',
+                [corpos['capitulo'][1]]),
+        Cenario('versiculo-bulk-upsert', 'versiculo-bulk-upsert', 'post', '/api/v1/bible/versicle/bulk_upsert/',
+                [corpos['versiculo'][1]]),
+    ]
+
+    return leituras + gravacoes
+
+
+def rotas_api():
+    '''
+    Pares (nome da rota, método) das rotas da API em api_freebible/urls.py; as variantes com sufixo de
+    formato (`.json`) têm o mesmo nome e a mesma view
+    '''
+
+    def percorrer(padroes, prefixo):
+        for padrao in padroes:
+            caminho = prefixo + str(padrao.pattern)
+            if isinstance(padrao, URLResolver):
+                yield from percorrer(padrao.url_patterns, caminho)
+            elif isinstance(padrao, URLPattern) and padrao.name and caminho.lstrip('^').startswith('api/'):
+                yield padrao
+
+    rotas = set()
+    for padrao in percorrer(get_resolver().url_patterns, ''):
+        acoes = getattr(padrao.callback, 'actions', None)
+        classe = getattr(padrao.callback, 'view_class', None) or getattr(padrao.callback, 'cls', None)
+        metodos = acoes.keys() if acoes else [metodo for metodo in METODOS if hasattr(classe, metodo)]
+        rotas.update((padrao.name, metodo) for metodo in metodos)
+
+    return rotas
+
+
+def descobertas(lista):
+    '''
+    Rotas da API sem cenário e sem exclusão
+    '''
+
+    cobertas = {(cenario.rota, cenario.metodo) for cenario in lista} | EXCLUSOES.keys()
+    return sorted(rotas_api() - cobertas)
@@ -0,0 +1,194 @@
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from rest_framework import fields, relations, serializers
+from rest_framework.settings import ISO_8601, api_settings
+
+# Campos cuja representação é o próprio valor lido por `values()` (int, str, bool, float): não passam
+# por conversão
+CAMPOS_DIRETOS = (
+    fields.IntegerField,
+    fields.CharField,
+    fields.BooleanField,
+    fields.FloatField,
+    fields.ChoiceField,
+    fields.ReadOnlyField,
+)
+
+
+class ValoresSerializer:
+    """
+    Serialização somente leitura a partir de `values()`, com a mesma saída do `serializer_class`
+    (um ModelSerializer), sem instâncias do modelo nem `to_representation` campo a campo.
+
+    Os campos e seus conversores são compilados uma vez por classe a partir dos próprios campos do
+    serializer de origem; os campos de representação direta são apenas copiados da linha.
+
+        linhas = VersiculoValoresSerializer.valores(Versiculo.objects.all())
+        VersiculoValoresSerializer(linhas, many=True).data
+    """
+
+    serializer_class = None
+
+    def __init__(self, instance=None, many=False, **kwargs):
+        self.instance = instance
+        self.many = many
+
+    @classmethod
+    def compilar(cls):
+        """
+        Pares (campo de saída, campo do `values()`) e conversores [(campo de saída, fábrica)], em cache na classe
+        """
+
+        if '_compilado' not in cls.__dict__:
+            campos, conversores = [], []
+
+            for nome, campo in cls.serializer_class().fields.items():
+                if campo.write_only:
+                    continue
+
+                campos.append((nome, campo.source))
+
+                fabrica = cls.conversor(campo)
+                if fabrica is not None:
+                    conversores.append((nome, fabrica))
+
+            cls._compilado = (campos, conversores)
+
+        return cls._compilado
+
+    @staticmethod
+    def conversor(campo):
+        """
+        Fábrica do conversor do campo (recebe o fuso horário da requisição), ou None se o valor é copiado
+        """
+
+        if isinstance(campo, relations.PrimaryKeyRelatedField):
+            # `values()` já traz o id da chave estrangeira
+            return None if campo.pk_field is None else (lambda fuso: campo.pk_field.to_representation)
+
+        # Subclasses com outra representação caem no conversor genérico
+        if any(type(campo).to_representation is base.to_representation for base in CAMPOS_DIRETOS):
+            return None
+
+        if isinstance(campo, fields.UUIDField) and campo.uuid_format == 'hex_verbose':
+            return lambda fuso: str
+
+        formato = getattr(campo, 'format', api_settings.DATETIME_FORMAT)
+        if (type(campo) is fields.DateTimeField and settings.USE_TZ and not hasattr(campo, 'timezone')
+                and formato is not None and formato.lower() == ISO_8601):
+            # Mesmo resultado de DateTimeField.to_representation para datas com fuso (USE_TZ)
+            def fabrica(fuso):
+                def converter(valor):
+                    valor = valor.astimezone(fuso).isoformat()
+                    return valor[:-6] + 'Z' if valor.endswith('+00:00') else valor
+                return converter
+
+            return fabrica
+
+        return lambda fuso: campo.to_representation
+
+    @classmethod
+    def valores(cls, queryset, *extras):
+        """
+        `values()` com os campos do serializer, o id e o updated_at (validadores do GET condicional)
+        e os `extras`, como os campos da ordenação da paginação
+        """
+
+        campos, _ = cls.compilar()
+        return queryset.values(*dict.fromkeys([fonte for _, fonte in campos] + ['id', 'updated_at', *extras]))
+
+    def representar(self, linhas):
+        campos, fabricas = self.compilar()
+
+        # O fuso da requisição (timezone.activate) é resolvido uma vez, não a cada data
+        fuso = timezone.get_current_timezone()
+        conversores = [(nome, fabrica(fuso)) for nome, fabrica in fabricas]
+
+        resultado = []
+        for linha in linhas:
+            dado = {nome: linha[fonte] for nome, fonte in campos}
+            for nome, converter in conversores:
+                if dado[nome] is not None:
+                    dado[nome] = converter(dado[nome])
+            resultado.append(dado)
+
+        return resultado
+
+    @property
+    def data(self):
+        if self.many:
+            return self.representar(self.instance)
+        return self.representar([self.instance])[0]
+
+
+class ChaveUnicaMixin:
+    """
+    Validação das UniqueConstraint do modelo nos serializers de criação e atualização (o DRF só deriva
+    validadores de `unique_together`), que devolve 400 em vez de um IntegrityError (500).
+
+    As restrições valem também entre os registros excluídos logicamente: criar uma chave que pertence a
+    um registro excluído reativa esse registro com os novos dados (como os upserts da importação);
+    atualizar um registro para a chave de outro, ativo ou excluído, é recusado. Uma gravação concorrente
+    que viole a restrição entre a validação e o INSERT também resulta em 400.
+    """
+
+    def chaves_unicas(self):
+        model = self.Meta.model
+        return [restricao.fields for restricao in model._meta.constraints
+                if isinstance(restricao, models.UniqueConstraint) and restricao.fields and restricao.condition is None]
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        model = self.Meta.model
+        self._reativar = None
+
+        for chave in self.chaves_unicas():
+            valores = {}
+            for campo in chave:
+                if campo in attrs:
+                    valores[campo] = attrs[campo]
+                elif self.instance is not None:
+                    valores[campo] = getattr(self.instance, model._meta.get_field(campo).attname)
+
+            # Chave incompleta ou com nulos (NULL não se repete no banco)
+            if len(valores) < len(chave) or any(valor is None for valor in valores.values()):
+                continue
+
+            existentes = model.all_objects.filter(**valores)
+            if self.instance is not None:
+                existentes = existentes.exclude(pk=self.instance.pk)
+
+            existente = existentes.first()
+            if existente is None:
+                continue
+
+            if self.instance is None and not existente.is_active and self._reativar in (None, existente):
+                self._reativar = existente
+                continue
+
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [self.mensagem_duplicado(chave, existente)]}, code='unique')
+
+        return attrs
+
+    @staticmethod
+    def mensagem_duplicado(chave, existente=None):
+        situacao = ' (excluído logicamente)' if existente is not None and not existente.is_active else ''
+        return f'Já existe um registro{situacao} com os mesmos valores de {", ".join(chave)}.'
+
+    def save(self, **kwargs):
+        # Reativação: a gravação passa a ser a atualização do registro excluído
+        reativar = getattr(self, '_reativar', None)
+        if self.instance is None and reativar is not None:
+            self.instance = reativar
+            kwargs.update(is_active=True, deleted_at=None)
+
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            chaves = ' / '.join(', '.join(chave) for chave in self.chaves_unicas())
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [self.mensagem_duplicado([chaves])]}, code='unique')
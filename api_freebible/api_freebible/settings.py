@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import os
+from importlib.util import find_spec
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +44,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',      # DEFAULT
     'django.contrib.messages',      # DEFAULT
     'django.contrib.staticfiles',   # DEFAULT
+    'django.contrib.postgres',      # BUSCA TEXTUAL
     'drf_yasg',                     # API
     'rest_framework',               # API
     'user',                         # APP
@@ -53,6 +57,8 @@ AUTH_USER_MODEL = 'user.CustomUser'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api_freebible.instrumentation.InstrumentacaoMiddleware',  # Consultas e tempo de banco (Server-Timing, log)
+    'api_freebible.compression.CompressaoMiddleware',  # Antes dos demais: comprime o corpo já finalizado
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,6 +67,11 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Arquivos estáticos (Swagger, admin, API navegável) servidos pelos próprios workers sob o gunicorn,
+# com cache longo e variantes pré-comprimidas geradas no collectstatic
+if find_spec('whitenoise'):
+    MIDDLEWARE.insert(1, 'whitenoise.middleware.WhiteNoiseMiddleware')  # Logo após o SecurityMiddleware
+
 ROOT_URLCONF = 'api_freebible.urls'
 
 TEMPLATES = [
@@ -93,9 +104,154 @@ DATABASES = {
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', 'change-me'),
         'HOST': os.getenv('POSTGRES_HOST', 'change-me'),
         'PORT': os.getenv('POSTGRES_PORT', 'change-me'),
+        'OPTIONS': {},
+        # Conexão reaproveitada (persistente ou do pool) é verificada antes do uso
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Driver psycopg 3 (preferido pelo Django quando instalado): pool de conexões e, opcionalmente, prepared statements
+PSYCOPG3 = DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql' and find_spec('psycopg') is not None
+
+if PSYCOPG3 and bool(int(os.getenv('DB_POOL', 1))) and find_spec('psycopg_pool'):
+    # Pool de conexões por worker (Django 5.1+): cada requisição pega uma conexão aberta e a devolve
+    # ao terminar. O pool substitui a persistência (CONN_MAX_AGE fica em 0) e é o modo indicado sob
+    # ASGI, onde as consultas de cada requisição rodam em threads diferentes
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN', 2)),
+        'max_size': int(os.getenv('DB_POOL_MAX', 10)),  # Acima disso, a requisição espera uma conexão livre
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),  # Espera máxima (segundos) por uma conexão
+    }
+else:
+    # Conexões persistentes: reaproveitadas por até DB_CONN_MAX_AGE segundos (0 fecha ao fim de cada requisição)
+    DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+# Prepared statements, opcionais (desligados por padrão): com DB_PREPARE_THRESHOLD=N, os parâmetros são
+# enviados ao servidor e a consulta executada N vezes na mesma conexão vira prepared statement. O Django
+# documenta consultas que falham com server_side_binding, e os prepared statements não funcionam atrás
+# de um pgbouncer em modo transação: ative somente depois de o teste de carga confirmar o ganho
+DB_PREPARE_THRESHOLD = int(os.getenv('DB_PREPARE_THRESHOLD') or 0)
+
+if PSYCOPG3 and DB_PREPARE_THRESHOLD > 0:
+    DATABASES['default']['OPTIONS']['server_side_binding'] = True
+    DATABASES['default']['OPTIONS']['prepare_threshold'] = DB_PREPARE_THRESHOLD
+
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+# Backend do cache das respostas de leitura (bible/cache.py), também usado pela revogação dos tokens
+# (user/authentication.py) e pela sincronização dos limites de requisições (api_freebible/throttling.py):
+#   locmem: memória do processo (padrão em dev; cada worker tem o seu, use apenas com um processo)
+#   redis:  servidor Redis ou compatível (CACHE_LOCATION, padrão redis://redis:6379/0, o serviço do
+#           docker-compose; padrão em prod): `incr` e `add` atômicos entre os processos
+#   file:   diretório compartilhado entre os processos da mesma máquina (CACHE_LOCATION). `incr` não é
+#           atômico entre processos (lê e regrava o arquivo) e cada gravação lista o diretório para o
+#           descarte: apenas para uma máquina sem Redis, com poucas entradas (CACHE_MAX_ENTRIES)
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+APP_ENV = os.getenv('APP_ENV', 'dev')
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND') or ('redis' if APP_ENV == 'prod' else 'locmem')
+
+# Em prod (gunicorn com vários workers), um cache por processo faria cada invalidação, revogação de
+# token e limite de requisições valer apenas no worker que a recebeu: recusa a inicialização
+if APP_ENV == 'prod' and CACHE_BACKEND == 'locmem' and os.getenv('GUNICORN_WORKERS') != '1':
+    raise ImproperlyConfigured(
+        'CACHE_BACKEND=locmem não é compartilhado entre os workers do gunicorn: use redis (ou file) em '
+        'APP_ENV=prod (ou GUNICORN_WORKERS=1).')
+
+CACHE_LOCATIONS = {
+    'locmem': '',
+    'file': '/tmp/api_freebible_cache',
+    'redis': 'redis://redis:6379/0',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': os.getenv('CACHE_LOCATION') or CACHE_LOCATIONS[CACHE_BACKEND],
+        'KEY_PREFIX': 'freebible',
+        # O descarte do file lista o diretório inteiro a cada gravação: o limite padrão é menor que o do locmem
+        'OPTIONS': {} if CACHE_BACKEND == 'redis' else {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES') or (5000 if CACHE_BACKEND == 'file' else 50000)),
+        },
     }
 }
 
+# Validade máxima (segundos) de uma resposta em cache; a invalidação normal é feita pelas gravações
+CACHE_RESPOSTAS_TIMEOUT = int(os.getenv('CACHE_RESPOSTAS_TIMEOUT', 60 * 60 * 24))
+
+# Compressão das respostas (api_freebible/compression.py): tamanho mínimo do corpo em bytes, níveis
+# do gzip (1-9) e do brotli (0-11) e maior corpo cujo resultado comprimido é guardado no cache
+COMPRESSAO_MINIMO = int(os.getenv('COMPRESSAO_MINIMO', 1024))
+COMPRESSAO_NIVEL_GZIP = int(os.getenv('COMPRESSAO_NIVEL_GZIP', 6))
+COMPRESSAO_NIVEL_BROTLI = int(os.getenv('COMPRESSAO_NIVEL_BROTLI', 5))
+COMPRESSAO_CACHE_MAXIMO = int(os.getenv('COMPRESSAO_CACHE_MAXIMO', 2 * 1024 * 1024))
+
+# Tokens de API (user.authentication): intervalo (segundos) entre as conferências da geração de
+# revogação por processo, validade das verificações (no cache compartilhado e na memória), máximo de verificações
+# guardadas na memória de cada processo e validade padrão (dias) de um token novo (0 sem expiração)
+TOKEN_VERIFICACAO = int(os.getenv('TOKEN_VERIFICACAO', 5))
+TOKEN_CACHE_TIMEOUT = int(os.getenv('TOKEN_CACHE_TIMEOUT', 300))
+TOKEN_CACHE_MAXIMO = int(os.getenv('TOKEN_CACHE_MAXIMO', 10000))
+TOKEN_VALIDADE_DIAS = int(os.getenv('TOKEN_VALIDADE_DIAS', 365))
+
+# Limites de requisições (api_freebible/throttling.py): por usuário e por IP, no formato "120/min"
+# (vazio desativa), com limites próprios para as ações caras. Os baldes ficam na memória do processo e
+# o consumo é sincronizado no cache compartilhado a cada THROTTLE_SINCRONIZACAO segundos por cliente.
+# Cada worker começa com o balde cheio: na primeira rajada, um cliente pode passar até (workers x limite)
+# requisições antes que a sincronização desconte o excesso
+THROTTLE_USUARIO = os.getenv('THROTTLE_USUARIO', '1200/min')
+THROTTLE_USUARIO_CARO = os.getenv('THROTTLE_USUARIO_CARO', '120/min')
+THROTTLE_IP = os.getenv('THROTTLE_IP', '3000/min')
+THROTTLE_IP_CARO = os.getenv('THROTTLE_IP_CARO', '300/min')
+THROTTLE_SINCRONIZACAO = float(os.getenv('THROTTLE_SINCRONIZACAO', 1))
+THROTTLE_CACHE_TIMEOUT = int(os.getenv('THROTTLE_CACHE_TIMEOUT', 60 * 60))  # Contadores sem uso são descartados
+THROTTLE_MAXIMO = int(os.getenv('THROTTLE_MAXIMO', 100000))  # Baldes em memória por processo
+
+# Ações (nome da ação do viewset ou `action` das views assíncronas) da classe de custo cara:
+# consultas que varrem muitos registros ou escrevem em lote
+THROTTLE_ACOES_CARAS = ('search', 'list_active', 'list_inactive', 'export', 'range', 'compare', 'bulk_upsert', 'bulk_delete')
+
+# Instrumentação das requisições (api_freebible/instrumentation.py): cabeçalho Server-Timing com as
+# consultas e o tempo de banco (0 False, 1 True), nível do log por requisição (INFO registra todas em
+# JSON; WARNING apenas os alarmes) e orçamento de consultas por requisição (0 sem orçamento). As buscas
+# e listagens da Bíblia fazem 1 consulta mais a autenticação e têm orçamento próprio, mais justo;
+# ORCAMENTO_CONSULTAS_ROTAS acrescenta ou substitui orçamentos por nome de rota ("versiculo-search=6")
+INSTRUMENTACAO_SERVER_TIMING = bool(int(os.getenv('INSTRUMENTACAO_SERVER_TIMING', 1)))
+INSTRUMENTACAO_LOG_NIVEL = os.getenv('INSTRUMENTACAO_LOG_NIVEL') or 'WARNING'
+ORCAMENTO_CONSULTAS = int(os.getenv('ORCAMENTO_CONSULTAS', 20))
+ORCAMENTO_CONSULTAS_ROTAS = {
+    **{f'{rota}-{acao}': 4 for rota in ('biblia', 'livro', 'capitulo', 'versiculo', 'async-chapter', 'async-versicle')
+       for acao in ('search', 'list-active')},
+    **{rota.strip(): int(limite)
+       for rota, _, limite in (parte.partition('=') for parte in os.getenv('ORCAMENTO_CONSULTAS_ROTAS', '').split(','))
+       if rota.strip()},
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'mensagem': {'format': '%(message)s'},  # A mensagem já é uma linha JSON
+    },
+    'handlers': {
+        'instrumentacao': {'class': 'logging.StreamHandler', 'formatter': 'mensagem'},
+    },
+    'loggers': {
+        'api_freebible.instrumentation': {
+            'handlers': ['instrumentacao'],
+            'level': INSTRUMENTACAO_LOG_NIVEL,
+            'propagate': False,
+        },
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -137,6 +293,21 @@ STATIC_ROOT = BASE_DIR / '/static/'
 # URL para acessar arquivos estáticos
 STATIC_URL = '/static/'
 
+if find_spec('whitenoise'):
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedStaticFilesStorage'},
+    }
+
+# Diretório dos snapshots publicados das versões (publish_bible)
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR') or BASE_DIR / 'snapshots'
+
+# Corpus em memória das versões (bible/corpus.py), carregado na inicialização do worker: 0 False, 1 True
+CORPUS_ATIVO = bool(int(os.getenv('CORPUS_ATIVO', 1)))
+
+# Intervalo (segundos) entre as conferências da revisão dos dados feitas por cada worker
+CORPUS_VERIFICACAO = int(os.getenv('CORPUS_VERIFICACAO', 10))
+
 # Diretórios adicionais de arquivos estáticos (para desenvolvimento)
 STATICFILES_DIRS = [
     BASE_DIR / 'templates',  # Supondo que você tenha uma pasta 'templates' no nível do BASE_DIR
@@ -156,10 +327,47 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        # Token de API primeiro: verificado em memória, sem o hash de senha (PBKDF2) de cada requisição
+        # Basic; também define o desafio WWW-Authenticate das respostas 401
+        'user.authentication.ApiTokenAuthentication',
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Limites por usuário e por IP em baldes locais, com uma classe de custo mais restrita para as
+    # ações caras; acima do limite, 429 com Retry-After
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api_freebible.throttling.UsuarioThrottle',
+        'api_freebible.throttling.IPThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'usuario': THROTTLE_USUARIO or None,
+        'usuario_caro': THROTTLE_USUARIO_CARO or None,
+        'ip': THROTTLE_IP or None,
+        'ip_caro': THROTTLE_IP_CARO or None,
+    },
+    # Proxies reversos à frente da aplicação, para o IP do cliente no X-Forwarded-For (vazio: REMOTE_ADDR)
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES')) if os.getenv('NUM_PROXIES') else None,
+    # Paginação por cursor (keyset) para as ações de listagem e busca
+    'DEFAULT_PAGINATION_CLASS': 'api_freebible.pagination.KeysetPagination',
+    'PAGE_SIZE': 100,
+    # JSON com orjson (ou o `json` padrão, sem a biblioteca) e formatos binários negociados pelo
+    # `Accept` (application/msgpack, application/cbor). As bibliotecas estão no requirements.txt; sem
+    # elas (instalação parcial), o formato correspondente apenas deixa de ser oferecido
+    'DEFAULT_RENDERER_CLASSES': [
+        'api_freebible.renderers.JSONRapidoRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ] + [
+        renderer for renderer, biblioteca in (
+            ('api_freebible.renderers.MessagePackRenderer', 'msgpack'),
+            ('api_freebible.renderers.CBORRenderer', 'cbor2'),
+        ) if find_spec(biblioteca)
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api_freebible.parsers.JSONRapidoParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Limites de requisições por usuário e por IP com baldes de fichas (token bucket) na memória do processo.
+#
+# Cada balde enche `limite / período` fichas por segundo até `limite` (a rajada permitida), e cada
+# requisição consome uma ficha; sem ficha, a resposta é 429 com Retry-After. A decisão é local, sem ida
+# ao cache: o consumo é acumulado e somado a um contador no cache compartilhado a cada
+# THROTTLE_SINCRONIZACAO segundos por balde, e o que os demais workers consumiram desde a última
+# sincronização é descontado do balde local. Cada worker acompanha assim o consumo total do cliente,
+# com o atraso de uma sincronização. Um worker que ainda não tinha visto o cliente começa com o balde
+# cheio: no início, um cliente cujas requisições se espalham pelos workers pode passar até N workers
+# vezes a rajada; o excesso deixa os baldes negativos na sincronização seguinte e é compensado.
+#
+# Os contadores dependem de `incr` e `add` atômicos entre os processos, como no Redis (padrão em prod).
+# No FileBasedCache, `incr` lê e regrava o arquivo sem trava: sincronizações simultâneas de workers
+# diferentes podem perder somas, e o limite passa a contar menos do que o consumo real.
+#
+# As ações caras (buscas, listagens, exportações; THROTTLE_ACOES_CARAS) têm baldes e limites próprios,
+# mais restritos, para que um cliente não sature o banco sem afetar as leituras pontuais.
+
+PERIODOS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+_baldes = OrderedDict()  # {chave: Balde}, do menos ao mais recentemente usado
+_trava = threading.Lock()
+
+
+class Balde:
+    '''
+    Estado local de um balde: fichas disponíveis, consumo ainda não enviado ao cache compartilhado e
+    último total visto lá (para descontar apenas o consumo novo dos demais workers)
+    '''
+
+    __slots__ = ('fichas', 'atualizado', 'pendente', 'visto', 'sincronizado', 'sincronizando')
+
+    def __init__(self, capacidade, agora):
+        self.fichas = float(capacidade)
+        self.atualizado = agora
+        self.pendente = 0
+        self.visto = None
+        self.sincronizado = agora
+        self.sincronizando = False
+
+
+def taxa(texto):
+    '''
+    (fichas por segundo, capacidade) de um limite no formato do DRF: "120/min", "10/s", "1000/day"
+    '''
+
+    quantidade, periodo = texto.split('/')
+    return int(quantidade) / PERIODOS[periodo.strip()[0]], int(quantidade)
+
+
+def custo(view):
+    '''
+    Classe de custo da view: `caro` para as ações de THROTTLE_ACOES_CARAS, `padrao` para as demais
+    '''
+
+    return 'caro' if getattr(view, 'action', None) in settings.THROTTLE_ACOES_CARAS else 'padrao'
+
+
+def chave_cache(chave):
+    return 'throttle:' + chave
+
+
+def consumir(chave, vazao, capacidade):
+    '''
+    Consome uma ficha do balde; retorna 0 se a requisição passa ou os segundos até a próxima ficha
+    '''
+
+    agora = time.monotonic()
+
+    with _trava:
+        balde = _baldes.get(chave)
+        if balde is None:
+            podar()
+            balde = _baldes[chave] = Balde(capacidade, agora)
+        else:
+            _baldes.move_to_end(chave)
+
+        balde.fichas = min(capacidade, balde.fichas + (agora - balde.atualizado) * vazao)
+        balde.atualizado = agora
+
+        if balde.fichas >= 1:
+            balde.fichas -= 1
+            balde.pendente += 1
+            espera = 0
+        else:
+            espera = (1 - balde.fichas) / vazao
+
+        sincronizar_agora = not balde.sincronizando and agora - balde.sincronizado >= settings.THROTTLE_SINCRONIZACAO
+        if sincronizar_agora:
+            balde.sincronizando = True
+            pendente, balde.pendente = balde.pendente, 0
+
+    if sincronizar_agora:
+        sincronizar(chave, balde, pendente, capacidade)
+
+    return espera
+
+
+def sincronizar(chave, balde, pendente, capacidade):
+    '''
+    Soma o consumo local ao contador compartilhado e desconta do balde o consumo dos demais workers
+    '''
+
+    total = None
+    try:
+        total = contabilizar(chave_cache(chave), pendente)
+    finally:
+        with _trava:
+            if total is None or balde.visto is None or total < balde.visto + pendente:
+                outros = 0  # Contador novo, recriado ou indisponível: nada a descontar
+            else:
+                outros = total - balde.visto - pendente
+
+            # O saldo pode ficar negativo (até uma rajada inteira): o excesso consumido entre as
+            # sincronizações, enquanto cada worker decidia sozinho, é pago com a espera seguinte
+            balde.visto = total
+            balde.fichas = max(-capacidade, balde.fichas - outros)
+            balde.sincronizado = time.monotonic()
+            balde.sincronizando = False
+
+
+def contabilizar(chave, quantidade):
+    '''
+    Soma a quantidade ao contador no cache; retorna o total, ou None se o contador acabou de ser criado
+    '''
+
+    try:
+        return cache.incr(chave, quantidade)
+    except ValueError:
+        # Contador ausente (primeiro uso ou descartado pelo backend): `add` não sobrescreve o de outro processo
+        if cache.add(chave, quantidade, timeout=settings.THROTTLE_CACHE_TIMEOUT):
+            return quantidade
+        return cache.incr(chave, quantidade)
+
+
+def podar():
+    '''
+    Libera espaço para um novo balde descartando os menos recentemente usados (LRU), em tempo constante
+    '''
+
+    while len(_baldes) >= settings.THROTTLE_MAXIMO:
+        _baldes.popitem(last=False)
+
+
+class BaldeThrottle(BaseThrottle):
+    '''
+    Base dos limites: o balde de cada cliente e classe de custo tem o limite do escopo em
+    DEFAULT_THROTTLE_RATES (`<escopo>` ou `<escopo>_caro`); sem limite configurado, não há restrição
+    '''
+
+    escopo = None
+
+    def identificar(self, request):
+        raise NotImplementedError('.identificar() must be overridden')
+
+    def allow_request(self, request, view):
+        self.espera = 0
+
+        identidade = self.identificar(request)
+        classe = custo(view)
+        limite = api_settings.DEFAULT_THROTTLE_RATES.get(self.escopo if classe == 'padrao' else f'{self.escopo}_{classe}')
+        if identidade is None or not limite:
+            return True
+
+        self.espera = consumir(f'{self.escopo}:{classe}:{identidade}', *taxa(limite))
+        return self.espera == 0
+
+    def wait(self):
+        return self.espera or None
+
+
+class UsuarioThrottle(BaldeThrottle):
+    '''
+    Limite por usuário autenticado (qualquer forma de autenticação)
+    '''
+
+    escopo = 'usuario'
+
+    def identificar(self, request):
+        return request.user.pk if request.user and request.user.is_authenticated else None
+
+
+class IPThrottle(BaldeThrottle):
+    '''
+    Limite por endereço IP do cliente (X-Forwarded-For conforme NUM_PROXIES, como nos limites do DRF),
+    que cobre também vários usuários atrás do mesmo endereço
+    '''
+
+    escopo = 'ip'
+
+    def identificar(self, request):
+        return self.get_ident(request)
@@ -30,7 +30,8 @@ from drf_yasg.views import get_schema_view  # Usado para gerar a visualização
 
 # Importando o roteador do app 'user' que registra as URLs da API
 from user.urls import router_user  # Inclui as URLs do app 'user' para o roteador que define as rotas da API
-from bible.urls import router_bible_version, router_book, router_chapter, router_versicle
+from bible.urls import router_bible_version, router_book, router_chapter, router_versicle, urls_async
+from bible.views.versicle import VersiculoViewSet
 
 # Configuração do Swagger
 # O Swagger é uma ferramenta para gerar documentação interativa e bem formatada para APIs RESTful.
@@ -57,6 +58,9 @@ urlpatterns = [
     # O roteador 'router_user' é registrado no app 'user' e define as rotas da API para o 'CustomUserViewSet'
     path('api/v1/user/', include(router_user.urls)),
 
+    # Leituras assíncronas da Bíblia (bible.views.asynchronous), para servidores ASGI
+    path('api/v1/bible/async/', include(urls_async)),
+
     # O roteador 'router_bible_version' é registrado no app 'bible' e define as rotas da API para o 'BibliaViewSet'
     path('api/v1/bible/', include(router_bible_version.urls)),
 
@@ -69,6 +73,10 @@ urlpatterns = [
     # O roteador 'router_versicle' é registrado no app 'bible' e define as rotas da API para o 'CapituloViewSet'
     path('api/v1/bible/', include(router_versicle.urls)),
 
+    # Leitura de um versículo pela chave natural (VersiculoViewSet.get_by_key), ex.: /api/v1/bible/Almeida/GN/1/1/
+    re_path(r'^api/v1/bible/(?P<versao>[^/]+)/(?P<livro>[^/.]+)/(?P<capitulo>[0-9]{1,3})/(?P<numero>[0-9]{1,3})/$',
+            VersiculoViewSet.as_view({'get': 'get_by_key'}), name='versicle-natural-key'),
+
     # Rota para gerar a documentação Swagger no formato JSON ou YAML
     re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     
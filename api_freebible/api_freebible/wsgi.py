@@ -7,10 +7,22 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_freebible.settings')
 
 application = get_wsgi_application()
+
+# Corpus em memória carregado na inicialização: com `gunicorn --preload`, antes do fork, e as
+# páginas dos buffers são compartilhadas pelos workers por cópia-na-escrita
+if settings.CORPUS_ATIVO:
+    # Importação após o setup do Django (get_wsgi_application), pois depende dos modelos
+    from bible.corpus import carregar, liberar_conexoes
+
+    carregar()
+    liberar_conexoes()  # Conexões e pools da carga não podem ser herdados pelos processos filhos
+    gc.freeze()  # Objetos da carga fora das coletas, que tocariam (e copiariam) as páginas compartilhadas
@@ -1,6 +1,11 @@
 from django.contrib import admin
 from .models import *
 
+# O __str__ de cada nível inclui o do pai (Versiculo -> Capitulo -> Livro -> Biblia): as listas trazem
+# a hierarquia na mesma consulta (list_select_related), os filtros usam campos com poucas opções e os
+# formulários recebem o id do pai (raw_id_fields), em vez de listar todos os capítulos ou livros (uma
+# consulta por opção para montar o nome)
+
 @admin.register(Biblia)
 class BibliaAdmin(admin.ModelAdmin):
     list_display = ('code', 'versao', 'lingua')
@@ -10,17 +15,22 @@ class BibliaAdmin(admin.ModelAdmin):
 @admin.register(Livro)
 class LivroAdmin(admin.ModelAdmin):
     list_display = ('biblia', 'livro', 'testamento')
+    list_select_related = ('biblia',)
     search_fields = ('biblia__versao', 'livro')
     list_filter = ('testamento',)
 
 @admin.register(Capitulo)
 class CapituloAdmin(admin.ModelAdmin):
     list_display = ('livro', 'numero', 'autor')
+    list_select_related = ('livro__biblia',)
     search_fields = ('livro__livro', 'autor')
-    list_filter = ('livro',)
+    list_filter = ('livro__biblia', 'livro__livro')
+    raw_id_fields = ('livro',)
 
 @admin.register(Versiculo)
 class VersiculoAdmin(admin.ModelAdmin):
     list_display = ('capitulo', 'numero')
+    list_select_related = ('capitulo__livro__biblia',)
     search_fields = ('capitulo__livro__livro',)
-    list_filter = ('capitulo',)
\ No newline at end of file
+    list_filter = ('biblia', 'capitulo__livro__livro')
+    raw_id_fields = ('capitulo',)
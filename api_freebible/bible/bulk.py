@@ -0,0 +1,281 @@
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from bible.cache import invalidar, tag_chave, tags_registros
+from bible.models import Biblia, Capitulo, ConteudoCapitulo, Livro, Versiculo
+
+# Quantidade de linhas por INSERT ... ON CONFLICT
+TAMANHO_LOTE = 2000
+
+# Quantidade máxima de itens aceitos por requisição nas ações em lote
+MAXIMO_ITENS_LOTE = 5000
+
+# Campos de BaseModel atualizados em todo upsert: reativa registros excluídos logicamente
+CAMPOS_REATIVACAO = ['is_active', 'deleted_at', 'updated_at']
+
+
+def testamento(livro):
+    '''
+    Testamento do livro a partir da posição canônica (os 39 primeiros são do Velho Testamento)
+    '''
+
+    return 'V' if Livro.ORDEM[livro] <= 39 else 'N'
+
+
+def upsert_livros(biblia, codigos):
+    '''
+    Cria ou reativa os livros da Bíblia em um único INSERT ... ON CONFLICT (biblia, livro)
+    '''
+
+    livros = [Livro(biblia=biblia, livro=codigo, testamento=testamento(codigo)) for codigo in codigos]
+
+    Livro.all_objects.bulk_create(
+        livros, update_conflicts=True, unique_fields=['biblia', 'livro'],
+        update_fields=['testamento'] + CAMPOS_REATIVACAO)
+
+    invalidar(tags_registros(Livro, [livro.pk for livro in livros]))
+
+    return {livro.livro: livro for livro in livros}
+
+
+def upsert_capitulos(livro, numeros, autor=None):
+    '''
+    Cria ou reativa os capítulos do livro em um único INSERT ... ON CONFLICT (livro, numero)
+    '''
+
+    capitulos = [Capitulo(livro=livro, numero=numero, autor=autor) for numero in numeros]
+
+    Capitulo.all_objects.bulk_create(
+        capitulos, update_conflicts=True, unique_fields=['livro', 'numero'],
+        update_fields=CAMPOS_REATIVACAO)
+
+    invalidar(tags_registros(Capitulo, [capitulo.pk for capitulo in capitulos]))
+
+    return {capitulo.numero: capitulo for capitulo in capitulos}
+
+
+def upsert_versiculos(versiculos, lote=TAMANHO_LOTE):
+    '''
+    Grava os versículos com INSERT ... ON CONFLICT (capitulo, numero), um comando por lote.
+
+    Os objetos devem vir com `biblia_id` e `referencia` preenchidos, pois `bulk_create` não passa
+    por `Versiculo.save()`. O conteúdo pré-calculado dos capítulos afetados e as respostas em cache
+    que dependem dos versículos são descartados.
+    '''
+
+    Versiculo.all_objects.bulk_create(
+        versiculos, batch_size=lote, update_conflicts=True, unique_fields=['capitulo', 'numero'],
+        update_fields=['versiculo', 'biblia', 'referencia'] + CAMPOS_REATIVACAO)
+
+    ConteudoCapitulo.invalidar({versiculo.capitulo_id for versiculo in versiculos})
+    invalidar(tags_registros(Versiculo, [versiculo.pk for versiculo in versiculos]))
+
+    return versiculos
+
+
+def carregar_livro(biblia, codigo, registros, lote=TAMANHO_LOTE):
+    '''
+    Grava um livro completo a partir de registros (livro, capitulo, numero, texto)
+    '''
+
+    livro = upsert_livros(biblia, [codigo])[codigo]
+    capitulos = upsert_capitulos(livro, sorted({capitulo for _, capitulo, _, _ in registros}))
+
+    versiculos = {}
+    for _, capitulo, numero, texto in registros:
+        # Versículos repetidos na entrada: vale o último (um mesmo comando não pode atualizar a linha duas vezes)
+        versiculos[capitulo, numero] = Versiculo(
+            capitulo_id=capitulos[capitulo].pk,
+            biblia_id=biblia.pk,
+            numero=numero,
+            versiculo=texto,
+            referencia=Versiculo.chave(codigo, capitulo, numero),
+        )
+
+    return len(upsert_versiculos(list(versiculos.values()), lote))
+
+
+def carregar_versao(lingua, versao, registros, lote=TAMANHO_LOTE):
+    '''
+    Importa uma versão completa em uma única transação.
+
+    `registros` é um iterável (consumido em fluxo) de tuplas (livro, capitulo, numero, texto),
+    agrupadas por livro; apenas um livro por vez fica em memória. A importação é idempotente:
+    executá-la novamente atualiza os mesmos registros em vez de duplicá-los.
+    '''
+
+    total = 0
+
+    with transaction.atomic():
+        biblia, _ = Biblia.all_objects.update_or_create(
+            versao=versao, defaults={'lingua': lingua, 'is_active': True, 'deleted_at': None})
+
+        for codigo, registros_livro in groupby(registros, key=itemgetter(0)):
+            total += carregar_livro(biblia, codigo, list(registros_livro), lote)
+
+    return biblia, total
+
+
+def copiar_versiculos(biblia, linhas):
+    '''
+    Grava os versículos de uma versão inteira com COPY para uma tabela temporária e um único
+    INSERT ... SELECT ... ON CONFLICT (capitulo, numero), sem um objeto Django por linha: o caminho
+    das cargas em massa (versões sintéticas), cerca de 4 vezes mais rápido que `upsert_versiculos`.
+
+    `linhas` gera tuplas (capitulo_id, numero, texto, referencia) de capítulos da versão. Como toda a
+    versão muda, o cache é invalidado pelas tags da versão; as tags de cada registro só são trocadas
+    nos versículos que já existiam (ids novos não têm respostas em cache). Retorna a quantidade gravada.
+    '''
+
+    tabela = Versiculo._meta.db_table
+    agora = timezone.now()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMPORARY TABLE carga_versiculo '
+            '(capitulo_id bigint, numero integer, versiculo text, referencia integer) ON COMMIT DROP')
+
+        # Cursor do psycopg: o COPY não passa pelo cursor do Django
+        with cursor.cursor.copy('COPY carga_versiculo FROM STDIN') as copia:
+            for linha in linhas:
+                copia.write_row(linha)
+
+        cursor.execute(f'''
+            INSERT INTO {tabela} (created_at, updated_at, deleted_at, is_active, capitulo_id, numero, versiculo, biblia_id, referencia)
+            SELECT %s, %s, NULL, TRUE, capitulo_id, numero, versiculo, %s, referencia FROM carga_versiculo
+            ON CONFLICT (capitulo_id, numero) DO UPDATE SET
+                versiculo = EXCLUDED.versiculo, biblia_id = EXCLUDED.biblia_id, referencia = EXCLUDED.referencia,
+                is_active = TRUE, deleted_at = NULL, updated_at = EXCLUDED.updated_at
+            RETURNING id, xmax <> 0
+        ''', [agora, agora, biblia.pk])
+        gravados = cursor.fetchall()
+
+        ConteudoCapitulo.invalidar(Capitulo.all_objects.filter(livro__biblia=biblia).values('pk'))
+        invalidar({'Versiculo', f'Biblia:{biblia.pk}/*', tag_chave(biblia.versao), tag_chave(biblia.versao) + '/*'}
+                  | {f'Versiculo:{pk}' for pk, atualizado in gravados if atualizado})
+
+    return len(gravados)
+
+
+def validar_lista(itens):
+    '''
+    Confere o corpo de uma ação em lote: uma lista JSON com no máximo `MAXIMO_ITENS_LOTE` itens.
+    Retorna a mensagem de erro, ou None se o corpo for válido.
+    '''
+
+    if not isinstance(itens, list) or not itens:
+        return 'Envie uma lista JSON não vazia de registros.'
+    if len(itens) > MAXIMO_ITENS_LOTE:
+        return f'O lote aceita no máximo {MAXIMO_ITENS_LOTE} registros por requisição.'
+
+
+def validar_itens(serializer_class, itens):
+    '''
+    Valida cada item isoladamente com uma única instância do serializer (os campos são construídos
+    uma vez para o lote), retornando os válidos como (indice, dados) e os erros por item
+    '''
+
+    serializer = serializer_class()
+    validos, erros = [], []
+
+    for indice, item in enumerate(itens):
+        try:
+            validos.append((indice, serializer.run_validation(item)))
+        except ValidationError as erro:
+            erros.append({'indice': indice, 'erros': as_serializer_error(erro)})
+
+    return validos, erros
+
+
+def erro_repetido(indice, campo):
+    return {'indice': indice, 'erros': {campo: ['Registro repetido no lote; vale a última ocorrência.']}}
+
+
+def upsert_lote_versiculos(itens):
+    '''
+    Valida e grava versículos em lote: uma consulta para os capítulos e um INSERT ... ON CONFLICT
+    (capitulo, numero) por lote. Itens inválidos são reportados sem impedir a gravação dos demais.
+    '''
+
+    from bible.serializers.versicle import VersiculoLoteSerializer
+
+    validos, erros = validar_itens(VersiculoLoteSerializer, itens)
+
+    capitulos = Capitulo.objects.select_related('livro').in_bulk({dados['capitulo'] for _, dados in validos})
+
+    versiculos = {}
+    for indice, dados in validos:
+        capitulo = capitulos.get(dados['capitulo'])
+        if capitulo is None:
+            erros.append({'indice': indice, 'erros': {'capitulo': ['Capítulo inexistente.']}})
+            continue
+
+        chave = (capitulo.pk, dados['numero'])
+        if chave in versiculos:
+            erros.append(erro_repetido(versiculos[chave][0], 'numero'))
+
+        versiculos[chave] = (indice, Versiculo(
+            capitulo_id=capitulo.pk,
+            biblia_id=capitulo.livro.biblia_id,
+            numero=dados['numero'],
+            versiculo=dados['versiculo'],
+            referencia=Versiculo.chave(capitulo.livro.livro, capitulo.numero, dados['numero']),
+        ))
+
+    if versiculos:
+        with transaction.atomic():
+            upsert_versiculos([versiculo for _, versiculo in versiculos.values()])
+
+    gravados = [{'indice': indice, 'id': versiculo.pk} for indice, versiculo in versiculos.values()]
+    return sorted(gravados, key=itemgetter('indice')), sorted(erros, key=itemgetter('indice'))
+
+
+def upsert_lote_capitulos(itens):
+    '''
+    Valida e grava capítulos em lote com um único INSERT ... ON CONFLICT (livro, numero)
+    '''
+
+    from bible.serializers.chapter import CapituloLoteSerializer
+
+    validos, erros = validar_itens(CapituloLoteSerializer, itens)
+
+    livros = set(Livro.objects.filter(pk__in={dados['livro'] for _, dados in validos}).values_list('pk', flat=True))
+
+    capitulos = {}
+    for indice, dados in validos:
+        if dados['livro'] not in livros:
+            erros.append({'indice': indice, 'erros': {'livro': ['Livro inexistente.']}})
+            continue
+
+        chave = (dados['livro'], dados['numero'])
+        if chave in capitulos:
+            erros.append(erro_repetido(capitulos[chave][0], 'numero'))
+
+        capitulos[chave] = (indice, Capitulo(livro_id=dados['livro'], numero=dados['numero'], autor=dados['autor']))
+
+    if capitulos:
+        Capitulo.all_objects.bulk_create(
+            [capitulo for _, capitulo in capitulos.values()], batch_size=TAMANHO_LOTE,
+            update_conflicts=True, unique_fields=['livro', 'numero'], update_fields=['autor'] + CAMPOS_REATIVACAO)
+        invalidar(tags_registros(Capitulo, [capitulo.pk for _, capitulo in capitulos.values()]))
+
+    gravados = [{'indice': indice, 'id': capitulo.pk} for indice, capitulo in capitulos.values()]
+    return sorted(gravados, key=itemgetter('indice')), sorted(erros, key=itemgetter('indice'))
+
+
+def excluir_lote(model, ids):
+    '''
+    Exclusão lógica em lote (BaseModelQuerySet.delete); ids inexistentes são reportados como erro
+    '''
+
+    encontrados = set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+    model.objects.filter(pk__in=encontrados).delete()
+
+    erros = [{'id': pk, 'erros': ['Registro inexistente ou já excluído.']} for pk in ids if pk not in encontrados]
+    return sorted(encontrados), erros
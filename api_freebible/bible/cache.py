@@ -0,0 +1,333 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from rest_framework.response import Response
+
+from api_freebible.conditional import NaoModificado, resposta_nao_modificada
+
+from bible.snapshots import despublicar
+
+# Cache das respostas de leitura da Bíblia, com invalidação dirigida pelas gravações.
+#
+# Cada resposta guardada depende de um conjunto de tags, e cada tag tem uma geração (um token
+# aleatório) no próprio cache. A entrada só é válida se todas as gerações guardadas com ela
+# ainda forem as atuais; invalidar é apenas trocar a geração das tags afetadas. Uma geração
+# ausente (nunca criada ou descartada pelo backend) invalida a entrada, então o cache pode
+# descartar chaves à vontade sem servir dados antigos.
+#
+# Tags usadas:
+#     'Versiculo'                tabela (qualquer gravação de versículo)
+#     'Versiculo:12'             o próprio registro
+#     'Capitulo:3/*'             o registro ou qualquer descendente (versículos do capítulo)
+#     'chave:Almeida:GN:1:1'     chave natural, na forma das rotas get_by_key/read
+#     'chave:Almeida:GN:1/*'     a chave natural ou qualquer descendente
+
+# Última revisão dos dados (bible.models.Revisao) publicada pelo processo que gravou: um worker cujo
+# corpus em memória é anterior a ela ainda não viu a gravação e não guarda respostas
+CHAVE_REVISAO = 'bible:revisao'
+
+# Modelos da hierarquia e o campo que forma a chave natural em cada nível
+CAMPOS_CHAVE = {
+    'Biblia': 'versao',
+    'Livro': 'livro',
+    'Capitulo': 'numero',
+    'Versiculo': 'numero',
+}
+
+# Modelo pai de cada nível (o campo da chave estrangeira é o nome do pai em minúsculas)
+PAIS = {
+    'Livro': 'Biblia',
+    'Capitulo': 'Livro',
+    'Versiculo': 'Capitulo',
+}
+
+
+def niveis(nome):
+    '''
+    Níveis da hierarquia a partir do modelo, subindo até a Bíblia: [(modelo, prefixo do lookup)]
+    '''
+
+    resultado, prefixo = [(nome, '')], ''
+    while nome in PAIS:
+        nome = PAIS[nome]
+        prefixo += nome.lower() + '__'
+        resultado.append((nome, prefixo))
+
+    return resultado
+
+
+def tag_chave(*partes):
+    return 'chave:' + ':'.join(str(parte) for parte in partes)
+
+
+def tags_registros(model, pks):
+    '''
+    Tags afetadas por uma gravação nos registros informados, no estado atual do banco.
+
+    Chamado antes e depois da gravação, para cobrir também a posição antiga de um registro
+    que mudou de pai ou de chave natural.
+    '''
+
+    pks = [pk for pk in pks if pk is not None]
+    if not pks:
+        return set()
+
+    hierarquia = niveis(model.__name__)
+    campos = [prefixo + campo for nome, prefixo in hierarquia for campo in ('id', CAMPOS_CHAVE[nome])]
+
+    tags = {model.__name__}
+    for linha in model.all_objects.filter(pk__in=pks).values_list(*campos):
+        ids, chave = linha[0::2], list(reversed(linha[1::2]))
+
+        tags.add(f'{model.__name__}:{ids[0]}')
+        tags.add(tag_chave(*chave))
+
+        # O registro e todos os ancestrais passam a ter conteúdo alterado abaixo deles
+        for (nome, _), pk in zip(hierarquia, ids):
+            tags.add(f'{nome}:{pk}/*')
+        for tamanho in range(1, len(chave) + 1):
+            tags.add(tag_chave(*chave[:tamanho]) + '/*')
+
+    return tags
+
+
+def invalidar(tags):
+    '''
+    Troca a geração das tags após o commit (antes dele, uma leitura concorrente guardaria o dado antigo).
+    Antes da troca, avança a revisão dos dados (publicada também no cache, para os demais workers) e
+    retira as versões alteradas do corpus em memória e dos snapshots publicados, cujas leituras voltam ao banco.
+    '''
+
+    if not tags:
+        return
+
+    geracoes = {chave_tag(tag): uuid.uuid4().hex for tag in tags}
+    biblias = {tag[len('Biblia:'):-len('/*')] for tag in tags if tag.startswith('Biblia:') and tag.endswith('/*')}
+
+    def aplicar():
+        if biblias:
+            # Importação tardia: bible.corpus e bible.models dependem deste módulo
+            from bible.corpus import expirar
+            from bible.models import Revisao
+
+            cache.set(CHAVE_REVISAO, Revisao.avancar(), timeout=None)
+            expirar(biblias)
+            despublicar(biblias)
+
+        cache.set_many(geracoes, timeout=None)
+
+    transaction.on_commit(aplicar)
+
+
+## Tags das leituras
+
+def inteiro(valor):
+    '''
+    Normaliza um identificador vindo da URL ("01" -> 1); None se não for numérico
+    '''
+
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def tags_objeto(nome, pk):
+    pk = inteiro(pk)
+    return None if pk is None else [f'{nome}:{pk}']
+
+
+def tags_chave(versao, *partes, descendentes=False):
+    '''
+    Tags de uma leitura pela chave natural: a chave e todos os prefixos (uma mudança na versão,
+    no livro ou no capítulo também altera a resposta)
+    '''
+
+    partes = [versao] + [inteiro(parte) if parte.isdigit() else parte.upper() for parte in partes]
+    tags = [tag_chave(*partes[:tamanho]) for tamanho in range(1, len(partes) + 1)]
+
+    if descendentes:
+        tags.append(tag_chave(*partes) + '/*')
+
+    return tags
+
+
+def tags_versoes(versoes):
+    '''
+    Tags de uma leitura que abrange várias versões pelo nome: cada versão e tudo abaixo dela
+    '''
+
+    return [tag for versao in versoes for tag in tags_chave(versao, descendentes=True)] or None
+
+
+def tags_lista(nome, params=None, escopos=()):
+    '''
+    Tags de uma listagem do modelo. `escopos` são pares (parâmetro, modelo ancestral), do mais
+    específico ao mais geral: com o parâmetro presente, a listagem depende apenas daquele ancestral
+    e das tabelas acima dele; sem escopo, da tabela do modelo e de todas as tabelas acima.
+    '''
+
+    nomes = [nivel for nivel, _ in niveis(nome)]
+
+    for param, ancestral in escopos:
+        pk = inteiro((params or {}).get(param))
+        if pk is not None:
+            return [f'{ancestral}:{pk}/*'] + nomes[nomes.index(ancestral) + 1:]
+
+    return nomes
+
+
+## Armazenamento
+
+def chave_tag(tag):
+    return 'bible:tag:' + hashlib.md5(tag.encode()).hexdigest()
+
+
+def chave_resposta(request):
+    # URL absoluta (os links de paginação incluem o host) e formato de saída (JSON, API navegável...)
+    formato = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+    return 'bible:resposta:' + hashlib.md5(f'{request.build_absolute_uri()}|{formato}'.encode()).hexdigest()
+
+
+def geracoes_atuais(chaves):
+    '''
+    Gerações atuais das tags, criando as que ainda não existem
+    '''
+
+    atuais = cache.get_many(chaves)
+    ausentes = [chave for chave in chaves if chave not in atuais]
+
+    if ausentes:
+        # `add` não sobrescreve uma geração criada por outro processo nesse meio tempo
+        for chave in ausentes:
+            cache.add(chave, uuid.uuid4().hex, timeout=None)
+        atuais.update(cache.get_many(ausentes))
+
+    return [atuais.get(chave) for chave in chaves]
+
+
+async def ageracoes_atuais(chaves):
+    '''
+    `geracoes_atuais` pela API assíncrona do cache
+    '''
+
+    atuais = await cache.aget_many(chaves)
+    ausentes = [chave for chave in chaves if chave not in atuais]
+
+    if ausentes:
+        for chave in ausentes:
+            await cache.aadd(chave, uuid.uuid4().hex, timeout=None)
+        atuais.update(await cache.aget_many(ausentes))
+
+    return [atuais.get(chave) for chave in chaves]
+
+
+def defasado(revisao):
+    '''
+    Se o corpus em memória deste worker é anterior à revisão publicada: a resposta pode ter sido lida
+    dele com dados antigos e não é guardada (a conferência do corpus é antecipada)
+    '''
+
+    from bible.corpus import anterior
+
+    return revisao is not None and anterior(revisao)
+
+
+def em_cache(tags):
+    '''
+    Decorador das ações de leitura: guarda os dados das respostas 200 junto das gerações das tags.
+
+    `tags(request, **kwargs)` monta as tags a partir da URL, antes da consulta; se retornar None
+    (parâmetros inválidos), a ação é executada sem cache. As gerações são lidas antes da consulta,
+    para que uma gravação concorrente invalide a entrada que está sendo montada, e a resposta não é
+    guardada se o corpus em memória ainda não tem a última gravação de outro worker. Os validadores
+    (ETag, Last-Modified) são guardados com os dados para responder 304 direto do cache.
+    '''
+
+    def decorador(metodo):
+        @wraps(metodo)
+        def envoltorio(viewset, request, *args, **kwargs):
+            lista = tags(request, **kwargs)
+            if lista is None:
+                return metodo(viewset, request, *args, **kwargs)
+
+            chave = chave_resposta(request)
+            chaves = [chave_tag(tag) for tag in lista]
+
+            # Entrada, gerações e revisão publicada em uma única ida ao cache
+            valores = cache.get_many([chave, CHAVE_REVISAO] + chaves)
+            entrada = valores.get(chave)
+            if entrada is not None and entrada[0] == [valores.get(c) for c in chaves]:
+                _, dados, validadores = entrada
+
+                # GET condicional respondido pelo cache, sem consultar o banco
+                if validadores:
+                    resposta = resposta_nao_modificada(request, *validadores)
+                    if resposta is not None:
+                        return resposta
+                    viewset.validadores = validadores
+
+                return Response(dados)
+
+            geracoes = geracoes_atuais(chaves)
+            response = metodo(viewset, request, *args, **kwargs)
+
+            if response.status_code == 200 and not defasado(valores.get(CHAVE_REVISAO)):
+                entrada = (geracoes, response.data, getattr(viewset, 'validadores', None))
+                cache.set(chave, entrada, timeout=settings.CACHE_RESPOSTAS_TIMEOUT)
+
+            return response
+
+        return envoltorio
+
+    return decorador
+
+
+def em_cache_async(tags):
+    '''
+    `em_cache` para as leituras assíncronas (bible.views.asynchronous), pela API assíncrona do cache.
+
+    O método decorado retorna os dados da resposta (a view renderiza depois) e sinaliza erros com
+    exceções, então apenas respostas 200 chegam ao cache; o 304 servido do cache é `NaoModificado`.
+    '''
+
+    def decorador(metodo):
+        @wraps(metodo)
+        async def envoltorio(view, request, *args, **kwargs):
+            lista = tags(request, **kwargs)
+            if lista is None:
+                return await metodo(view, request, *args, **kwargs)
+
+            chave = chave_resposta(request)
+            chaves = [chave_tag(tag) for tag in lista]
+
+            valores = await cache.aget_many([chave, CHAVE_REVISAO] + chaves)
+            entrada = valores.get(chave)
+            if entrada is not None and entrada[0] == [valores.get(c) for c in chaves]:
+                _, dados, validadores = entrada
+
+                if validadores:
+                    resposta = resposta_nao_modificada(request, *validadores)
+                    if resposta is not None:
+                        raise NaoModificado(resposta)
+                    view.validadores = validadores
+
+                return dados
+
+            geracoes = await ageracoes_atuais(chaves)
+            dados = await metodo(view, request, *args, **kwargs)
+
+            if not defasado(valores.get(CHAVE_REVISAO)):
+                entrada = (geracoes, dados, getattr(view, 'validadores', None))
+                await cache.aset(chave, entrada, timeout=settings.CACHE_RESPOSTAS_TIMEOUT)
+
+            return dados
+
+        return envoltorio
+
+    return decorador
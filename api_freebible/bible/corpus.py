@@ -0,0 +1,210 @@
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import Max
+
+from bible.exporters import referencias_versao
+from bible.models import Biblia, Revisao, Versiculo
+from bible.snapshots import Indice, montar, publicado
+
+logger = logging.getLogger(__name__)
+
+# Corpus em memória: o texto de todas as versões ativas, somente leitura, no mesmo layout dos snapshots
+# (bible.snapshots): por versão, um único `bytes` com as chaves canônicas (uint32), os offsets (uint32)
+# e os textos UTF-8 concatenados. Uma versão de ~31 mil versículos ocupa o tamanho do texto mais
+# 8 bytes por versículo (4-5 MB), sem objetos Python por versículo.
+#
+# O corpus é carregado na inicialização do worker (api_freebible/wsgi.py); carregado antes do fork
+# (gunicorn --preload), as páginas são compartilhadas entre os workers por cópia-na-escrita, já que os
+# buffers nunca são alterados. A revisão dos dados é conferida em segundo plano a cada
+# CORPUS_VERIFICACAO segundos; quando muda, um novo corpus é montado e trocado por inteiro (uma
+# atribuição), e as leituras em curso terminam com o anterior. As gravações do próprio processo retiram
+# as versões alteradas na hora (expirar), e essas leituras voltam ao snapshot ou ao banco até a troca.
+# As gravações de outros processos são percebidas pela revisão que eles publicam no cache: enquanto o
+# corpus for anterior a ela, as respostas não são guardadas no cache (bible.cache.em_cache) e a
+# conferência é antecipada.
+
+_estado = {'corpus': None, 'verificado': 0.0, 'atualizando': False, 'geracao': 0}
+_trava = threading.Lock()
+
+
+class Corpus:
+    '''
+    Versões carregadas em memória: índice por id e por nome da versão
+    '''
+
+    def __init__(self, revisao, versoes):
+        self.revisao = revisao
+        self.versoes = versoes  # {biblia_id: (versao, Indice)}
+        self.ids = {versao: pk for pk, (versao, _) in versoes.items()}
+
+    def indice(self, biblia_id=None, versao=None):
+        if biblia_id is None:
+            biblia_id = self.ids.get(versao)
+        return self.versoes.get(int(biblia_id), (None, None))[1] if biblia_id is not None else None
+
+    def texto(self, biblia, livro, capitulo, numero):
+        '''
+        Texto de um versículo pela chave natural; `biblia` é o id ou o nome da versão.
+        KeyError se a versão não estiver carregada ou o versículo não existir.
+        '''
+
+        indice = self.indice(biblia_id=biblia) if isinstance(biblia, int) else self.indice(versao=biblia)
+        if indice is None:
+            raise KeyError(biblia)
+
+        return indice.texto(Versiculo.chave(livro, capitulo, numero))
+
+    def sem(self, biblias):
+        # Cópia sem as versões informadas (os índices das demais são compartilhados)
+        return Corpus(self.revisao, {pk: versao for pk, versao in self.versoes.items() if pk not in biblias})
+
+
+def revisao():
+    '''
+    Revisão dos dados: contador avançado após o commit de cada gravação (bible.models.Revisao), lido
+    em uma única linha
+    '''
+
+    return Revisao.atual()
+
+
+def construir():
+    '''
+    Monta o corpus com todas as versões ativas, lidas em fluxo por cursor do servidor
+    '''
+
+    atual = revisao()
+
+    # Validador Last-Modified de cada versão (inclusive excluídos, que guardam a data da exclusão)
+    ultimas = dict(Versiculo.all_objects.values_list('biblia_id').annotate(Max('updated_at')).order_by())
+
+    versoes = {}
+    for biblia in Biblia.objects.order_by('id'):
+        conteudo = montar(referencias_versao(biblia))
+        versoes[biblia.pk] = (biblia.versao, Indice(
+            conteudo, hashlib.sha256(conteudo).hexdigest()[:16], ultimas.get(biblia.pk), f'corpus {biblia.versao}'))
+
+    return Corpus(atual, versoes)
+
+
+def carregar():
+    '''
+    Carga síncrona, na inicialização do worker. Sem banco disponível (ou sem as tabelas), o corpus
+    fica vazio e é carregado em segundo plano no primeiro acesso.
+    '''
+
+    try:
+        corpus = construir()
+    except DatabaseError:
+        logger.exception('Não foi possível carregar o corpus em memória.')
+        return None
+
+    _estado.update(corpus=corpus, verificado=time.monotonic())
+    return corpus
+
+
+def liberar_conexoes():
+    '''
+    Fecha as conexões desta thread e os pools de conexões abertos na carga: os pools (conexões e
+    threads próprias) são do processo, e cada worker deve abrir os seus após o fork
+    '''
+
+    connections.close_all()
+    for alias in connections:
+        conexao = connections[alias]
+        if alias in getattr(type(conexao), '_connection_pools', {}):
+            conexao.close_pool()
+
+
+def atual():
+    '''
+    Corpus em uso, ou None (desativado ou ainda não carregado). Passado o intervalo de verificação,
+    agenda a conferência da revisão em segundo plano, sem bloquear a requisição.
+    '''
+
+    if not settings.CORPUS_ATIVO:
+        return None
+
+    if time.monotonic() - _estado['verificado'] >= settings.CORPUS_VERIFICACAO:
+        agendar()
+
+    return _estado['corpus']
+
+
+def agendar():
+    with _trava:
+        if _estado['atualizando']:
+            return
+        _estado.update(atualizando=True, verificado=time.monotonic())
+
+    threading.Thread(target=atualizar, name='corpus', daemon=True).start()
+
+
+def atualizar():
+    '''
+    Confere a revisão e, se mudou, monta e troca o corpus. Uma expiração durante a montagem
+    descarta o resultado (pode ter lido a versão antes da gravação) e a montagem é refeita.
+    '''
+
+    try:
+        while True:
+            geracao = _estado['geracao']
+            corpus = _estado['corpus']
+            if corpus is not None and revisao() == corpus.revisao:
+                break
+
+            novo = construir()
+            with _trava:
+                if _estado['geracao'] == geracao:
+                    _estado['corpus'] = novo  # Troca atômica: as leituras em curso seguem com o anterior
+                    break
+    except DatabaseError:
+        logger.exception('Não foi possível atualizar o corpus em memória.')
+    finally:
+        connections.close_all()  # Conexões desta thread (cada thread tem as suas)
+        _estado.update(atualizando=False, verificado=time.monotonic())
+
+
+def anterior(publicada):
+    '''
+    Se o corpus em uso é anterior à revisão publicada por outro processo; antecipa a conferência
+    '''
+
+    corpus = _estado['corpus']
+    if not settings.CORPUS_ATIVO or corpus is None or publicada <= corpus.revisao:
+        return False
+
+    agendar()
+    return True
+
+
+def expirar(biblias):
+    '''
+    Retira do corpus as versões alteradas por este processo (chamado após o commit, por
+    bible.cache.invalidar) e antecipa a próxima verificação
+    '''
+
+    biblias = {int(pk) for pk in biblias}
+
+    with _trava:
+        _estado['geracao'] += 1
+        corpus = _estado['corpus']
+        if corpus is not None and biblias & corpus.versoes.keys():
+            _estado['corpus'] = corpus.sem(biblias)
+        _estado['verificado'] = 0.0
+
+
+def indice_versao(biblia_id=None, versao=None):
+    '''
+    Índice de leitura da versão: do corpus em memória ou, sem ele, do snapshot publicado (None se nenhum)
+    '''
+
+    corpus = atual()
+    indice = corpus.indice(biblia_id, versao) if corpus is not None else None
+
+    return indice if indice is not None else publicado(biblia_id, versao)
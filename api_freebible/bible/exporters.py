@@ -0,0 +1,94 @@
+import json
+
+from asgiref.sync import sync_to_async
+
+from bible.models import Versiculo
+from bible.references import decompor_chave
+
+FORMATOS = ('ndjson', 'json')
+
+# Tipo de conteúdo de cada formato de exportação
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+}
+
+# Linhas lidas por ida ao cursor do servidor e agrupadas em cada bloco enviado
+TAMANHO_BLOCO = 2000
+
+
+def referencias_versao(biblia, tamanho_bloco=TAMANHO_BLOCO):
+    '''
+    Versículos ativos da versão na ordem canônica, como (referencia, texto).
+
+    Lê por um cursor do servidor (`iterator`) apenas a chave canônica e o texto: a ordem
+    livro/capítulo/versículo é a própria ordem de `referencia`, atendida pelo índice
+    (biblia, referencia), e a memória usada não depende do tamanho da versão.
+    '''
+
+    return (Versiculo.objects
+        .filter(biblia_id=biblia.pk)
+        # Capítulos e livros excluídos logicamente também ficam de fora, como nas rotas de leitura
+        .filter(capitulo__is_active=True, capitulo__deleted_at__isnull=True,
+                capitulo__livro__is_active=True, capitulo__livro__deleted_at__isnull=True)
+        .order_by('referencia')
+        .values_list('referencia', 'versiculo')
+        .iterator(chunk_size=tamanho_bloco))
+
+
+def registros_versao(biblia, tamanho_bloco=TAMANHO_BLOCO):
+    '''
+    Versículos ativos da versão na ordem canônica, como (livro, capitulo, numero, texto)
+    '''
+
+    for referencia, texto in referencias_versao(biblia, tamanho_bloco):
+        livro, capitulo, numero = decompor_chave(referencia)
+        yield livro, capitulo, numero, texto
+
+
+def linha_json(registro):
+    # Mesmo formato lido por `import_bible --formato ndjson`
+    livro, capitulo, numero, texto = registro
+    return json.dumps({'livro': livro, 'capitulo': capitulo, 'versiculo': numero, 'texto': texto}, ensure_ascii=False)
+
+
+def exportar(registros, formato='ndjson', tamanho_bloco=TAMANHO_BLOCO):
+    '''
+    Gera a exportação em blocos de texto, para envio em fluxo (StreamingHttpResponse ou arquivo)
+    '''
+
+    separador, inicio, fim = ('\n', '', '\n') if formato == 'ndjson' else (',\n', '[\n', '\n]\n')
+
+    # O início sai imediatamente, antes da primeira leitura do banco
+    if inicio:
+        yield inicio
+
+    bloco, primeiro = [], True
+    for registro in registros:
+        bloco.append(linha_json(registro))
+
+        if len(bloco) >= tamanho_bloco:
+            yield ('' if primeiro else separador) + separador.join(bloco)
+            bloco, primeiro = [], False
+
+    if bloco:
+        yield ('' if primeiro else separador) + separador.join(bloco)
+        primeiro = False
+
+    # Versão vazia: "[]" em JSON, nenhuma linha em NDJSON
+    if inicio or not primeiro:
+        yield fim
+
+
+async def exportar_async(blocos):
+    '''
+    Os blocos de `exportar` como iterador assíncrono, para as respostas em fluxo sob ASGI: o Django
+    consome um iterador síncrono inteiro antes de enviá-lo (a versão toda em memória). Cada bloco é
+    gerado na thread das chamadas síncronas da requisição, a mesma do cursor do servidor.
+    '''
+
+    proximo = sync_to_async(next, thread_sensitive=True)
+    iterador = iter(blocos)
+
+    while (bloco := await proximo(iterador, None)) is not None:
+        yield bloco
@@ -0,0 +1,282 @@
+import csv
+import json
+import re
+import xml.sax
+
+from bible.models import Livro
+
+# Identificadores dos livros nos formatos padrão, na mesma ordem de Livro.LIVRO_CHOICES
+LIVROS_USFM = [
+    'GEN', 'EXO', 'LEV', 'NUM', 'DEU', 'JOS', 'JDG', 'RUT', '1SA', '2SA', '1KI', '2KI', '1CH', '2CH', 'EZR', 'NEH',
+    'EST', 'JOB', 'PSA', 'PRO', 'ECC', 'SNG', 'ISA', 'JER', 'LAM', 'EZK', 'DAN', 'HOS', 'JOL', 'AMO', 'OBA', 'JON',
+    'MIC', 'NAM', 'HAB', 'ZEP', 'HAG', 'ZEC', 'MAL', 'MAT', 'MRK', 'LUK', 'JHN', 'ACT', 'ROM', '1CO', '2CO', 'GAL',
+    'EPH', 'PHP', 'COL', '1TH', '2TH', '1TI', '2TI', 'TIT', 'PHM', 'HEB', 'JAS', '1PE', '2PE', '1JN', '2JN',
+    '3JN', 'JUD', 'REV',
+]
+
+LIVROS_OSIS = [
+    'Gen', 'Exod', 'Lev', 'Num', 'Deut', 'Josh', 'Judg', 'Ruth', '1Sam', '2Sam', '1Kgs', '2Kgs', '1Chr', '2Chr',
+    'Ezra', 'Neh', 'Esth', 'Job', 'Ps', 'Prov', 'Eccl', 'Song', 'Isa', 'Jer', 'Lam', 'Ezek', 'Dan', 'Hos', 'Joel',
+    'Amos', 'Obad', 'Jonah', 'Mic', 'Nah', 'Hab', 'Zeph', 'Hag', 'Zech', 'Mal', 'Matt', 'Mark', 'Luke', 'John',
+    'Acts', 'Rom', '1Cor', '2Cor', 'Gal', 'Eph', 'Phil', 'Col', '1Thess', '2Thess', '1Tim', '2Tim', 'Titus', 'Phlm',
+    'Heb', 'Jas', '1Pet', '2Pet', '1John', '2John', '3John', 'Jude', 'Rev',
+]
+
+# Código externo (do repositório, USFM ou OSIS, sem diferenciar maiúsculas) -> código de Livro.LIVRO_CHOICES
+CODIGOS_LIVROS = {}
+for _lista in (list(Livro.ORDEM), LIVROS_USFM, LIVROS_OSIS):
+    for _externo, _codigo in zip(_lista, Livro.ORDEM):
+        CODIGOS_LIVROS.setdefault(_externo.upper(), _codigo)
+
+FORMATOS = ('usfm', 'osis', 'ndjson', 'csv')
+
+# Extensões reconhecidas quando o formato não é informado
+EXTENSOES = {
+    '.usfm': 'usfm', '.sfm': 'usfm', '.ptx': 'usfm',
+    '.xml': 'osis', '.osis': 'osis',
+    '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.json': 'ndjson',
+    '.csv': 'csv',
+}
+
+
+class FormatoInvalido(ValueError):
+    '''
+    Conteúdo que não pôde ser interpretado pelo leitor do formato
+    '''
+
+
+def codigo_livro(externo):
+    '''
+    Converte o identificador de livro do arquivo para o código usado em Livro
+    '''
+
+    try:
+        return CODIGOS_LIVROS[str(externo).strip().upper()]
+    except KeyError:
+        raise FormatoInvalido(f'Livro desconhecido: {externo}.')
+
+
+def inteiro(valor):
+    '''
+    Primeiro número de um campo numérico (versículos agrupados como "1-2" usam o primeiro)
+    '''
+
+    encontrado = re.match(r'\s*(\d+)', str(valor))
+    if not encontrado:
+        raise FormatoInvalido(f'Número inválido: {valor}.')
+
+    return int(encontrado.group(1))
+
+
+## USFM
+
+USFM_TOKEN_RE = re.compile(r'(\\\+?[a-z0-9]+\*?)')
+
+# Marcadores cujo texto não faz parte do versículo (títulos, cabeçalhos, comentários)
+USFM_CABECALHOS = {
+    'id', 'ide', 'h', 'toc1', 'toc2', 'toc3', 'mt', 'mt1', 'mt2', 'mt3', 'ms', 'ms1', 'ms2', 'mr',
+    's', 's1', 's2', 's3', 's4', 'sr', 'r', 'd', 'sp', 'rem', 'sts', 'cl', 'cp', 'ca', 'va', 'vp',
+}
+
+# Notas e referências cruzadas, ignoradas até o marcador de fechamento
+USFM_NOTAS = {'f', 'fe', 'x', 'ef', 'ex'}
+
+
+def ler_usfm(arquivo):
+    '''
+    Lê um arquivo USFM em fluxo, gerando (livro, capitulo, numero, texto)
+    '''
+
+    livro = capitulo = numero = None
+    texto = []
+    nota = None         # Nota em aberto, ignorada até `\\f*`, `\\x*`...
+    cabecalho = False   # Texto de título/seção em curso
+    esperando = None    # Marcador que aguarda o próximo texto (`id`, `c` ou `v`)
+
+    def versiculo_atual():
+        conteudo = ' '.join(''.join(texto).split())
+        if livro and capitulo and numero and conteudo:
+            return livro, capitulo, numero, conteudo
+
+    for linha in arquivo:
+        for token in USFM_TOKEN_RE.split(linha):
+            if not token:
+                continue
+
+            if token.startswith('\\'):
+                marcador = token.lstrip('\\+')
+
+                if nota:
+                    if marcador == nota + '*':
+                        nota = None
+                    continue
+
+                if marcador in USFM_NOTAS:
+                    nota = marcador
+                elif marcador in ('id', 'c', 'v'):
+                    if marcador != 'v' or numero is not None:
+                        registro = versiculo_atual()
+                        if registro:
+                            yield registro
+                    texto = []
+                    esperando = marcador
+                    cabecalho = False
+                else:
+                    cabecalho = marcador in USFM_CABECALHOS
+                continue
+
+            if nota:
+                continue
+
+            if esperando:
+                partes = token.strip().split(None, 1)
+                if not partes:
+                    continue
+
+                if esperando == 'id':
+                    livro, capitulo, numero = codigo_livro(partes[0]), None, None
+                    cabecalho = True
+                elif esperando == 'c':
+                    capitulo, numero = inteiro(partes[0]), None
+                else:
+                    numero = inteiro(partes[0])
+                    texto.append(partes[1] if len(partes) > 1 else '')
+
+                esperando = None
+                continue
+
+            if not cabecalho and numero is not None:
+                # Atributos de palavras (`\\w palavra|strong="H7225"\\w*`) ficam após a barra
+                texto.append(token.split('|', 1)[0])
+
+    registro = versiculo_atual()
+    if registro:
+        yield registro
+
+
+## OSIS
+
+class LeitorOSIS(xml.sax.handler.ContentHandler):
+    '''
+    Leitor SAX de OSIS, compatível com versículos como contêiner (`<verse osisID>`) e como marco
+    (`<verse sID/> ... <verse eID/>`). Notas e títulos são ignorados.
+    '''
+
+    IGNORADOS = {'note', 'title', 'reference'}
+
+    def __init__(self, destino):
+        super().__init__()
+        self.destino = destino
+        self.atual = None
+        self.texto = []
+        self.ignorando = 0
+        self.conteineres = []  # Para cada `<verse>` aberto: True se for contêiner, False se for marco
+
+    def startElementNS(self, nome, qnome, atributos):
+        local = nome[1]
+
+        if self.ignorando or local in self.IGNORADOS:
+            self.ignorando += 1
+            return
+
+        if local == 'verse':
+            atributos = {chave[1]: valor for chave, valor in atributos.items()}
+            self.conteineres.append('sID' not in atributos and 'eID' not in atributos)
+
+            if 'eID' in atributos:
+                self.emitir()
+            elif 'osisID' in atributos:
+                self.emitir()
+                self.atual = atributos['osisID'].split()[0]
+
+    def endElementNS(self, nome, qnome):
+        if self.ignorando:
+            self.ignorando -= 1
+            return
+
+        if nome[1] == 'verse' and self.conteineres.pop():
+            self.emitir()
+
+    def characters(self, conteudo):
+        if self.atual and not self.ignorando:
+            self.texto.append(conteudo)
+
+    def emitir(self):
+        if self.atual:
+            partes = self.atual.split('.')
+            texto = ' '.join(''.join(self.texto).split())
+
+            if len(partes) >= 3 and texto:
+                self.destino.append((codigo_livro(partes[0]), inteiro(partes[1]), inteiro(partes[2]), texto))
+
+        self.atual = None
+        self.texto = []
+
+
+def ler_osis(arquivo, tamanho_bloco=64 * 1024):
+    '''
+    Lê um arquivo OSIS XML em fluxo (SAX incremental), gerando (livro, capitulo, numero, texto)
+    '''
+
+    registros = []
+    parser = xml.sax.make_parser()
+    parser.setFeature(xml.sax.handler.feature_namespaces, True)
+    parser.setContentHandler(LeitorOSIS(registros))
+
+    while True:
+        bloco = arquivo.read(tamanho_bloco)
+        if not bloco:
+            break
+
+        parser.feed(bloco)
+        yield from registros
+        registros.clear()
+
+    parser.close()
+    yield from registros
+
+
+## Formatos simples (uma linha por versículo)
+
+def ler_ndjson(arquivo):
+    '''
+    Lê JSON por linha: {"livro": "GN", "capitulo": 1, "versiculo": 1, "texto": "..."}
+    '''
+
+    for linha in arquivo:
+        if not linha.strip():
+            continue
+
+        try:
+            registro = json.loads(linha)
+            yield codigo_livro(registro['livro']), inteiro(registro['capitulo']), inteiro(registro['versiculo']), registro['texto']
+        except (KeyError, TypeError, ValueError) as erro:
+            raise FormatoInvalido(f'Linha inválida: {linha.strip()[:80]} ({erro}).')
+
+
+def ler_csv(arquivo):
+    '''
+    Lê CSV com cabeçalho livro,capitulo,versiculo,texto
+    '''
+
+    for registro in csv.DictReader(arquivo):
+        try:
+            yield codigo_livro(registro['livro']), inteiro(registro['capitulo']), inteiro(registro['versiculo']), registro['texto']
+        except (KeyError, TypeError) as erro:
+            raise FormatoInvalido(f'Linha inválida: {registro} ({erro}).')
+
+
+LEITORES = {
+    'usfm': ler_usfm,
+    'osis': ler_osis,
+    'ndjson': ler_ndjson,
+    'csv': ler_csv,
+}
+
+
+def ler_arquivo(arquivo, formato):
+    '''
+    Gera os registros de um arquivo aberto no formato informado
+    '''
+
+    return LEITORES[formato](arquivo)
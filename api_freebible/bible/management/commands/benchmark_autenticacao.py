@@ -0,0 +1,53 @@
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand, CommandError
+
+from api_freebible.loadtest import basic, medir_wsgi
+from user.models import ApiToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Requisições por segundo da API com autenticação Basic (hash da senha a cada requisição) e com '
+        'token de API (verificação em cache). Um token temporário é emitido para o usuário informado e '
+        'excluído ao final; as requisições passam pelo Django inteiro, em threads, sem servidor HTTP.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/v1/bible/versicle/get_by_id/1/', help='Caminho requisitado')
+        parser.add_argument('--usuario', required=True, help='Credenciais Basic no formato email:senha')
+        parser.add_argument('--threads', type=int, default=8, help='Threads simultâneas (padrão: 8)')
+        parser.add_argument('--duracao', type=float, default=10, help='Segundos de medição por modo (padrão: 10)')
+
+    def handle(self, *args, **options):
+        threads = max(1, options['threads'])
+
+        email, _, senha = options['usuario'].partition(':')
+        usuario = authenticate(username=email, password=senha)
+        if usuario is None:
+            raise CommandError(f'Credenciais inválidas para {email}.')
+
+        token, chave = ApiToken.emitir(usuario, 'benchmark_autenticacao', validade_dias=1)
+
+        modos = (
+            ('Basic', {'Authorization': basic(options['usuario'])}),
+            ('token', {'Authorization': f'Bearer {chave}'}),
+        )
+
+        self.stdout.write(f'{options["url"]}: {threads} threads, {options["duracao"]:g}s por modo')
+        self.stdout.write(f'{"":<8}{"req/s":>10}{"falhas":>9}')
+
+        try:
+            referencia = None
+            for nome, cabecalhos in modos:
+                medir_wsgi(options['url'], cabecalhos, threads, min(options['duracao'], 1))  # Aquecimento (caches)
+                resultado = medir_wsgi(options['url'], cabecalhos, threads, options['duracao'])
+
+                vazao = resultado['requisicoes'] / resultado['segundos']
+                referencia = referencia or vazao
+                self.stdout.write(f'{nome:<8}{vazao:>10,.0f}{resultado["falhas"]:>9,}   {vazao / referencia:.2f}x')
+        finally:
+            token.hard_delete()
+
+        '''  # Shell
+        python manage.py benchmark_autenticacao --usuario admin@admin.com:admin --threads 8 --duracao 10
+        '''
@@ -0,0 +1,107 @@
+import asyncio
+import resource
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api_freebible.loadtest import Alvo, medir
+
+
+def alvos(valores, cabecalhos, usuario):
+    '''
+    Alvos no formato `nome=url` (ou apenas a URL), na ordem informada
+    '''
+
+    resultado = []
+    for valor in valores:
+        nome, separador, url = valor.partition('=')
+        if not separador or '://' in nome:
+            nome, url = valor, valor
+        try:
+            resultado.append((nome, Alvo(url, cabecalhos, usuario)))
+        except ValueError as erro:
+            raise CommandError(str(erro))
+
+    return resultado
+
+
+def liberar_descritores(conexoes):
+    '''
+    Eleva o limite de arquivos abertos do processo até o máximo permitido, se as conexões não couberem
+    '''
+
+    atual, maximo = resource.getrlimit(resource.RLIMIT_NOFILE)
+    necessario = conexoes + 64
+    if atual < necessario:
+        novo = necessario if maximo == resource.RLIM_INFINITY else min(necessario, maximo)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (novo, maximo))
+        atual = novo
+
+    return atual >= necessario
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga HTTP com conexões simultâneas, para comparar a mesma leitura servida por WSGI e por '
+        'ASGI (rotas /api/v1/bible/async/). Mede vazão, latências p50/p95/p99, concorrência efetiva e falhas '
+        'contra servidores já iniciados, um alvo de cada vez.'
+    )
+
+    # Apenas cliente HTTP: não consulta o banco nem depende das verificações do projeto
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('alvos', nargs='+', help='Alvos como nome=url, ex.: wsgi=http://127.0.0.1:8000/...')
+        parser.add_argument('--conexoes', type=int, default=1000, help='Conexões simultâneas (padrão: 1000)')
+        parser.add_argument('--duracao', type=float, default=30, help='Segundos de medição por alvo (padrão: 30)')
+        parser.add_argument('--aquecimento', type=float, default=5, help='Segundos de aquecimento, fora da medição (padrão: 5)')
+        parser.add_argument('--tempo-limite', type=float, default=30, help='Tempo máximo de uma resposta, em segundos (padrão: 30)')
+        parser.add_argument('--usuario', help='Credenciais Basic no formato email:senha')
+        parser.add_argument('--cabecalho', action='append', default=[], help='Cabeçalho extra "Nome: valor" (repetível)')
+
+    def handle(self, *args, **options):
+        cabecalhos = {}
+        for cabecalho in options['cabecalho']:
+            nome, separador, valor = cabecalho.partition(':')
+            if not separador:
+                raise CommandError(f'Cabeçalho inválido: {cabecalho}')
+            cabecalhos[nome.strip()] = valor.strip()
+
+        conexoes = max(1, options['conexoes'])
+        if not liberar_descritores(conexoes):
+            self.stderr.write(f'O limite de arquivos abertos não comporta {conexoes} conexões; espere erros de conexão.')
+
+        resultados = []
+        for nome, alvo in alvos(options['alvos'], cabecalhos, options['usuario']):
+            self.stdout.write(f'{nome}: {conexoes} conexões por {options["duracao"]:g}s ({alvo.url})')
+            resultados.append((nome, asyncio.run(
+                medir(alvo, conexoes, options['duracao'], options['tempo_limite'], options['aquecimento']))))
+
+        self.stdout.write(f'{"":<10}{"requisições":>13}{"req/s":>10}{"p50 (ms)":>10}{"p95 (ms)":>10}'
+                          f'{"p99 (ms)":>10}{"máx (ms)":>10}{"concorrência":>14}{"falhas":>9}')
+
+        for nome, resultado in resultados:
+            if not resultado.total:
+                self.stdout.write(f'{nome:<10} nenhuma resposta; erros: {resultado.erros}')
+                continue
+
+            latencias = [resultado.percentil(p) * 1000 for p in (50, 95, 99, 100)]
+            self.stdout.write(
+                f'{nome:<10}{resultado.total:>13,}{resultado.vazao:>10,.0f}'
+                + ''.join(f'{latencia:>10.1f}' for latencia in latencias)
+                + f'{resultado.concorrencia:>14.0f}{resultado.falhas:>9,}')
+
+            if resultado.erros:
+                self.stdout.write(f'{"":<10}erros de conexão: {resultado.erros}')
+            outros = {status: quantidade for status, quantidade in resultado.status.items() if status != 200}
+            if outros:
+                self.stdout.write(f'{"":<10}respostas por status (exceto 200): {outros}')
+
+        '''  # Shell
+        # Mesma leitura por WSGI (porta 8000) e ASGI (porta 8001)
+        gunicorn api_freebible.wsgi:application -b 127.0.0.1:8000 -w 4 --threads 8 &
+        uvicorn api_freebible.asgi:application --port 8001 --workers 4 --backlog 4096 &
+
+        python manage.py benchmark_concorrencia --conexoes 1000 --duracao 30 --usuario admin@admin.com:admin \
+            wsgi=http://127.0.0.1:8000/api/v1/bible/versicle/get_by_id/1/ \
+            asgi=http://127.0.0.1:8001/api/v1/bible/async/versicle/get_by_id/1/
+        '''
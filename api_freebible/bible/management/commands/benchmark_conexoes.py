@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api_freebible.loadtest import basic, medir_wsgi
+
+# Modos comparados e as variáveis de ambiente de cada um (ver DATABASES em settings.py)
+MODOS = (
+    ('sem persistência', {'DB_POOL': '0', 'DB_CONN_MAX_AGE': '0'}),
+    ('persistente', {'DB_POOL': '0', 'DB_CONN_MAX_AGE': '600'}),
+    ('pool', {'DB_POOL': '1'}),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Requisições por segundo da API em cada modo de conexão com o banco: sem persistência (uma conexão '
+        'nova por requisição), conexões persistentes (DB_CONN_MAX_AGE) e pool do psycopg 3 (DB_POOL). Cada '
+        'modo roda em um subprocesso com as variáveis correspondentes; as requisições passam pelo Django '
+        'inteiro, em threads, sem servidor HTTP.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/api/v1/bible/versicle/get_by_id/1/', help='Caminho requisitado')
+        parser.add_argument('--usuario', help='Credenciais Basic no formato email:senha')
+        parser.add_argument('--threads', type=int, default=8, help='Threads simultâneas (padrão: 8)')
+        parser.add_argument('--duracao', type=float, default=10, help='Segundos de medição por modo (padrão: 10)')
+        parser.add_argument('--modo', help='Executa apenas o modo informado e imprime o resultado em JSON (uso interno)')
+
+    def handle(self, *args, **options):
+        threads = max(1, options['threads'])
+
+        if options['modo']:
+            # Processo filho: a configuração das conexões já veio das variáveis de ambiente
+            cabecalhos = {'Authorization': basic(options['usuario'])} if options['usuario'] else {}
+            resultado = medir_wsgi(options['url'], cabecalhos, threads, options['duracao'])
+            resultado['pool'] = connection.pool is not None if hasattr(connection, 'pool') else False
+            resultado['conn_max_age'] = connection.settings_dict['CONN_MAX_AGE']
+            self.stdout.write(json.dumps(resultado))
+            return
+
+        if connection.vendor != 'postgresql':
+            raise CommandError('A comparação exige o PostgreSQL (DB_ENGINE=django.db.backends.postgresql).')
+
+        self.stdout.write(f'{options["url"]}: {threads} threads, {options["duracao"]:g}s por modo')
+        self.stdout.write(f'{"":<18}{"req/s":>10}{"falhas":>9}   configuração efetiva')
+
+        referencia = None
+        for nome, variaveis in MODOS:
+            comando = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_conexoes', '--modo', nome,
+                       '--url', options['url'], '--threads', str(threads), '--duracao', str(options['duracao'])]
+            if options['usuario']:
+                comando += ['--usuario', options['usuario']]
+
+            processo = subprocess.run(comando, env={**os.environ, **variaveis}, capture_output=True, text=True)
+            if processo.returncode != 0:
+                self.stdout.write(f'{nome:<18} falhou: {processo.stderr.strip().splitlines()[-1:]}')
+                continue
+
+            resultado = json.loads(processo.stdout.strip().splitlines()[-1])
+            vazao = resultado['requisicoes'] / resultado['segundos']
+            referencia = referencia or vazao
+
+            efetiva = 'pool' if resultado['pool'] else f'CONN_MAX_AGE={resultado["conn_max_age"]}'
+            self.stdout.write(f'{nome:<18}{vazao:>10,.0f}{resultado["falhas"]:>9,}   {efetiva}   {vazao / referencia:.2f}x')
+
+        '''  # Shell
+        python manage.py benchmark_conexoes --usuario admin@admin.com:admin --threads 8 --duracao 10
+
+        python manage.py benchmark_conexoes --url "/api/v1/bible/versicle/search/?numero=1" --usuario admin@admin.com:admin
+        '''
@@ -0,0 +1,68 @@
+import gzip
+
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.renderers import JSONRenderer
+
+from api_freebible import renderers
+from bible.management.commands.benchmark_serializers import medir
+from bible.models import Versiculo
+from bible.serializers.versicle import VersiculoValoresSerializer
+
+
+def renderizadores():
+    '''
+    Renderizadores comparados, apenas os que têm a biblioteca instalada
+    '''
+
+    disponiveis = [('json (DRF)', JSONRenderer())]
+    if renderers.orjson is not None:
+        disponiveis.append(('json (orjson)', renderers.JSONRapidoRenderer()))
+    if renderers.msgpack is not None:
+        disponiveis.append(('msgpack', renderers.MessagePackRenderer()))
+    if renderers.cbor2 is not None:
+        disponiveis.append(('cbor', renderers.CBORRenderer()))
+
+    return disponiveis
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara os renderizadores das respostas sobre uma lista de versículos já serializada: tempo de '
+        'codificação, tamanho do corpo e tamanho com gzip. Confere que o JSON com orjson é idêntico ao do DRF.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--versao', help='Versão lida (padrão: versículos de todas as versões)')
+        parser.add_argument('--linhas', type=int, default=31102, help='Quantidade de versículos (padrão: 31102)')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Repetições de cada medida (vale a melhor)')
+
+    def handle(self, *args, **options):
+        queryset = Versiculo.objects.order_by('referencia', 'id')
+        if options['versao']:
+            queryset = queryset.filter(biblia__versao=options['versao'])
+
+        dados = VersiculoValoresSerializer(
+            list(VersiculoValoresSerializer.valores(queryset[:options['linhas']])), many=True).data
+        if not dados:
+            raise CommandError('Nenhum versículo encontrado para a medição.')
+
+        repeticoes = max(1, options['repeticoes'])
+        resultados = [(nome, *medir(lambda: renderer.render(dados), repeticoes)) for nome, renderer in renderizadores()]
+
+        corpos = {nome: corpo for nome, _, corpo in resultados}
+        if 'json (orjson)' in corpos and corpos['json (orjson)'] != corpos['json (DRF)']:
+            raise CommandError('O JSON gerado com orjson difere do JSONRenderer do DRF.')
+
+        self.stdout.write(f'{len(dados)} versículos, melhor de {repeticoes} repetições:')
+        self.stdout.write(f'{"":<16}{"codificação (ms)":>18}{"bytes":>14}{"bytes (gzip)":>16}')
+
+        _, referencia, _ = resultados[0]
+        for nome, tempo, corpo in resultados:
+            self.stdout.write(
+                f'{nome:<16}{tempo * 1000:>18.1f}{len(corpo):>14,}{len(gzip.compress(corpo, 6)):>16,}'
+                f'   {referencia / tempo:.1f}x')
+
+        ausentes = [biblioteca for biblioteca in ('orjson', 'msgpack', 'cbor2') if getattr(renderers, biblioteca) is None]
+        if ausentes:
+            self.stdout.write(f'Bibliotecas não instaladas (fora da comparação): {", ".join(ausentes)}')
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api_freebible.loadtest import Alvo, medir
+from api_freebible.scenarios import cenarios, descobertas, parametros
+from user.models import ApiToken
+
+# Métricas comparadas com a linha de base: (chave, rótulo, maior é melhor)
+METRICAS = (
+    ('vazao', 'req/s', True),
+    ('p50', 'p50', False),
+    ('p95', 'p95', False),
+    ('p99', 'p99', False),
+)
+
+
+def metricas(resultado):
+    '''
+    Vazão (req/s) e latências (ms) de uma medição
+    '''
+
+    return {
+        'vazao': round(resultado.vazao, 1),
+        **{f'p{p}': round(resultado.percentil(p) * 1000, 2) for p in (50, 95, 99)},
+        'requisicoes': resultado.total,
+        'falhas': resultado.falhas,
+    }
+
+
+def regressoes(atual, base, tolerancia, folga):
+    '''
+    Métricas piores que a linha de base além da tolerância relativa; nas latências, também além da
+    folga absoluta em ms (variações de frações de milissegundo são ruído, não regressão)
+    '''
+
+    piores = []
+    for chave, rotulo, maior_melhor in METRICAS:
+        if chave not in base:
+            continue
+        if maior_melhor:
+            pior = atual[chave] < base[chave] * (1 - tolerancia)
+        else:
+            pior = atual[chave] > base[chave] * (1 + tolerancia) and atual[chave] - base[chave] > folga
+        if pior:
+            piores.append(f'{rotulo} {base[chave]:g} -> {atual[chave]:g}')
+
+    return piores
+
+
+class Servidor:
+    '''
+    Servidor gunicorn local (api_freebible/gunicorn.conf.py) iniciado para o teste, com os mesmos
+    settings e banco deste processo, sem os limites de requisições, que responderiam 429 ao gerador, e
+    sem a reciclagem de workers (max_requests), que derrubaria as conexões abertas no meio da medição
+    '''
+
+    def __init__(self, porta, workers, threads):
+        self.url = f'http://127.0.0.1:{porta}'
+        self.comando = [
+            sys.executable, '-m', 'gunicorn', '--config', str(settings.BASE_DIR / 'gunicorn.conf.py'),
+            '--bind', f'127.0.0.1:{porta}', '--workers', str(workers), '--threads', str(threads),
+            '--access-logfile', '/dev/null',
+        ]
+        self.ambiente = {
+            **os.environ,
+            'THROTTLE_USUARIO': '', 'THROTTLE_USUARIO_CARO': '', 'THROTTLE_IP': '', 'THROTTLE_IP_CARO': '',
+            'GUNICORN_MAX_REQUESTS': '0',
+            'ALLOWED_HOSTS': ','.join(settings.ALLOWED_HOSTS + ['127.0.0.1']),
+        }
+        self.processo = None
+
+    def __enter__(self):
+        self.processo = subprocess.Popen(self.comando, cwd=settings.BASE_DIR, env=self.ambiente,
+                                         stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+        # Pronto quando responde (qualquer status) na raiz da API
+        limite = time.monotonic() + 60
+        while time.monotonic() < limite:
+            if self.processo.poll() is not None:
+                raise CommandError(f'O gunicorn terminou na inicialização: {self.processo.stderr.read().decode()[-2000:]}')
+            try:
+                urllib.request.urlopen(self.url + '/api/v1/bible/', timeout=2)
+                return self
+            except urllib.error.HTTPError:
+                return self
+            except OSError:
+                time.sleep(0.5)
+
+        self.__exit__(None, None, None)
+        raise CommandError('O gunicorn não respondeu em 60s.')
+
+    def __exit__(self, *args):
+        self.processo.terminate()
+        try:
+            self.processo.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.processo.kill()
+
+
+class Command(BaseCommand):
+    help = (
+        'Teste de carga de todas as rotas da API (api_freebible/scenarios.py) contra um servidor local com o '
+        'banco já populado: vazão e latências p50/p95/p99 por rota, comparadas com a linha de base gravada. '
+        'Termina com erro se alguma rota regredir além da tolerância, falhar ou não tiver cenário.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', required=True, help='Email do usuário das requisições (recebe um token de API temporário)')
+        parser.add_argument('--servidor', help='URL de um servidor já iniciado (padrão: inicia um gunicorn local)')
+        parser.add_argument('--porta', type=int, default=8089, help='Porta do gunicorn iniciado pelo teste (padrão: 8089)')
+        parser.add_argument('--workers', type=int, default=2, help='Workers do gunicorn iniciado pelo teste (padrão: 2)')
+        parser.add_argument('--threads', type=int, default=4, help='Threads por worker do gunicorn iniciado pelo teste (padrão: 4)')
+        parser.add_argument('--conexoes', type=int, default=8, help='Conexões simultâneas por rota (padrão: 8)')
+        parser.add_argument('--duracao', type=float, default=3, help='Segundos de medição por rota (padrão: 3)')
+        parser.add_argument('--aquecimento', type=float, default=1, help='Segundos de aquecimento por rota (padrão: 1)')
+        parser.add_argument('--tempo-limite', type=float, default=30, help='Tempo máximo de uma resposta, em segundos (padrão: 30)')
+        parser.add_argument('--rota', action='append', default=[], help='Mede apenas os cenários cujo nome contém o texto (repetível)')
+        parser.add_argument('--linha-base', default=str(settings.BASE_DIR / 'loadtest_baseline.json'),
+                            help='Arquivo da linha de base (padrão: loadtest_baseline.json)')
+        parser.add_argument('--gravar', action='store_true', help='Grava os resultados como a nova linha de base, sem comparar')
+        parser.add_argument('--tolerancia', type=float, default=0.3, help='Piora relativa aceita (padrão: 0.3, 30%%)')
+        parser.add_argument('--folga', type=float, default=2.0, help='Piora absoluta aceita nas latências, em ms (padrão: 2)')
+
+    def handle(self, *args, **options):
+        p = parametros(options['usuario'])
+        if p is None:
+            raise CommandError('Banco sem versículos ativos ou usuário inexistente: popule o banco e informe um usuário válido.')
+
+        lista = cenarios(p)
+        faltando = descobertas(lista)
+        if faltando:
+            raise CommandError('Rotas sem cenário nem exclusão em api_freebible/scenarios.py: '
+                               + ', '.join(f'{rota} {metodo.upper()}' for rota, metodo in faltando))
+
+        if options['rota']:
+            lista = [cenario for cenario in lista if any(filtro in cenario.nome for filtro in options['rota'])]
+
+        token, chave = ApiToken.emitir(p['usuario'], 'benchmark_rotas', validade_dias=1)
+        try:
+            if options['servidor']:
+                resultados = self.medir(options['servidor'].rstrip('/'), lista, chave, options)
+            else:
+                with Servidor(options['porta'], options['workers'], options['threads']) as servidor:
+                    resultados = self.medir(servidor.url, lista, chave, options)
+        finally:
+            token.hard_delete()
+
+        if options['gravar']:
+            self.gravar(resultados, options)
+        else:
+            self.comparar(resultados, options)
+
+        '''  # Shell
+        # Linha de base (gunicorn local iniciado pelo teste, banco já populado)
+        python manage.py benchmark_rotas --usuario admin@admin.com --gravar
+
+        # Comparação com a linha de base: termina com erro (código 1) se alguma rota regredir
+        python manage.py benchmark_rotas --usuario admin@admin.com
+
+        # Apenas as buscas, contra um servidor já iniciado
+        python manage.py benchmark_rotas --usuario admin@admin.com --servidor http://127.0.0.1:8000 --rota search
+        '''
+
+    def medir(self, url, lista, chave, options):
+        cabecalhos = {'Authorization': f'Bearer {chave}', 'Accept': 'application/json'}
+
+        self.stdout.write(f'{len(lista)} cenários em {url}: {options["conexoes"]} conexões, {options["duracao"]:g}s por cenário')
+        self.stdout.write(f'{"":<34}{"req/s":>9}{"p50 (ms)":>10}{"p95 (ms)":>10}{"p99 (ms)":>10}{"falhas":>8}')
+
+        resultados = {}
+        for cenario in lista:
+            alvo = Alvo(url + cenario.caminho, cabecalhos, metodo=cenario.metodo.upper(), corpo=cenario.corpo)
+            resultado = asyncio.run(medir(alvo, cenario.conexoes or options['conexoes'], options['duracao'],
+                                          options['tempo_limite'], options['aquecimento']))
+
+            if not resultado.total:
+                resultados[cenario.nome] = {'falhas': sum(resultado.erros.values()) or 1, 'erros': resultado.erros}
+                self.stdout.write(f'{cenario.nome:<34} nenhuma resposta; erros: {resultado.erros}')
+                continue
+
+            atual = resultados[cenario.nome] = metricas(resultado)
+            self.stdout.write(f'{cenario.nome:<34}{atual["vazao"]:>9,.0f}{atual["p50"]:>10.1f}{atual["p95"]:>10.1f}'
+                              f'{atual["p99"]:>10.1f}{atual["falhas"]:>8,}')
+
+            outros = {status: quantidade for status, quantidade in resultado.status.items() if not 200 <= status < 300}
+            if outros or resultado.erros:
+                self.stdout.write(f'{"":<34}status fora de 2xx: {outros}; erros de conexão: {resultado.erros}')
+
+        return resultados
+
+    def ambiente(self, options):
+        return {
+            'conexoes': options['conexoes'],
+            'duracao': options['duracao'],
+            'cpus': os.cpu_count(),
+            'python': platform.python_version(),
+            'banco': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+        }
+
+    def gravar(self, resultados, options):
+        falhas = [nome for nome, atual in resultados.items() if atual['falhas']]
+        if falhas:
+            raise CommandError(f'Linha de base não gravada: cenários com falhas: {", ".join(falhas)}')
+
+        with open(options['linha_base'], 'w') as arquivo:
+            json.dump({
+                'gerada_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'ambiente': self.ambiente(options),
+                'cenarios': resultados,
+            }, arquivo, indent=2, ensure_ascii=False)
+            arquivo.write('\n')
+
+        self.stdout.write(f'Linha de base gravada em {options["linha_base"]} ({len(resultados)} cenários).')
+
+    def comparar(self, resultados, options):
+        try:
+            with open(options['linha_base']) as arquivo:
+                linha_base = json.load(arquivo)
+        except FileNotFoundError:
+            raise CommandError(f'Linha de base inexistente: {options["linha_base"]} (grave uma com --gravar).')
+
+        ambiente = self.ambiente(options)
+        diferencas = {chave: (valor, ambiente[chave]) for chave, valor in linha_base['ambiente'].items()
+                      if ambiente.get(chave) != valor}
+        if diferencas:
+            self.stderr.write(f'A linha de base foi gravada em outro ambiente (base, atual): {diferencas}')
+
+        problemas = []
+        for nome, atual in resultados.items():
+            if atual['falhas']:
+                problemas.append(f'{nome}: {atual["falhas"]} falhas')
+            base = linha_base['cenarios'].get(nome)
+            if base is None:
+                self.stdout.write(f'{nome}: sem linha de base')
+                continue
+            piores = regressoes(atual, base, options['tolerancia'], options['folga']) if 'vazao' in atual else []
+            if piores:
+                problemas.append(f'{nome}: {"; ".join(piores)}')
+
+        if problemas:
+            raise CommandError('Regressões em relação à linha de base:\n  ' + '\n  '.join(problemas))
+
+        self.stdout.write(f'{len(resultados)} cenários dentro da linha de base (tolerância {options["tolerancia"]:.0%}).')
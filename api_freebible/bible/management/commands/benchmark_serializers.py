@@ -0,0 +1,77 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bible.models import Versiculo
+from bible.serializers.versicle import VersiculoSerializer, VersiculoValoresSerializer
+
+
+def medir(funcao, repeticoes):
+    '''
+    Melhor tempo (segundos) entre as repetições e o resultado da última execução
+    '''
+
+    melhor, resultado = None, None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        decorrido = time.perf_counter() - inicio
+        melhor = decorrido if melhor is None else min(melhor, decorrido)
+
+    return melhor, resultado
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a serialização de leitura dos versículos: VersiculoSerializer (ModelSerializer sobre '
+        'instâncias) e VersiculoValoresSerializer (linhas de values()). Mede a consulta mais a '
+        'serialização e apenas a serialização, em linhas por segundo, e confere que as saídas são iguais.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--versao', help='Versão lida (padrão: versículos de todas as versões)')
+        parser.add_argument('--linhas', type=int, default=31102, help='Quantidade de versículos (padrão: 31102)')
+        parser.add_argument('--repeticoes', type=int, default=3, help='Repetições de cada medida (vale a melhor)')
+
+    def handle(self, *args, **options):
+        queryset = Versiculo.objects.order_by('referencia', 'id')
+        if options['versao']:
+            queryset = queryset.filter(biblia__versao=options['versao'])
+        queryset = queryset[:options['linhas']]
+
+        repeticoes = max(1, options['repeticoes'])
+
+        instancias = list(queryset)
+        if not instancias:
+            raise CommandError('Nenhum versículo encontrado para a medição.')
+        linhas = list(VersiculoValoresSerializer.valores(queryset))
+
+        medidas = {
+            'ModelSerializer': (
+                medir(lambda: VersiculoSerializer(list(queryset), many=True).data, repeticoes),
+                medir(lambda: VersiculoSerializer(instancias, many=True).data, repeticoes),
+            ),
+            'values()': (
+                medir(lambda: VersiculoValoresSerializer(list(VersiculoValoresSerializer.valores(queryset)),
+                                                         many=True).data, repeticoes),
+                medir(lambda: VersiculoValoresSerializer(linhas, many=True).data, repeticoes),
+            ),
+        }
+
+        # Saídas idênticas, na forma que chega ao cliente
+        saidas = {nome: json.dumps(medida[1][1]) for nome, medida in medidas.items()}
+        if saidas['ModelSerializer'] != saidas['values()']:
+            raise CommandError('As saídas dos serializers são diferentes.')
+
+        total = len(instancias)
+        self.stdout.write(f'{total} versículos, melhor de {repeticoes} repetições (linhas/s):')
+        self.stdout.write(f'{"":<18}{"consulta + serialização":>26}{"serialização":>16}')
+        for nome, ((completo, _), (serializacao, _)) in medidas.items():
+            self.stdout.write(f'{nome:<18}{total / completo:>26,.0f}{total / serializacao:>16,.0f}')
+
+        (modelo_completo, _), (modelo_serializacao, _) = medidas['ModelSerializer']
+        (valores_completo, _), (valores_serializacao, _) = medidas['values()']
+        self.stdout.write(self.style.SUCCESS(
+            f'Ganho: {modelo_completo / valores_completo:.1f}x com a consulta, '
+            f'{modelo_serializacao / valores_serializacao:.1f}x apenas na serialização; saídas idênticas.'))
@@ -0,0 +1,142 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bible.models import Capitulo, Livro, Versiculo
+from user.models import VIVOS, CustomUser
+
+# Tamanho de página padrão da paginação por cursor, mais o registro extra que indica a próxima página
+LIMITE = 101
+
+# Tabelas com menos registros (estimativa do ANALYZE) são lidas por varredura sequencial, corretamente:
+# as consultas sobre elas e os índices esperados delas nas junções não são conferidos; sem versículos
+# suficientes, a base precisa ser povoada
+MINIMO_REGISTROS = 500
+MINIMO_VERSICULOS = 30000
+
+
+def consultas():
+    '''
+    Consultas equivalentes às das rotas mais acessadas e os índices que cada uma deve usar; uma tupla
+    aceita qualquer um dos índices (o planejador escolhe pelo custo estimado, e o índice da chave
+    estrangeira com ordenação incremental empata com o índice composto em bases menores)
+    '''
+
+    versiculos = Versiculo.objects.order_by('capitulo_id', 'numero')
+    capitulos = Capitulo.objects.order_by('livro_id', 'numero')
+
+    return [
+        ('versicle/list_active', versiculos[:LIMITE], [('bible_vers_cap_numero_uniq', 'bible_versiculo_capitulo_id_')]),
+        ('versicle/search?capitulo', versiculos.filter(capitulo_id=1)[:LIMITE],
+            [('bible_vers_cap_numero_uniq', 'bible_versiculo_capitulo_id_')]),
+        ('versicle/range', Versiculo.objects.filter(biblia_id=1, referencia__range=(1001001, 1001031))
+            .filter(capitulo__is_active=True, capitulo__deleted_at__isnull=True,
+                    capitulo__livro__is_active=True, capitulo__livro__deleted_at__isnull=True)
+            .order_by('referencia')[:LIMITE], ['bible_vers_vivo_ref_idx']),
+        ('chapter/list_active', capitulos[:LIMITE], ['bible_cap_vivo_chave_idx']),
+        ('chapter/search?livro', capitulos.filter(livro_id=1)[:LIMITE],
+            [('bible_cap_vivo_chave_idx', 'bible_capitulo_livro_id_')]),
+        ('chapter/get_by_key', Capitulo.objects.filter(livro__biblia__versao='SINT-01', livro__livro='GN', numero=1),
+            [('bible_cap_vivo_chave_idx', 'bible_cap_livro_numero_uniq', 'bible_capitulo_livro_id_'), 'bible_livro_biblia_livro_uniq']),
+        ('book/list_active', Livro.objects.order_by('biblia_id', 'id')[:LIMITE], ['bible_livro_vivo_ord_idx']),
+        ('book/search?biblia', Livro.objects.filter(biblia_id=1).order_by('biblia_id', 'id')[:LIMITE],
+            [('bible_livro_vivo_ord_idx', 'bible_livro_biblia_livro_uniq', 'bible_livro_biblia_id_')]),
+        ('custom_user/list_active', CustomUser.all_objects.filter(VIVOS).order_by('id')[:LIMITE], ['user_vivo_id_idx']),
+    ]
+
+
+def estimativas(tabelas):
+    '''
+    Quantidade estimada de registros de cada tabela, atualizada antes por ANALYZE
+    '''
+
+    with connection.cursor() as cursor:
+        for tabela in tabelas:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(tabela)}')
+        cursor.execute('SELECT relname, reltuples FROM pg_class WHERE relname = ANY(%s)', [list(tabelas)])
+        return {tabela: max(0, int(estimativa)) for tabela, estimativa in cursor.fetchall()}
+
+
+def tabelas_indices():
+    '''
+    Tabela de cada índice do esquema atual, {índice: tabela}
+    '''
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT indexname, tablename FROM pg_indexes WHERE schemaname = current_schema()')
+        return dict(cursor.fetchall())
+
+
+class Command(BaseCommand):
+    help = (
+        'Confere com EXPLAIN, com as configurações normais do planejador, se as rotas mais acessadas '
+        'usam os índices esperados. Exige uma base povoada (generate_corpus): tabelas pequenas são lidas '
+        'por varredura sequencial e as consultas sobre elas são ignoradas. Termina com erro se algum '
+        'índice esperado não aparecer no plano.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='Exibe o plano de todas as consultas')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('A conferência dos planos de consulta exige PostgreSQL.')
+
+        lista = consultas()
+        indices_tabelas = tabelas_indices()
+        registros = estimativas({queryset.model._meta.db_table for _, queryset, _ in lista} |
+                                {tabela for _, _, indices in lista for indice in indices
+                                 for tabela in tabelas(indice, indices_tabelas)})
+
+        if registros.get(Versiculo._meta.db_table, 0) < MINIMO_VERSICULOS:
+            raise CommandError(
+                f'Base com menos de {MINIMO_VERSICULOS} versículos: os planos não representam a produção. '
+                'Povoe a base antes, por exemplo com `python manage.py generate_corpus --versoes 10`.')
+
+        falhas = []
+
+        for nome, queryset, indices in lista:
+            tabela = queryset.model._meta.db_table
+            if registros.get(tabela, 0) < MINIMO_REGISTROS:
+                self.stdout.write(self.style.WARNING(
+                    f'{nome}: ignorada, {tabela} tem cerca de {registros.get(tabela, 0)} registros'))
+                continue
+
+            # Índices esperados de tabelas pequenas nas junções (ex.: bible_livro) não são conferidos
+            indices = [indice for indice in indices
+                       if any(registros.get(tabela, 0) >= MINIMO_REGISTROS for tabela in tabelas(indice, indices_tabelas))]
+
+            if not indices:
+                self.stdout.write(self.style.WARNING(f'{nome}: ignorada, os índices esperados são de tabelas pequenas'))
+                continue
+
+            plano = queryset.explain()
+            ausentes = [indice for indice in indices if not usado(indice, plano)]
+
+            if ausentes:
+                falhas.append(nome)
+                self.stdout.write(self.style.ERROR(f'{nome}: índice(s) não usado(s): {", ".join(map(descrever, ausentes))}'))
+                self.stdout.write(plano)
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{nome}: {", ".join(map(descrever, indices))}'))
+                if options['verbose_plans']:
+                    self.stdout.write(plano)
+
+        if falhas:
+            raise CommandError(f'{len(falhas)} consulta(s) sem o índice esperado: {", ".join(falhas)}.')
+
+
+def usado(indice, plano):
+    # Nomes terminados em `_` são prefixos (índices das chaves estrangeiras, com sufixo gerado pelo Django)
+    alternativas = indice if isinstance(indice, tuple) else (indice,)
+    return any(f' {alternativa}' in plano for alternativa in alternativas)
+
+
+def tabelas(indice, indices_tabelas):
+    alternativas = indice if isinstance(indice, tuple) else (indice,)
+    return {tabela for nome, tabela in indices_tabelas.items()
+            if any(nome == alternativa or (alternativa.endswith('_') and nome.startswith(alternativa))
+                   for alternativa in alternativas)}
+
+
+def descrever(indice):
+    return ' ou '.join(indice) if isinstance(indice, tuple) else indice
@@ -0,0 +1,37 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bible.exporters import FORMATOS, TAMANHO_BLOCO, exportar, registros_versao
+from bible.models import Biblia
+
+
+class Command(BaseCommand):
+    help = (
+        'Exporta uma versão completa da Bíblia em NDJSON (mesmo formato aceito por import_bible) ou JSON, '
+        'na ordem canônica, lendo o banco por um cursor do servidor.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('versao', help='Nome da versão (chave natural de Biblia)')
+        parser.add_argument('--formato', choices=FORMATOS, default='ndjson')
+        parser.add_argument('--saida', help='Arquivo de saída (padrão: saída padrão)')
+        parser.add_argument('--lote', type=int, default=TAMANHO_BLOCO, help='Linhas por leitura do cursor')
+
+    def handle(self, *args, **options):
+        try:
+            biblia = Biblia.objects.get(versao=options['versao'])
+        except Biblia.DoesNotExist:
+            raise CommandError(f'Versão não encontrada: {options["versao"]}')
+
+        inicio = time.perf_counter()
+        blocos = exportar(registros_versao(biblia, options['lote']), options['formato'], options['lote'])
+
+        if options['saida']:
+            with open(options['saida'], 'w', encoding='utf-8') as arquivo:
+                arquivo.writelines(blocos)
+            self.stderr.write(self.style.SUCCESS(
+                f'"{biblia.versao}" exportada em {options["saida"]} em {time.perf_counter() - inicio:.1f}s.'))
+        else:
+            sys.stdout.writelines(blocos)
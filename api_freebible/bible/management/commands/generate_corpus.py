@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bible.models import Biblia
+from bible.synthetic import gerar_versao
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera versões sintéticas completas da Bíblia para testes de carga: os 66 livros com a quantidade '
+        'real de capítulos e versículos (31.102 por versão), textos com tamanhos realistas e uma fração '
+        'de registros excluídos logicamente. Determinístico pela semente; executar novamente regrava as '
+        'mesmas versões, com a mesma estrutura para qualquer semente.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--versoes', type=int, default=1, help='Quantidade de versões (padrão: 1)')
+        parser.add_argument('--prefixo', default='SINT', help='Prefixo do nome das versões: SINT-01, SINT-02... (padrão: SINT)')
+        parser.add_argument('--semente', type=int, default=0, help='Semente do gerador (padrão: 0)')
+        parser.add_argument('--excluidos', type=float, default=0.02,
+                            help='Fração de livros, capítulos e versículos excluídos logicamente (padrão: 0.02)')
+        parser.add_argument('--lingua', choices=[codigo for codigo, _ in Biblia.LINGUA_CHOICES],
+                            help='Língua de todas as versões (padrão: alterna entre as línguas)')
+
+    def handle(self, *args, **options):
+        if options['versoes'] < 1:
+            raise CommandError('Informe ao menos uma versão.')
+        if not 0 <= options['excluidos'] < 1:
+            raise CommandError('A fração de excluídos deve estar entre 0 e 1.')
+
+        linguas = [codigo for codigo, _ in Biblia.LINGUA_CHOICES]
+        inicio = time.perf_counter()
+
+        for indice in range(1, options['versoes'] + 1):
+            versao = f'{options["prefixo"]}-{indice:02d}'
+            lingua = options['lingua'] or linguas[(indice - 1) % len(linguas)]
+            inicio_versao = time.perf_counter()
+
+            biblia, total, excluidos = gerar_versao(options['semente'], versao, lingua, options['excluidos'])
+
+            resumo = ', '.join(f'{quantidade} {modelo}' for modelo, quantidade in excluidos.items()) or 'nenhum'
+            self.stdout.write(
+                f'"{biblia.versao}" ({lingua}, id {biblia.pk}): {total} versículos, excluídos: {resumo} '
+                f'em {time.perf_counter() - inicio_versao:.1f}s.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{options["versoes"]} versões geradas em {time.perf_counter() - inicio:.1f}s.'))
+
+        '''  # Shell
+        # Base de benchmark: 10 versões (PT e EN alternadas), 2% dos registros excluídos logicamente
+        python manage.py generate_corpus --versoes 10
+
+        # Regrava as mesmas versões (a estrutura de capítulos e versículos depende só do nome da
+        # versão) com outros textos e outras exclusões
+        python manage.py generate_corpus --versoes 10 --semente 42 --excluidos 0.05
+        '''
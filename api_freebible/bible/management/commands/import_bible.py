@@ -0,0 +1,57 @@
+import os
+import time
+from itertools import chain
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bible.bulk import TAMANHO_LOTE, carregar_versao
+from bible.importers import EXTENSOES, FORMATOS, FormatoInvalido, ler_arquivo
+from bible.models import Biblia
+
+
+class Command(BaseCommand):
+    help = (
+        'Importa uma versão completa da Bíblia (USFM, OSIS XML, JSON por linha ou CSV) em uma única '
+        'transação, com gravação em lote. Executar novamente atualiza a mesma versão.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivos', nargs='+', help='Arquivos da versão (USFM costuma ter um arquivo por livro)')
+        parser.add_argument('--lingua', required=True, choices=[codigo for codigo, _ in Biblia.LINGUA_CHOICES])
+        parser.add_argument('--versao', required=True, help='Nome da versão (chave natural de Biblia)')
+        parser.add_argument('--formato', choices=FORMATOS, help='Formato dos arquivos (padrão: pela extensão)')
+        parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Versículos por INSERT ... ON CONFLICT')
+
+    def handle(self, *args, **options):
+        for caminho in options['arquivos']:
+            if not os.path.isfile(caminho):
+                raise CommandError(f'Arquivo não encontrado: {caminho}')
+
+        inicio = time.perf_counter()
+        registros = chain.from_iterable(self.ler(caminho, options['formato']) for caminho in options['arquivos'])
+
+        try:
+            biblia, total = carregar_versao(options['lingua'], options['versao'], registros, options['lote'])
+        except FormatoInvalido as erro:
+            raise CommandError(str(erro))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} versículos importados em "{biblia.versao}" (id {biblia.pk}) '
+            f'em {time.perf_counter() - inicio:.1f}s.'))
+
+    def ler(self, caminho, formato=None):
+        '''
+        Gera os registros de um arquivo, detectando o formato pela extensão se necessário
+        '''
+
+        formato = formato or EXTENSOES.get(os.path.splitext(caminho)[1].lower())
+        if formato is None:
+            raise CommandError(f'Formato não reconhecido para {caminho}; informe --formato.')
+
+        # OSIS é lido em bytes para respeitar a codificação declarada no XML
+        if formato == 'osis':
+            with open(caminho, 'rb') as arquivo:
+                yield from ler_arquivo(arquivo, formato)
+        else:
+            with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+                yield from ler_arquivo(arquivo, formato)
@@ -0,0 +1,63 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Max
+
+from bible import snapshots
+from bible.exporters import exportar, registros_versao
+from bible.models import Biblia, Versiculo
+
+
+class Command(BaseCommand):
+    help = (
+        'Publica o snapshot de uma versão: arquivo binário imutável (nomeado pelo hash do conteúdo) com o '
+        'índice de referências, lido por mmap nas rotas de leitura, e a exportação NDJSON com variantes '
+        'pré-comprimidas (gzip e, se o pacote brotli estiver instalado, br). Qualquer edição posterior na '
+        'versão a despublica até a próxima execução.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('versoes', nargs='*', help='Versões a publicar (padrão: todas as ativas)')
+        parser.add_argument('--sem-compressao', action='store_true', help='Não gera as variantes .gz/.br')
+        parser.add_argument('--limpar', action='store_true', help='Remove arquivos que saíram do manifesto')
+
+    def handle(self, *args, **options):
+        biblias = Biblia.objects.order_by('id')
+        if options['versoes']:
+            biblias = biblias.filter(versao__in=options['versoes'])
+            ausentes = set(options['versoes']) - set(biblias.values_list('versao', flat=True))
+            if ausentes:
+                raise CommandError(f'Versões não encontradas: {", ".join(sorted(ausentes))}')
+
+        for biblia in biblias:
+            inicio = time.perf_counter()
+
+            try:
+                entrada = self.publicar(biblia, not options['sem_compressao'])
+            except snapshots.VersaoAlterada as erro:
+                raise CommandError(f'{erro} Execute novamente.')
+
+            self.stdout.write(self.style.SUCCESS(
+                f'"{biblia.versao}": {entrada["versiculos"]} versículos em {entrada["arquivo"]} '
+                f'({", ".join(entrada["variantes"])}) em {time.perf_counter() - inicio:.1f}s.'))
+
+        if options['limpar']:
+            for nome in snapshots.limpar():
+                self.stdout.write(f'Removido: {nome}')
+
+    def publicar(self, biblia, comprimir):
+        def conferir():
+            # Inclui os excluídos logicamente, que guardam a data da exclusão em updated_at
+            agregado = Versiculo.all_objects.filter(biblia_id=biblia.pk).aggregate(
+                ultima=Max('updated_at'), total=Count('pk'))
+            return agregado['ultima'], agregado['total']
+
+        validadores = conferir()
+
+        # Uma única leitura da versão para o snapshot e para a exportação
+        registros = list(registros_versao(biblia))
+        ndjson = ''.join(exportar(iter(registros))).encode('utf-8')
+
+        return snapshots.publicar(
+            biblia, ((Versiculo.chave(livro, capitulo, numero), texto) for livro, capitulo, numero, texto in registros),
+            ndjson, validadores, conferir, comprimir)
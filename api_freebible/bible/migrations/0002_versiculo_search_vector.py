@@ -0,0 +1,97 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:56
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import UnaccentExtension
+from django.db import migrations
+
+
+# Configurações de busca textual insensíveis a acentos (PT usa o stemmer português, EN o inglês)
+CONFIGURACOES_SQL = '''
+CREATE TEXT SEARCH CONFIGURATION pt_unaccent ( COPY = portuguese );
+ALTER TEXT SEARCH CONFIGURATION pt_unaccent
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+
+CREATE TEXT SEARCH CONFIGURATION en_unaccent ( COPY = english );
+ALTER TEXT SEARCH CONFIGURATION en_unaccent
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, english_stem;
+'''
+
+CONFIGURACOES_REVERSE_SQL = '''
+DROP TEXT SEARCH CONFIGURATION IF EXISTS pt_unaccent;
+DROP TEXT SEARCH CONFIGURATION IF EXISTS en_unaccent;
+'''
+
+# Mantém `search_vector` atualizado com a configuração correspondente à língua da Bíblia do versículo
+TRIGGERS_SQL = '''
+CREATE FUNCTION bible_config_busca(lingua varchar) RETURNS regconfig AS $$
+    SELECT CASE lingua WHEN 'EN' THEN 'en_unaccent' ELSE 'pt_unaccent' END::regconfig;
+$$ LANGUAGE sql STABLE;
+
+CREATE FUNCTION bible_versiculo_search_vector() RETURNS trigger AS $$
+DECLARE
+    lingua_biblia varchar;
+BEGIN
+    SELECT b.lingua INTO lingua_biblia
+      FROM bible_capitulo c
+      JOIN bible_livro l ON l.id = c.livro_id
+      JOIN bible_biblia b ON b.id = l.biblia_id
+     WHERE c.id = NEW.capitulo_id;
+
+    NEW.search_vector := to_tsvector(bible_config_busca(lingua_biblia), COALESCE(NEW.versiculo, ''));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bible_versiculo_search_vector
+    BEFORE INSERT OR UPDATE OF versiculo, capitulo_id ON bible_versiculo
+    FOR EACH ROW EXECUTE FUNCTION bible_versiculo_search_vector();
+
+CREATE FUNCTION bible_biblia_reindexar_busca() RETURNS trigger AS $$
+BEGIN
+    UPDATE bible_versiculo v
+       SET search_vector = to_tsvector(bible_config_busca(NEW.lingua), COALESCE(v.versiculo, ''))
+      FROM bible_capitulo c
+      JOIN bible_livro l ON l.id = c.livro_id
+     WHERE v.capitulo_id = c.id AND l.biblia_id = NEW.id;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER bible_biblia_reindexar_busca
+    AFTER UPDATE OF lingua ON bible_biblia
+    FOR EACH ROW WHEN (OLD.lingua IS DISTINCT FROM NEW.lingua)
+    EXECUTE FUNCTION bible_biblia_reindexar_busca();
+
+UPDATE bible_versiculo SET versiculo = versiculo;
+'''
+
+TRIGGERS_REVERSE_SQL = '''
+DROP TRIGGER IF EXISTS bible_biblia_reindexar_busca ON bible_biblia;
+DROP FUNCTION IF EXISTS bible_biblia_reindexar_busca();
+DROP TRIGGER IF EXISTS bible_versiculo_search_vector ON bible_versiculo;
+DROP FUNCTION IF EXISTS bible_versiculo_search_vector();
+DROP FUNCTION IF EXISTS bible_config_busca(varchar);
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0001_initial'),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunSQL(CONFIGURACOES_SQL, CONFIGURACOES_REVERSE_SQL),
+        migrations.AddField(
+            model_name='versiculo',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Vetor de Busca'),
+        ),
+        migrations.AddIndex(
+            model_name='versiculo',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='bible_vers_search_gin'),
+        ),
+        migrations.RunSQL(TRIGGERS_SQL, TRIGGERS_REVERSE_SQL),
+    ]
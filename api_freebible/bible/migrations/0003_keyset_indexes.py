@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0002_versiculo_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='capitulo',
+            index=models.Index(fields=['livro', 'numero', 'id'], name='bible_cap_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='versiculo',
+            index=models.Index(fields=['capitulo', 'numero', 'id'], name='bible_vers_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Ordem canônica dos livros (Livro.LIVRO_CHOICES no momento desta migração)
+LIVROS = [
+    'GN', 'EX', 'LV', 'NM', 'DT', 'JS', 'JZ', 'RT', '1SM', '2SM', '1RS', '2RS', '1CR', '2CR', 'ED', 'NE',
+    'ET', 'JB', 'SL', 'PV', 'EC', 'CT', 'IS', 'JR', 'LM', 'EZ', 'DN', 'OS', 'JL', 'AM', 'OB', 'JN',
+    'MQ', 'NA', 'HC', 'SF', 'AG', 'ZC', 'ML', 'MT', 'MC', 'LC', 'JO', 'AT', 'RM', '1CO', '2CO', 'GL',
+    'EF', 'FP', 'CL', '1TS', '2TS', '1TM', '2TM', 'TT', 'FM', 'HB', 'TG', '1PE', '2PE', '1JO', '2JO',
+    '3JO', 'JD', 'AP',
+]
+
+# Preenche a Bíblia e a chave canônica BBCCCVVV dos versículos já existentes
+REFERENCIAS_SQL = '''
+UPDATE bible_versiculo v
+   SET biblia_id = l.biblia_id,
+       referencia = array_position(ARRAY[%s]::varchar[], l.livro::varchar) * 1000000 + c.numero * 1000 + v.numero
+  FROM bible_capitulo c
+  JOIN bible_livro l ON l.id = c.livro_id
+ WHERE v.capitulo_id = c.id;
+''' % ', '.join("'%s'" % livro for livro in LIVROS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0003_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='versiculo',
+            name='biblia',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, to='bible.biblia', verbose_name='Bíblia'),
+        ),
+        migrations.AddField(
+            model_name='versiculo',
+            name='referencia',
+            field=models.PositiveIntegerField(editable=False, null=True, verbose_name='Referência Canônica'),
+        ),
+        migrations.RunSQL(REFERENCIAS_SQL, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='versiculo',
+            index=models.Index(fields=['biblia', 'referencia'], name='bible_vers_ref_idx'),
+        ),
+    ]
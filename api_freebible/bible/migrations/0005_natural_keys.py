@@ -0,0 +1,84 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:59
+
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def mesclar(model, campos, filhos):
+    '''
+    Mantém um registro por chave natural (o vivo de menor id, senão o de menor id), move os
+    filhos dos repetidos para ele e remove os repetidos
+    '''
+
+    gerente = model._base_manager
+    chaves = (gerente.filter(**{f'{campo}__isnull': False for campo in campos})
+              .values(*campos).annotate(total=Count('pk')).filter(total__gt=1).values(*campos))
+
+    for chave in chaves:
+        pks = list(gerente.filter(**chave)
+                   .order_by('-is_active', F('deleted_at').asc(nulls_first=True), 'pk')
+                   .values_list('pk', flat=True))
+        mantido, repetidos = pks[0], pks[1:]
+
+        for filho, campo in filhos:
+            filho._base_manager.filter(**{f'{campo}__in': repetidos}).update(**{campo: mantido})
+        gerente.filter(pk__in=repetidos).delete()
+
+
+def mesclar_repetidos(apps, schema_editor):
+    '''
+    Registros repetidos pela chave natural (criados pela antiga carga `create_*_if_not_exists`)
+    impediriam as restrições únicas: cada grupo é mesclado no registro mantido, de cima para baixo,
+    então livros mesclados que tinham o mesmo capítulo passam a ser capítulos repetidos do nível seguinte
+    '''
+
+    Biblia = apps.get_model('bible', 'Biblia')
+    Livro = apps.get_model('bible', 'Livro')
+    Capitulo = apps.get_model('bible', 'Capitulo')
+    Versiculo = apps.get_model('bible', 'Versiculo')
+
+    mesclar(Biblia, ['versao'], [(Livro, 'biblia'), (Versiculo, 'biblia')])
+    mesclar(Livro, ['biblia', 'livro'], [(Capitulo, 'livro')])
+    mesclar(Capitulo, ['livro', 'numero'], [(Versiculo, 'capitulo')])
+    mesclar(Versiculo, ['capitulo', 'numero'], [])
+
+    # As chaves estrangeiras são conferidas só no fim da transação; conferidas agora, o ALTER TABLE
+    # das restrições seguintes não encontra eventos pendentes nas tabelas alteradas
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        schema_editor.execute('SET CONSTRAINTS ALL DEFERRED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0004_versiculo_referencia'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='capitulo',
+            name='bible_cap_keyset_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='versiculo',
+            name='bible_vers_keyset_idx',
+        ),
+        migrations.RunPython(mesclar_repetidos, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='biblia',
+            constraint=models.UniqueConstraint(fields=('versao',), name='bible_biblia_versao_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='capitulo',
+            constraint=models.UniqueConstraint(fields=('livro', 'numero'), name='bible_cap_livro_numero_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='livro',
+            constraint=models.UniqueConstraint(fields=('biblia', 'livro'), name='bible_livro_biblia_livro_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='versiculo',
+            constraint=models.UniqueConstraint(fields=('capitulo', 'numero'), name='bible_vers_cap_numero_uniq'),
+        ),
+    ]
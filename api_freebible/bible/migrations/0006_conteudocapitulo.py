@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0005_natural_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteudoCapitulo',
+            fields=[
+                ('capitulo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='conteudo', serialize=False, to='bible.capitulo', verbose_name='Capítulo')),
+                ('versiculos', models.JSONField(verbose_name='Versículos')),
+            ],
+        ),
+    ]
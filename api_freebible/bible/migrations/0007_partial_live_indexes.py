@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0006_conteudocapitulo'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='versiculo',
+            name='bible_vers_ref_idx',
+        ),
+        migrations.AddIndex(
+            model_name='capitulo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['livro', 'numero'], name='bible_cap_vivo_chave_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='livro',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['biblia', 'id'], name='bible_livro_vivo_ord_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='livro',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['biblia', 'livro'], name='bible_livro_vivo_chave_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='versiculo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['biblia', 'referencia'], name='bible_vers_vivo_ref_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='versiculo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['capitulo', 'numero'], name='bible_vers_vivo_chave_idx'),
+        ),
+    ]
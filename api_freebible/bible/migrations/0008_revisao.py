@@ -0,0 +1,20 @@
+# Generated by Django 5.1.1 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0007_partial_live_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Revisao',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('valor', models.PositiveBigIntegerField(default=0, verbose_name='Revisão')),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 13:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0008_revisao'),
+    ]
+
+    # Os índices parciais da chave natural repetiam as colunas dos índices únicos das restrições
+    # (bible_*_uniq), que o planejador já usa nas mesmas consultas
+    operations = [
+        migrations.RemoveIndex(
+            model_name='livro',
+            name='bible_livro_vivo_chave_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='capitulo',
+            name='bible_cap_vivo_chave_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='versiculo',
+            name='bible_vers_vivo_chave_idx',
+        ),
+    ]
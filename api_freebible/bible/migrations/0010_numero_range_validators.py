@@ -0,0 +1,24 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:42
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0009_remove_duplicate_key_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='capitulo',
+            name='numero',
+            field=models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(999)], verbose_name='Número do Capítulo'),
+        ),
+        migrations.AlterField(
+            model_name='versiculo',
+            name='numero',
+            field=models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(999)], verbose_name='Número do Versículo'),
+        ),
+    ]
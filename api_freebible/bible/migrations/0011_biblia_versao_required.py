@@ -0,0 +1,29 @@
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def nomear_versoes(apps, schema_editor):
+    '''
+    Bíblias sem versão recebem um nome provisório único (`versao-<id>`), que pode ser trocado depois
+    '''
+
+    Biblia = apps.get_model('bible', 'Biblia')
+    for pk in Biblia._base_manager.filter(Q(versao__isnull=True) | Q(versao='')).values_list('pk', flat=True):
+        Biblia._base_manager.filter(pk=pk).update(versao=f'versao-{pk}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0010_numero_range_validators'),
+    ]
+
+    # A versão é a chave natural das rotas get_by_key: deixa de aceitar nulo e vazio
+    operations = [
+        migrations.RunPython(nomear_versoes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='biblia',
+            name='versao',
+            field=models.CharField(max_length=100, verbose_name='Autor'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.1 on 2026-10-18 10:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bible', '0011_biblia_versao_required'),
+    ]
+
+    # Índice parcial dos capítulos vivos para a listagem, a busca por livro e a chave natural (removido
+    # em 0009 junto com os índices repetidos): sem ele, o filtro dos vivos era aplicado linha a linha
+    operations = [
+        migrations.AddIndex(
+            model_name='capitulo',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['livro', 'numero'], name='bible_cap_vivo_chave_idx'),
+        ),
+    ]
@@ -1,25 +1,73 @@
 import uuid
 
-from django.db import models
-from user.models import BaseModel
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+from user.models import VIVOS, BaseModel
 
+from bible.cache import invalidar, tags_registros
 
-class Biblia(BaseModel):
+# Maior número de capítulo ou de versículo representável na chave canônica BBCCCVVV
+MAXIMO_NUMERO_CHAVE = 999
+
+
+class ReferenciaInvalida(ValueError):
+    '''
+    Referência bíblica que não pode ser interpretada (ou fora do intervalo da chave canônica)
+    '''
+
+
+class RegistroBiblico(BaseModel):
+    '''
+    Base dos modelos da Bíblia: cada gravação invalida as respostas em cache que dependem do registro
+    (inclusive `soft_delete` e `recover`, que passam por `save()`)
+    '''
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        # Estado anterior: cobre a posição antiga de um registro que muda de pai ou de chave natural
+        antes = tags_registros(type(self), [self.pk]) if self.pk else set()
+        super().save(*args, **kwargs)
+        invalidar(antes | tags_registros(type(self), [self.pk]))
+
+    @classmethod
+    def apos_exclusao_em_lote(cls, pks):
+        invalidar(tags_registros(cls, pks))
+
+
+class Biblia(RegistroBiblico):
 
     LINGUA_CHOICES = [
         ('PT', 'Português'),
         ('EN', 'Inglês'),
     ]
 
+    # Configurações de busca textual do Postgres (criadas na migração 0002) usadas por cada língua
+    CONFIG_BUSCA = {
+        'PT': 'pt_unaccent',
+        'EN': 'en_unaccent',
+    }
+
     code = models.UUIDField("Código uuid4", default=uuid.uuid4, editable=False)
     lingua = models.CharField('Linguagem', max_length=2, choices=LINGUA_CHOICES)
-    versao = models.CharField('Autor', max_length=100, null=True, blank=True)
+    versao = models.CharField('Autor', max_length=100)
+
+    class Meta:
+        constraints = [
+            # Chave natural usada nas rotas get_by_key (/{versao}/{livro}/{capitulo}/{versiculo})
+            models.UniqueConstraint(fields=['versao'], name='bible_biblia_versao_uniq'),
+        ]
 
     def __str__(self):
         return f'{self.versao}, {self.lingua}'
     
 
-class Livro(BaseModel):
+class Livro(RegistroBiblico):
 
     biblia = models.ForeignKey(Biblia, on_delete=models.CASCADE, verbose_name='Bíblia')
 
@@ -55,27 +103,264 @@ class Livro(BaseModel):
         ('V', 'Velho'),
     ]
 
+    # Posição canônica (1 a 66) de cada livro, na ordem de LIVRO_CHOICES
+    ORDEM = {codigo: posicao for posicao, (codigo, _) in enumerate(LIVRO_CHOICES, start=1)}
+
     livro = models.CharField('Livro', max_length=3, choices=LIVRO_CHOICES)
     testamento = models.CharField('Testamento', max_length=1, choices=TESTAMENTO_CHOICES)
 
+    class Meta:
+        indexes = [
+            # Índice parcial dos registros vivos (condição do BaseManager): ordenação da listagem
+            models.Index(fields=['biblia', 'id'], condition=VIVOS, name='bible_livro_vivo_ord_idx'),
+        ]
+        constraints = [
+            # Chave natural usada nas junções das rotas get_by_key/read (o índice único também as atende)
+            models.UniqueConstraint(fields=['biblia', 'livro'], name='bible_livro_biblia_livro_uniq'),
+        ]
+
     def __str__(self):
         return f'{self.biblia}, {self.livro}'
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.atualizar_chaves_versiculos()
+
+    def atualizar_chaves_versiculos(self):
+        '''
+        Recalcula a chave canônica dos versículos do livro (necessário se o código ou a Bíblia mudarem)
+        '''
+
+        numero_capitulo = Capitulo.all_objects.filter(pk=OuterRef('capitulo_id')).values('numero')
+        referencia = Livro.ORDEM[self.livro] * 1_000_000 + Subquery(numero_capitulo) * 1000 + F('numero')
+
+        alterados = list(Versiculo.all_objects
+            .filter(capitulo__livro=self)
+            .exclude(biblia_id=self.biblia_id, referencia=referencia)
+            .values_list('pk', flat=True))
+
+        if alterados:
+            Versiculo.all_objects.filter(pk__in=alterados).update(
+                biblia_id=self.biblia_id, referencia=referencia, updated_at=timezone.now())
+            invalidar(tags_registros(Versiculo, alterados))
   
 
-class Capitulo(BaseModel):
+class Capitulo(RegistroBiblico):
 
     livro = models.ForeignKey(Livro, on_delete=models.CASCADE, verbose_name='Livro')
     autor = models.CharField('Autor do Capítulo', max_length=100, null=True, blank=True)
-    numero = models.PositiveIntegerField('Número do Capítulo')
+    numero = models.PositiveIntegerField('Número do Capítulo',
+                                         validators=[MinValueValidator(1), MaxValueValidator(MAXIMO_NUMERO_CHAVE)])
+
+    class Meta:
+        indexes = [
+            # Índice parcial dos registros vivos (condição do BaseManager): a listagem, a busca por livro
+            # e a chave natural leem só capítulos vivos, sem filtrar linha a linha após o índice único
+            models.Index(fields=['livro', 'numero'], condition=VIVOS, name='bible_cap_vivo_chave_idx'),
+        ]
+        constraints = [
+            # Garante a chave natural também entre registros excluídos logicamente (usada pelos upserts)
+            models.UniqueConstraint(fields=['livro', 'numero'], name='bible_cap_livro_numero_uniq'),
+        ]
 
     def __str__(self):
         return f'{self.livro}, {self.numero}'
 
-class Versiculo(BaseModel):
+    def versiculos_compactos(self):
+        '''
+        Números e textos dos versículos do capítulo, a partir do conteúdo pré-calculado
+        '''
+
+        try:
+            return self.conteudo.versiculos
+        except ConteudoCapitulo.DoesNotExist:
+            return ConteudoCapitulo.construir(self).versiculos
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.atualizar_chaves_versiculos()
+
+    def atualizar_chaves_versiculos(self):
+        '''
+        Recalcula a chave canônica dos versículos do capítulo quando o número ou o livro mudam
+        '''
+
+        livro = Livro.all_objects.only('livro', 'biblia_id').get(pk=self.livro_id)
+        base = Versiculo.inicio_capitulo(livro.livro, self.numero)
+
+        alterados = list(Versiculo.all_objects
+            .filter(capitulo=self)
+            .exclude(biblia_id=livro.biblia_id, referencia=base + F('numero'))
+            .values_list('pk', flat=True))
+
+        if alterados:
+            Versiculo.all_objects.filter(pk__in=alterados).update(
+                biblia_id=livro.biblia_id, referencia=base + F('numero'), updated_at=timezone.now())
+            invalidar(tags_registros(Versiculo, alterados))
+
+class Versiculo(RegistroBiblico):
 
     capitulo = models.ForeignKey(Capitulo, on_delete=models.CASCADE, verbose_name='Capítulo')
-    numero = models.PositiveIntegerField('Número do Versículo')
+    numero = models.PositiveIntegerField('Número do Versículo',
+                                         validators=[MinValueValidator(1), MaxValueValidator(MAXIMO_NUMERO_CHAVE)])
     versiculo = models.TextField('Versículo', null=True, blank=True)
 
+    # Mantido pelo trigger `bible_versiculo_search_vector` no banco, com a configuração da língua da Bíblia
+    search_vector = SearchVectorField('Vetor de Busca', null=True, editable=False)
+
+    # Campos denormalizados a partir do capítulo, mantidos por `save()`: a Bíblia do versículo e a
+    # chave canônica BBCCCVVV (livro na ordem de LIVRO_CHOICES, capítulo e versículo)
+    biblia = models.ForeignKey(Biblia, on_delete=models.CASCADE, verbose_name='Bíblia', null=True, editable=False,
+                               db_index=False)  # Coberto pelo índice parcial (biblia, referencia)
+    referencia = models.PositiveIntegerField('Referência Canônica', null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='bible_vers_search_gin'),
+            # Índices parciais dos registros vivos (condição do BaseManager):
+            # leitura de intervalos de referências com uma única varredura de índice
+            models.Index(fields=['biblia', 'referencia'], condition=VIVOS, name='bible_vers_vivo_ref_idx'),
+        ]
+        constraints = [
+            # Garante a chave natural também entre registros excluídos logicamente (usada pelos upserts);
+            # o índice único atende a listagem, a busca por capítulo e a chave natural, com o filtro dos
+            # registros vivos aplicado às linhas lidas: um índice parcial com as mesmas colunas dobraria
+            # a escrita da maior tabela, e as leituras quentes (intervalos) usam bible_vers_vivo_ref_idx
+            models.UniqueConstraint(fields=['capitulo', 'numero'], name='bible_vers_cap_numero_uniq'),
+        ]
+
     def __str__(self):
-        return f'{self.capitulo}, {self.numero}'
\ No newline at end of file
+        return f'{self.capitulo}, {self.numero}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Guarda o capítulo carregado para invalidar também o conteúdo de origem se o versículo mudar de capítulo
+        instance._capitulo_original = instance.__dict__.get('capitulo_id')
+        return instance
+
+    @classmethod
+    def apos_exclusao_em_lote(cls, pks):
+        super().apos_exclusao_em_lote(pks)
+        ConteudoCapitulo.invalidar(cls.all_objects.filter(pk__in=pks).values('capitulo_id'))
+
+    @staticmethod
+    def inicio_capitulo(livro, capitulo):
+        '''
+        Chave BBCCC000, anterior à do primeiro versículo do capítulo (soma-se o número do versículo).
+        ReferenciaInvalida se o capítulo estiver fora de 1..999: o excedente invadiria o livro seguinte.
+        '''
+
+        if not 1 <= capitulo <= MAXIMO_NUMERO_CHAVE:
+            raise ReferenciaInvalida(f'Capítulo fora do intervalo 1-{MAXIMO_NUMERO_CHAVE}: {capitulo}.')
+
+        return Livro.ORDEM[livro] * 1_000_000 + capitulo * 1000
+
+    @staticmethod
+    def chave(livro, capitulo, numero):
+        '''
+        Chave canônica BBCCCVVV de um versículo (ex.: JO 3:16 -> 43003016).
+        ReferenciaInvalida se o capítulo ou o versículo estiverem fora de 1..999.
+        '''
+
+        if not 1 <= numero <= MAXIMO_NUMERO_CHAVE:
+            raise ReferenciaInvalida(f'Versículo fora do intervalo 1-{MAXIMO_NUMERO_CHAVE}: {numero}.')
+
+        return Versiculo.inicio_capitulo(livro, capitulo) + numero
+
+    def save(self, *args, **kwargs):
+        self.atualizar_chave()
+        super().save(*args, **kwargs)
+        ConteudoCapitulo.invalidar({self.capitulo_id, getattr(self, '_capitulo_original', None)} - {None})
+
+    def atualizar_chave(self):
+        '''
+        Preenche os campos denormalizados a partir do capítulo e do livro
+        '''
+
+        capitulo = Capitulo.all_objects.select_related('livro').only(
+            'numero', 'livro__livro', 'livro__biblia_id').get(pk=self.capitulo_id)
+
+        self.biblia_id = capitulo.livro.biblia_id
+        self.referencia = self.chave(capitulo.livro.livro, capitulo.numero, self.numero)
+
+
+class ConteudoCapitulo(models.Model):
+    '''
+    Conteúdo pré-calculado de um capítulo para leitura: lista compacta de [número, texto] dos versículos ativos.
+
+    É descartado sempre que um versículo do capítulo muda e reconstruído na próxima leitura.
+    '''
+
+    capitulo = models.OneToOneField(Capitulo, on_delete=models.CASCADE, primary_key=True,
+                                    related_name='conteudo', verbose_name='Capítulo')
+    versiculos = models.JSONField('Versículos')
+
+    def __str__(self):
+        return f'{self.capitulo_id}'
+
+    @classmethod
+    def construir(cls, capitulo):
+        '''
+        Monta e armazena o conteúdo do capítulo a partir dos versículos ativos.
+
+        A montagem bloqueia a linha do capítulo, como `invalidar`: uma gravação concorrente dos
+        versículos descarta o conteúdo só depois de ele ser gravado, e um conteúdo montado com os
+        versículos antigos não sobrevive à invalidação. Com o capítulo bloqueado por uma gravação em
+        curso, o conteúdo é montado sem ser armazenado.
+        '''
+
+        with transaction.atomic():
+            livre = Capitulo.all_objects.select_for_update(no_key=True, skip_locked=True).filter(pk=capitulo.pk)
+            armazenar = bool(list(livre.values_list('pk', flat=True)))
+
+            versiculos = [
+                [numero, texto] for numero, texto in
+                Versiculo.objects.filter(capitulo_id=capitulo.pk).order_by('numero').values_list('numero', 'versiculo')
+            ]
+
+            if not armazenar:
+                return cls(capitulo_id=capitulo.pk, versiculos=versiculos)
+
+            conteudo, _ = cls.objects.update_or_create(capitulo_id=capitulo.pk, defaults={'versiculos': versiculos})
+
+        return conteudo
+
+    @classmethod
+    def invalidar(cls, capitulos):
+        '''
+        Descarta o conteúdo dos capítulos informados (ids ou subconsulta de ids), bloqueando antes
+        as linhas dos capítulos até o fim da transação da gravação (ver `construir`)
+        '''
+
+        with transaction.atomic():
+            bloqueio = Capitulo.all_objects.select_for_update(no_key=True).filter(pk__in=capitulos).order_by('pk')
+            list(bloqueio.values_list('pk', flat=True))
+            cls.objects.filter(capitulo_id__in=capitulos).delete()
+
+
+class Revisao(models.Model):
+    '''
+    Revisão dos dados da Bíblia: contador em uma única linha, avançado após o commit das gravações
+    (bible.cache.invalidar). Os workers conferem o corpus em memória por ele, sem agregar as tabelas.
+    '''
+
+    valor = models.PositiveBigIntegerField('Revisão', default=0)
+
+    def __str__(self):
+        return f'{self.valor}'
+
+    @classmethod
+    def atual(cls):
+        return cls.objects.filter(pk=1).values_list('valor', flat=True).first() or 0
+
+    @classmethod
+    def avancar(cls):
+        '''
+        Avança a revisão e retorna o valor atual (cria a linha na primeira gravação)
+        '''
+
+        if not cls.objects.filter(pk=1).update(valor=F('valor') + 1):
+            cls.objects.get_or_create(pk=1, defaults={'valor': 1})
+
+        return cls.atual()
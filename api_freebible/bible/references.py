@@ -0,0 +1,73 @@
+import re
+
+# ReferenciaInvalida fica em bible.models (levantada também por Versiculo.chave) e é importada pelas views daqui
+from bible.models import MAXIMO_NUMERO_CHAVE, Livro, ReferenciaInvalida, Versiculo
+
+# Referências no formato "LIVRO CAP[:VERS][-[LIVRO] CAP[:VERS]]", ex.: "GN 1", "GN 1:1-31", "JO 3:16-4:2", "MT 28-MC 1:8"
+REFERENCIA_RE = re.compile(
+    r'^\s*(?P<livro>[1-3]?[A-Za-z]+)\.?\s*(?P<capitulo>\d{1,3})(?::(?P<versiculo>\d{1,3}))?'
+    r'(?:\s*-\s*(?:(?P<livro_fim>[1-3]?[A-Za-z]+)\.?\s*)?(?P<fim>\d{1,3})(?::(?P<versiculo_fim>\d{1,3}))?)?\s*$'
+)
+
+# Maior número de versículo representável na chave BBCCCVVV (usado como fim de capítulo inteiro)
+ULTIMO_VERSICULO = MAXIMO_NUMERO_CHAVE
+
+
+def codigo_livro(texto):
+    '''
+    Normaliza e valida o código do livro (ex.: "jo" -> "JO")
+    '''
+
+    codigo = texto.upper()
+    if codigo not in Livro.ORDEM:
+        raise ReferenciaInvalida(f'Livro desconhecido: {texto}.')
+
+    return codigo
+
+
+def interpretar_referencia(texto):
+    '''
+    Converte uma referência textual no intervalo fechado de chaves canônicas (inicio, fim).
+
+    Um capítulo sem versículo abrange o capítulo inteiro ("GN 1" ou "GN 1-3"); depois de um
+    versículo, um número isolado no fim é outro versículo do mesmo capítulo ("GN 1:1-31").
+    '''
+
+    encontrado = REFERENCIA_RE.match(texto or '')
+    if not encontrado:
+        raise ReferenciaInvalida(f'Referência inválida: {texto}.')
+
+    livro = codigo_livro(encontrado['livro'])
+    capitulo = int(encontrado['capitulo'])
+    versiculo = encontrado['versiculo']
+
+    inicio = Versiculo.chave(livro, capitulo, int(versiculo)) if versiculo else Versiculo.inicio_capitulo(livro, capitulo)
+
+    if encontrado['fim'] is None:
+        # Referência única: um versículo ou um capítulo inteiro
+        fim = Versiculo.chave(livro, capitulo, int(versiculo) if versiculo else ULTIMO_VERSICULO)
+    elif encontrado['livro_fim'] or encontrado['versiculo_fim'] or not versiculo:
+        # Fim com capítulo ("JO 3:16-4:2", "GN 1-3", "MT 28-MC 1:8")
+        livro_fim = codigo_livro(encontrado['livro_fim']) if encontrado['livro_fim'] else livro
+        versiculo_fim = encontrado['versiculo_fim']
+        fim = Versiculo.chave(livro_fim, int(encontrado['fim']),
+                              int(versiculo_fim) if versiculo_fim else ULTIMO_VERSICULO)
+    else:
+        # Fim com apenas o versículo, no mesmo capítulo ("GN 1:1-31")
+        fim = Versiculo.chave(livro, capitulo, int(encontrado['fim']))
+
+    if fim < inicio:
+        raise ReferenciaInvalida(f'O fim da referência é anterior ao início: {texto}.')
+
+    return inicio, fim
+
+
+def decompor_chave(chave):
+    '''
+    Operação inversa de `Versiculo.chave`: retorna (livro, capitulo, versiculo)
+    '''
+
+    ordem, resto = divmod(chave, 1_000_000)
+    capitulo, versiculo = divmod(resto, 1000)
+
+    return Livro.LIVRO_CHOICES[ordem - 1][0], capitulo, versiculo
@@ -0,0 +1,51 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Case, F, FloatField, Q, When
+
+from bible.models import Biblia
+
+# Quantidade padrão e máxima de resultados (top-k) retornados pela busca textual
+TOP_K_PADRAO = 20
+TOP_K_MAXIMO = 100
+
+
+def limite_top_k(valor):
+    '''
+    Converte o parâmetro `limite` da requisição em um top-k válido
+    '''
+
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        return TOP_K_PADRAO
+
+    return max(1, min(limite, TOP_K_MAXIMO))
+
+
+def buscar_versiculos(queryset, termo, linguas=None, limite=TOP_K_PADRAO):
+    '''
+    Busca textual ranqueada sobre o `search_vector` dos versículos.
+
+    O termo é interpretado com a configuração de cada língua (a mesma usada para indexar
+    os versículos daquela língua), de forma que a consulta usa o índice GIN e o stemming correto.
+    '''
+
+    condicoes = Q()
+    ranks = []
+
+    for lingua, config in Biblia.CONFIG_BUSCA.items():
+        if linguas and lingua not in linguas:
+            continue
+
+        consulta = SearchQuery(termo, config=config, search_type='websearch')
+        condicoes |= Q(capitulo__livro__biblia__lingua=lingua, search_vector=consulta)
+        ranks.append(When(capitulo__livro__biblia__lingua=lingua, then=SearchRank(F('search_vector'), consulta)))
+
+    if not ranks:
+        return queryset.none()
+
+    return (
+        queryset
+        .filter(condicoes)
+        .annotate(rank=Case(*ranks, output_field=FloatField()))
+        .order_by('-rank', 'id')[:limite]
+    )
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from api_freebible.serializers import ChaveUnicaMixin, ValoresSerializer
 from bible.models import Biblia
 
 # Serializer base para manipulação geral do modelo Biblia
@@ -19,8 +21,15 @@ class BibliaSerializer(serializers.ModelSerializer):
             'is_active'          # Indica se está ativo ou excluído logicamente
         )
 
+# Serializer das ações de leitura a partir de values(), com a mesma saída do BibliaSerializer
+class BibliaValoresSerializer(ValoresSerializer):
+    """
+    Serializer somente leitura das listagens e buscas, sem instâncias do modelo.
+    """
+    serializer_class = BibliaSerializer
+
 # Serializer para criação de uma versão da Bíblia
-class BibliaCreateSerializer(serializers.ModelSerializer):
+class BibliaCreateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para criação de uma versão da Bíblia.
     """
@@ -36,7 +45,7 @@ class BibliaCreateSerializer(serializers.ModelSerializer):
         return biblia
 
 # Serializer para atualização de uma versão da Bíblia
-class BibliaUpdateSerializer(serializers.ModelSerializer):
+class BibliaUpdateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para atualização de uma versão da Bíblia.
     """
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from api_freebible.serializers import ChaveUnicaMixin, ValoresSerializer
 from bible.models import Livro
 
 # Serializer base para manipulação geral do modelo Livro
@@ -19,8 +21,15 @@ class LivroSerializer(serializers.ModelSerializer):
             'is_active'          # Indica se está ativo ou excluído logicamente
         )
 
+# Serializer das ações de leitura a partir de values(), com a mesma saída do LivroSerializer
+class LivroValoresSerializer(ValoresSerializer):
+    """
+    Serializer somente leitura das listagens e buscas, sem instâncias do modelo.
+    """
+    serializer_class = LivroSerializer
+
 # Serializer para criação de uma versão da Bíblia
-class LivroCreateSerializer(serializers.ModelSerializer):
+class LivroCreateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para criação de uma versão da Bíblia.
     """
@@ -36,7 +45,7 @@ class LivroCreateSerializer(serializers.ModelSerializer):
         return livro
 
 # Serializer para atualização de uma versão da Bíblia
-class LivroUpdateSerializer(serializers.ModelSerializer):
+class LivroUpdateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para atualização de uma versão da Bíblia.
     """
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from api_freebible.serializers import ChaveUnicaMixin, ValoresSerializer
 from bible.models import Capitulo
 
 # Serializer base para manipulação geral do modelo Capitulo
@@ -19,8 +21,15 @@ class CapituloSerializer(serializers.ModelSerializer):
             'is_active'          # Indica se está ativo ou excluído logicamente
         )
 
+# Serializer das ações de leitura a partir de values(), com a mesma saída do CapituloSerializer
+class CapituloValoresSerializer(ValoresSerializer):
+    """
+    Serializer somente leitura das listagens e buscas, sem instâncias do modelo.
+    """
+    serializer_class = CapituloSerializer
+
 # Serializer para criação de uma versão da Bíblia
-class CapituloCreateSerializer(serializers.ModelSerializer):
+class CapituloCreateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para criação de uma versão da Bíblia.
     """
@@ -36,7 +45,7 @@ class CapituloCreateSerializer(serializers.ModelSerializer):
         return chapter
 
 # Serializer para atualização de uma versão da Bíblia
-class CapituloUpdateSerializer(serializers.ModelSerializer):
+class CapituloUpdateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para atualização de uma versão da Bíblia.
     """
@@ -51,4 +60,14 @@ class CapituloUpdateSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+# Serializer de um item das ações em lote (validado sem consultas ao banco)
+class CapituloLoteSerializer(serializers.Serializer):
+    """
+    Serializer de um capítulo enviado para gravação em lote (upsert por livro e número).
+    """
+    livro = serializers.IntegerField(min_value=1)                                        # ID do livro
+    numero = serializers.IntegerField(min_value=1, max_value=999)                        # Número do capítulo
+    autor = serializers.CharField(max_length=100, allow_blank=True, allow_null=True,
+                                  required=False, default=None)                         # Autor (substitui o atual)
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from api_freebible.serializers import ChaveUnicaMixin, ValoresSerializer
 from bible.models import Versiculo
 
 # Serializer base para manipulação geral do modelo Versiculo
@@ -13,14 +15,40 @@ class VersiculoSerializer(serializers.ModelSerializer):
             'capitulo',
             'numero',
             'versiculo',
+            'biblia',            # Bíblia do versículo (denormalizada a partir do capítulo)
+            'referencia',        # Chave canônica BBCCCVVV
             'created_at',        # Data de criação (herdado do BaseModel)
             'updated_at',        # Data de última atualização (herdado do BaseModel)
             'deleted_at',        # Data de exclusão lógica (herdado do BaseModel)
             'is_active'          # Indica se está ativo ou excluído logicamente
         )
 
+# Serializer para resultados da busca textual, com a relevância de cada versículo
+class VersiculoBuscaSerializer(VersiculoSerializer):
+    """
+    Serializer dos resultados ranqueados da busca textual de versículos.
+    """
+    rank = serializers.FloatField(read_only=True)  # Relevância calculada pelo Postgres (ts_rank)
+
+    class Meta(VersiculoSerializer.Meta):
+        fields = VersiculoSerializer.Meta.fields + ('rank',)
+
+# Serializer das ações de leitura a partir de values(), com a mesma saída do VersiculoSerializer
+class VersiculoValoresSerializer(ValoresSerializer):
+    """
+    Serializer somente leitura das listagens e buscas, sem instâncias do modelo.
+    """
+    serializer_class = VersiculoSerializer
+
+# Serializer dos resultados da busca textual a partir de values() (inclui a anotação `rank`)
+class VersiculoBuscaValoresSerializer(ValoresSerializer):
+    """
+    Serializer somente leitura dos resultados ranqueados da busca textual.
+    """
+    serializer_class = VersiculoBuscaSerializer
+
 # Serializer para criação de uma versão da Bíblia
-class VersiculoCreateSerializer(serializers.ModelSerializer):
+class VersiculoCreateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para criação de uma versão da Bíblia.
     """
@@ -36,7 +64,7 @@ class VersiculoCreateSerializer(serializers.ModelSerializer):
         return versicle
 
 # Serializer para atualização de uma versão da Bíblia
-class VersiculoUpdateSerializer(serializers.ModelSerializer):
+class VersiculoUpdateSerializer(ChaveUnicaMixin, serializers.ModelSerializer):
     """
     Serializer para atualização de uma versão da Bíblia.
     """
@@ -51,4 +79,13 @@ class VersiculoUpdateSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+# Serializer de um item das ações em lote (validado sem consultas ao banco)
+class VersiculoLoteSerializer(serializers.Serializer):
+    """
+    Serializer de um versículo enviado para gravação em lote (upsert por capítulo e número).
+    """
+    capitulo = serializers.IntegerField(min_value=1)                                     # ID do capítulo
+    numero = serializers.IntegerField(min_value=1, max_value=999)                        # Número do versículo
+    versiculo = serializers.CharField(allow_blank=True, allow_null=True)                 # Texto do versículo (obrigatório: substitui o atual)
@@ -0,0 +1,313 @@
+import fcntl
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # Está no requirements.txt; em uma instalação parcial, sem a variante .br
+    brotli = None
+
+# Snapshots publicados de cada versão: arquivos imutáveis, nomeados pelo hash do conteúdo, lidos
+# por mmap sem cópia. Layout do arquivo .bin (inteiros little-endian):
+#
+#     cabeçalho   MAGICO (8 bytes), total de versículos (uint32), reservado (uint32)
+#     referencias uint32[total]        chaves BBCCCVVV em ordem crescente
+#     offsets     uint32[total + 1]    início de cada texto no bloco de textos
+#     textos      UTF-8 concatenados
+#
+# O manifesto (manifest.json) lista as versões publicadas. Qualquer gravação na versão a remove do
+# manifesto (bible.cache.invalidar), e a leitura volta ao ORM até a próxima publicação.
+
+MAGICO = b'FBSNAP01'
+CABECALHO = struct.Struct('<8sII')
+MANIFESTO = 'manifest.json'
+
+# Variantes pré-comprimidas da exportação NDJSON: Content-Encoding -> extensão
+VARIANTES = {'br': '.ndjson.br', 'gzip': '.ndjson.gz', 'identity': '.ndjson'}
+
+# Manifesto em memória (recarregado quando o arquivo muda) e snapshots já mapeados
+_estado = {'mtime': None, 'manifesto': {}, 'abertos': {}}
+
+
+class SnapshotInvalido(ValueError):
+    '''
+    Arquivo que não está no formato de snapshot esperado
+    '''
+
+
+class VersaoAlterada(RuntimeError):
+    '''
+    A versão foi editada durante a publicação; o snapshot gerado não é publicado
+    '''
+
+
+def diretorio():
+    return str(settings.SNAPSHOT_DIR)
+
+
+def caminho(nome):
+    return os.path.join(diretorio(), nome)
+
+
+class Indice:
+    '''
+    Busca binária nas referências e fatias do bloco de textos de um buffer no layout acima (um arquivo
+    mapeado em memória ou um `bytes` montado no próprio processo, ver bible.corpus)
+    '''
+
+    def __init__(self, buffer, hash=None, gerado_em=None, origem='memória'):
+        self.hash = hash
+        self.gerado_em = gerado_em
+
+        memoria = memoryview(buffer)
+        magico, total, _ = CABECALHO.unpack_from(memoria)
+        if magico != MAGICO:
+            raise SnapshotInvalido(f'Arquivo de snapshot inválido: {origem}.')
+
+        inicio = CABECALHO.size
+        self.total = total
+        self.referencias = memoria[inicio:inicio + 4 * total].cast('I')
+        self.offsets = memoria[inicio + 4 * total:inicio + 8 * total + 4].cast('I')
+        self.textos = memoria[inicio + 8 * total + 4:]
+
+    def texto_posicao(self, indice):
+        # Texto vazio volta como nulo, como no banco
+        return str(self.textos[self.offsets[indice]:self.offsets[indice + 1]], 'utf-8') or None
+
+    def texto(self, referencia):
+        '''
+        Texto do versículo pela chave canônica; KeyError se o versículo não existir
+        '''
+
+        indice = bisect_left(self.referencias, referencia)
+        if indice == self.total or self.referencias[indice] != referencia:
+            raise KeyError(referencia)
+
+        return self.texto_posicao(indice)
+
+    def intervalo(self, inicio, fim):
+        '''
+        Versículos com referência no intervalo fechado [inicio, fim], como (referencia, texto)
+        '''
+
+        primeiro = bisect_left(self.referencias, inicio)
+        ultimo = bisect_right(self.referencias, fim, lo=primeiro)
+
+        for indice in range(primeiro, ultimo):
+            yield self.referencias[indice], self.texto_posicao(indice)
+
+
+class Snapshot(Indice):
+    '''
+    Snapshot publicado, mapeado em memória (as páginas são compartilhadas entre os processos pelo sistema)
+    '''
+
+    def __init__(self, arquivo, entrada):
+        self.entrada = entrada
+
+        with open(arquivo, 'rb') as origem:
+            self.mmap = mmap.mmap(origem.fileno(), 0, access=mmap.ACCESS_READ)
+
+        gerado_em = datetime.fromisoformat(entrada['ultima']) if entrada.get('ultima') else None
+        super().__init__(self.mmap, entrada['hash'], gerado_em, arquivo)
+
+
+## Manifesto
+
+def ler_manifesto():
+    '''
+    Manifesto atual; o arquivo só é relido quando muda (um `stat` por chamada)
+    '''
+
+    try:
+        mtime = os.stat(caminho(MANIFESTO)).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+
+    if mtime != _estado['mtime']:
+        manifesto = {}
+        if mtime is not None:
+            with open(caminho(MANIFESTO), encoding='utf-8') as arquivo:
+                manifesto = json.load(arquivo)
+
+        # Snapshots que saíram do manifesto deixam de ser referenciados (o mmap é liberado pelo coletor)
+        arquivos = {entrada['arquivo'] for entrada in manifesto.values()}
+        abertos = {nome: snapshot for nome, snapshot in _estado['abertos'].items() if nome in arquivos}
+
+        _estado.update(mtime=mtime, manifesto=manifesto, abertos=abertos)
+
+    return _estado['manifesto']
+
+
+def alterar_manifesto(alteracao):
+    '''
+    Aplica `alteracao(manifesto)` sob trava de arquivo e grava de forma atômica (os.replace)
+    '''
+
+    os.makedirs(diretorio(), exist_ok=True)
+
+    with open(caminho(MANIFESTO + '.lock'), 'w') as trava:
+        fcntl.flock(trava, fcntl.LOCK_EX)
+
+        try:
+            with open(caminho(MANIFESTO), encoding='utf-8') as arquivo:
+                manifesto = json.load(arquivo)
+        except FileNotFoundError:
+            manifesto = {}
+
+        if alteracao(manifesto) is False:
+            return
+
+        gravar_atomico(MANIFESTO, json.dumps(manifesto, ensure_ascii=False, indent=2).encode('utf-8'))
+
+
+def gravar_atomico(nome, conteudo):
+    descritor, temporario = tempfile.mkstemp(dir=diretorio(), prefix='.tmp-')
+    with os.fdopen(descritor, 'wb') as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, caminho(nome))
+
+
+def publicado(biblia_id=None, versao=None):
+    '''
+    Snapshot publicado da versão (por id ou nome), ou None se a versão não estiver publicada
+    '''
+
+    for chave, entrada in ler_manifesto().items():
+        if str(biblia_id) == chave or (versao is not None and entrada['versao'] == versao):
+            break
+    else:
+        return None
+
+    snapshot = _estado['abertos'].get(entrada['arquivo'])
+    if snapshot is None:
+        try:
+            snapshot = Snapshot(caminho(entrada['arquivo']), entrada)
+        except (OSError, SnapshotInvalido):
+            return None
+        _estado['abertos'][entrada['arquivo']] = snapshot
+
+    return snapshot
+
+
+def despublicar(biblias):
+    '''
+    Remove as versões do manifesto (os arquivos são imutáveis e permanecem até a limpeza)
+    '''
+
+    chaves = {str(pk) for pk in biblias}
+    if not chaves & set(ler_manifesto()):
+        return
+
+    def remover(manifesto):
+        if not chaves & set(manifesto):
+            return False
+        for chave in chaves:
+            manifesto.pop(chave, None)
+
+    alterar_manifesto(remover)
+
+
+## Publicação
+
+def montar(registros):
+    '''
+    Monta o conteúdo binário do snapshot a partir de (referencia, texto) em ordem crescente
+    '''
+
+    referencias, offsets, textos = array('I'), array('I', [0]), bytearray()
+
+    for referencia, texto in registros:
+        referencias.append(referencia)
+        textos += (texto or '').encode('utf-8')
+        offsets.append(len(textos))
+
+    if sys.byteorder != 'little':
+        referencias.byteswap()
+        offsets.byteswap()
+
+    return CABECALHO.pack(MAGICO, len(referencias), 0) + referencias.tobytes() + offsets.tobytes() + bytes(textos)
+
+
+def publicar(biblia, registros, ndjson, validadores, conferir, comprimir=True):
+    '''
+    Grava o snapshot e as variantes NDJSON com nomes pelo hash do conteúdo e publica a versão no manifesto.
+
+    `validadores` são o máximo de updated_at e a quantidade de registros da versão lidos antes da
+    exportação; `conferir()` os recalcula sob a trava do manifesto, a mesma usada por `despublicar`.
+    Uma edição concorrente ou é detectada ali, ou despublica a versão depois da inclusão.
+    '''
+
+    os.makedirs(diretorio(), exist_ok=True)
+
+    conteudo = montar(registros)
+    resumo = hashlib.sha256(conteudo).hexdigest()[:16]
+    base = f'biblia-{biblia.pk}.{resumo}'
+
+    # Mesmo hash, mesmo conteúdo: arquivos já existentes não são regravados
+    arquivos = {'bin': base + '.bin', **{codificacao: base + extensao for codificacao, extensao in VARIANTES.items()}}
+
+    if not os.path.exists(caminho(arquivos['bin'])):
+        gravar_atomico(arquivos['bin'], conteudo)
+        gravar_atomico(arquivos['identity'], ndjson)
+
+    variantes = ['identity']
+    if comprimir:
+        if not os.path.exists(caminho(arquivos['gzip'])):
+            gravar_atomico(arquivos['gzip'], gzip.compress(ndjson, compresslevel=9, mtime=0))
+        variantes.append('gzip')
+
+        if brotli is not None:
+            if not os.path.exists(caminho(arquivos['br'])):
+                gravar_atomico(arquivos['br'], brotli.compress(ndjson, quality=11))
+            variantes.append('br')
+
+    ultima, total = validadores
+    entrada = {
+        'versao': biblia.versao,
+        'hash': resumo,
+        'arquivo': arquivos['bin'],
+        'versiculos': CABECALHO.unpack_from(conteudo)[1],
+        'total': total,
+        'ultima': ultima.isoformat() if ultima else None,
+        'variantes': {codificacao: arquivos[codificacao] for codificacao in variantes},
+    }
+
+    def incluir(manifesto):
+        if conferir() != validadores:
+            raise VersaoAlterada(f'A versão "{biblia.versao}" foi alterada durante a publicação.')
+        manifesto[str(biblia.pk)] = entrada
+
+    alterar_manifesto(incluir)
+    return entrada
+
+
+def limpar():
+    '''
+    Remove os arquivos que não são referenciados pelo manifesto; retorna os nomes removidos
+    '''
+
+    manifesto = ler_manifesto()
+    em_uso = {MANIFESTO, MANIFESTO + '.lock'}
+    for entrada in manifesto.values():
+        em_uso.add(entrada['arquivo'])
+        em_uso.update(entrada['variantes'].values())
+
+    removidos = []
+    for nome in os.listdir(diretorio()):
+        if nome.startswith('biblia-') and nome not in em_uso:
+            os.remove(caminho(nome))
+            removidos.append(nome)
+
+    return removidos
@@ -0,0 +1,204 @@
+import math
+import random
+from itertools import accumulate
+
+from django.db import transaction
+
+from bible.bulk import copiar_versiculos, upsert_capitulos, upsert_livros
+from bible.models import Biblia, Capitulo, Livro, Versiculo
+
+# Corpus sintético para testes de carga e benchmarks: versões completas com o formato de uma Bíblia
+# real (66 livros, quantidade real de capítulos e de versículos por livro, 31.102 versículos por versão)
+# e textos gerados, com distribuição de tamanhos próxima à de uma tradução real.
+#
+# Tudo é derivado de `random.Random` semeado com (semente, versão): a mesma semente gera sempre os
+# mesmos textos e as mesmas exclusões lógicas, e cada versão independe das demais (gerar 3 ou 10
+# versões produz as 3 primeiras iguais). A divisão dos versículos em capítulos depende apenas da
+# versão: com outra semente, a regravação substitui os textos das mesmas chaves (capitulo, numero),
+# sem deixar versículos de uma estrutura anterior.
+
+# (capítulos, versículos) de cada livro, na ordem de Livro.LIVRO_CHOICES (contagens da tradição KJV)
+ESTRUTURA = {
+    'GN': (50, 1533), 'EX': (40, 1213), 'LV': (27, 859), 'NM': (36, 1288), 'DT': (34, 959),
+    'JS': (24, 658), 'JZ': (21, 618), 'RT': (4, 85), '1SM': (31, 810), '2SM': (24, 695),
+    '1RS': (22, 816), '2RS': (25, 719), '1CR': (29, 942), '2CR': (36, 822), 'ED': (10, 280),
+    'NE': (13, 406), 'ET': (10, 167), 'JB': (42, 1070), 'SL': (150, 2461), 'PV': (31, 915),
+    'EC': (12, 222), 'CT': (8, 117), 'IS': (66, 1292), 'JR': (52, 1364), 'LM': (5, 154),
+    'EZ': (48, 1273), 'DN': (12, 357), 'OS': (14, 197), 'JL': (3, 73), 'AM': (9, 146),
+    'OB': (1, 21), 'JN': (4, 48), 'MQ': (7, 105), 'NA': (3, 47), 'HC': (3, 56),
+    'SF': (3, 53), 'AG': (2, 38), 'ZC': (14, 211), 'ML': (4, 55),
+    'MT': (28, 1071), 'MC': (16, 678), 'LC': (24, 1151), 'JO': (21, 879), 'AT': (28, 1007),
+    'RM': (16, 433), '1CO': (16, 437), '2CO': (13, 257), 'GL': (6, 149), 'EF': (6, 155),
+    'FP': (4, 104), 'CL': (4, 95), '1TS': (5, 89), '2TS': (3, 47), '1TM': (6, 113),
+    '2TM': (4, 83), 'TT': (3, 46), 'FM': (1, 25), 'HB': (13, 303), 'TG': (5, 108),
+    '1PE': (5, 105), '2PE': (3, 61), '1JO': (5, 105), '2JO': (1, 13), '3JO': (1, 14),
+    'JD': (1, 25), 'AP': (22, 404),
+}
+
+# Maior capítulo real (Salmo 119)
+MAXIMO_VERSICULOS_CAPITULO = 176
+
+# Palavras por versículo: log-normal com mediana de 26 palavras (cerca de 125 caracteres, média de
+# 140), entre o versículo mais curto ("Jesus chorou.") e os mais longos (Ester 8:9, cerca de 90 palavras)
+MEDIANA_PALAVRAS = 26
+DISPERSAO_PALAVRAS = 0.45
+PALAVRAS_MINIMO = 2
+PALAVRAS_MAXIMO = 90
+
+# Vocabulário de cada língua, do mais ao menos frequente; as palavras são sorteadas com peso
+# 1/(posição + ZIPF_DESLOCAMENTO) (lei de Zipf-Mandelbrot, que atenua o excesso de artigos e
+# preposições), então a busca textual encontra termos comuns e raros como em um texto real
+ZIPF_DESLOCAMENTO = 3
+
+VOCABULARIO = {
+    'PT': (
+        'e o a de que os não ao se para as do da disse senhor deus ele eles porque seu sua com '
+        'todo povo filhos terra rei dia israel casa homem pai coração mão palavra filho vós nós '
+        'eis então assim sobre diante contra nome caminho glória céu vida cidade servo espírito '
+        'fogo água pão sangue morte luz trevas paz fé amor graça verdade justiça juízo pecado '
+        'santo altar templo monte mar rio campo ovelhas pastor profeta sacerdote anjo povos '
+        'nações reino trono poder força sabedoria lei mandamento aliança promessa bênção '
+        'maldição escravo estrangeiro viúva órfão pobre rico ouro prata bronze pedra madeira '
+        'tenda porta muro guerra espada escudo carro cavalo camelo jumento vinha figueira '
+        'oliveira trigo cevada colheita semente fruto árvore deserto caverna tribo geração '
+        'cântico oração jejum lamento alegria temor misericórdia salvação redenção perdão '
+        'arrependimento ressurreição eternidade'
+    ).split(),
+    'EN': (
+        'the and of to that in he shall unto for i his a lord they be is him not them it with '
+        'all thou thy was which my god said me have will people land king house day son israel '
+        'hand word father heart children behold upon before against name way glory heaven life '
+        'city servant spirit fire water bread blood death light darkness peace faith love grace '
+        'truth righteousness judgment sin holy altar temple mountain sea river field sheep '
+        'shepherd prophet priest angel nations kingdom throne power strength wisdom law '
+        'commandment covenant promise blessing curse stranger widow fatherless poor rich gold '
+        'silver brass stone wood tent gate wall war sword shield chariot horse camel vineyard '
+        'fig olive wheat barley harvest seed fruit tree wilderness cave tribe generation song '
+        'prayer fasting mourning joy fear mercy salvation redemption forgiveness repentance '
+        'resurrection everlasting'
+    ).split(),
+}
+
+
+def gerador(semente, versao, finalidade):
+    return random.Random(f'{semente}:{versao}:{finalidade}')
+
+
+def gerador_estrutura(versao):
+    # Independente da semente: a mesma versão tem sempre os mesmos capítulos e versículos
+    return random.Random(f'{versao}:estrutura')
+
+
+def distribuir(rng, total, partes):
+    '''
+    Divide `total` versículos em `partes` capítulos com tamanhos variados (pesos log-normais),
+    respeitando o total exato, ao menos um versículo e o maior capítulo real por capítulo
+    '''
+
+    pesos = [rng.lognormvariate(0, 0.5) for _ in range(partes)]
+    soma = sum(pesos)
+    tamanhos = [min(MAXIMO_VERSICULOS_CAPITULO, max(1, round(total * peso / soma))) for peso in pesos]
+
+    # Ajuste do arredondamento, um versículo por vez nos capítulos que ainda comportam a diferença
+    diferenca = total - sum(tamanhos)
+    while diferenca:
+        passo = 1 if diferenca > 0 else -1
+        indice = rng.randrange(partes)
+        if 1 <= tamanhos[indice] + passo <= MAXIMO_VERSICULOS_CAPITULO:
+            tamanhos[indice] += passo
+            diferenca -= passo
+
+    return tamanhos
+
+
+class Textos:
+    '''
+    Sorteio dos textos dos versículos de uma língua: quantidade de palavras log-normal e palavras
+    com frequência de Zipf-Mandelbrot
+    '''
+
+    def __init__(self, rng, lingua):
+        self.rng = rng
+        self.palavras = VOCABULARIO[lingua]
+        self.acumulados = list(accumulate(1 / (posicao + ZIPF_DESLOCAMENTO) for posicao in range(1, len(self.palavras) + 1)))
+        self.mu = math.log(MEDIANA_PALAVRAS)
+
+    def texto(self):
+        rng = self.rng
+        quantidade = min(PALAVRAS_MAXIMO, max(PALAVRAS_MINIMO, round(rng.lognormvariate(self.mu, DISPERSAO_PALAVRAS))))
+        palavras = rng.choices(self.palavras, cum_weights=self.acumulados, k=quantidade)
+
+        # Uma frase por versículo, às vezes com uma pausa no meio
+        if quantidade > 8 and rng.random() < 0.5:
+            pausa = rng.randrange(3, quantidade - 2)
+            palavras[pausa] += rng.choice((',', ';', ':'))
+
+        return ' '.join(palavras).capitalize() + rng.choice('....!?')
+
+
+def registros(semente, versao, lingua):
+    '''
+    Gera os registros (livro, capitulo, numero, texto) de uma versão completa, livro a livro, na
+    ordem canônica
+    '''
+
+    rng = gerador_estrutura(versao)
+    textos = Textos(gerador(semente, versao, 'textos'), lingua)
+
+    for livro, _ in Livro.LIVRO_CHOICES:
+        capitulos, versiculos = ESTRUTURA[livro]
+        for capitulo, tamanho in enumerate(distribuir(rng, versiculos, capitulos), start=1):
+            for numero in range(1, tamanho + 1):
+                yield livro, capitulo, numero, textos.texto()
+
+
+def excluir(semente, biblia, fracao):
+    '''
+    Exclusão lógica de uma fração dos livros, capítulos e versículos da versão, sorteada entre os
+    registros ordenados pela chave natural (a mesma semente exclui sempre os mesmos). Retorna as quantidades.
+    '''
+
+    if fracao <= 0:
+        return {}
+
+    rng = gerador(semente, biblia.versao, 'exclusoes')
+    consultas = (
+        (Livro, Livro.all_objects.filter(biblia=biblia).order_by('livro')),
+        (Capitulo, Capitulo.all_objects.filter(livro__biblia=biblia).order_by('livro__livro', 'numero')),
+        (Versiculo, Versiculo.all_objects.filter(biblia=biblia).order_by('referencia')),
+    )
+
+    excluidos = {}
+    for model, consulta in consultas:
+        pks = list(consulta.values_list('pk', flat=True))
+        sorteados = rng.sample(pks, round(len(pks) * fracao))
+        # Exclusão lógica do BaseModelQuerySet, que invalida caches e o conteúdo dos capítulos
+        model.objects.filter(pk__in=sorteados).delete()
+        excluidos[model.__name__] = len(sorteados)
+
+    return excluidos
+
+
+def gerar_versao(semente, versao, lingua, fracao_excluidos=0.0):
+    '''
+    Grava (ou regrava, idempotente) uma versão sintética completa em uma única transação e exclui
+    logicamente a fração pedida. Retorna (biblia, total de versículos, exclusões por modelo).
+    '''
+
+    with transaction.atomic():
+        biblia, _ = Biblia.all_objects.update_or_create(
+            versao=versao, defaults={'lingua': lingua, 'is_active': True, 'deleted_at': None})
+
+        # Livros e capítulos pelos upserts da importação (poucas linhas); os versículos por COPY
+        capitulos = {}
+        for codigo, livro in upsert_livros(biblia, list(ESTRUTURA)).items():
+            for numero, capitulo in upsert_capitulos(livro, range(1, ESTRUTURA[codigo][0] + 1)).items():
+                capitulos[codigo, numero] = capitulo.pk
+
+        linhas = ((capitulos[livro, capitulo], numero, texto, Versiculo.chave(livro, capitulo, numero))
+                  for livro, capitulo, numero, texto in registros(semente, versao, lingua))
+        total = copiar_versiculos(biblia, linhas)
+
+        excluidos = excluir(semente, biblia, fracao_excluidos)
+
+    return biblia, total, excluidos
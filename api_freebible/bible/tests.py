@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase
+from django.urls import Resolver404, resolve
+
+from bible.models import Versiculo
+from bible.references import ReferenciaInvalida, interpretar_referencia
+
+
+class ChaveCanonicaTests(SimpleTestCase):
+    '''
+    Chave BBCCCVVV: capítulo e versículo fora de 1..999 invadiriam o capítulo ou o livro seguinte
+    '''
+
+    def test_chave(self):
+        self.assertEqual(Versiculo.chave('JO', 3, 16), 43003016)
+        self.assertEqual(Versiculo.chave('GN', 999, 999), 1999999)
+        self.assertEqual(Versiculo.inicio_capitulo('GN', 1), 1001000)
+
+    def test_capitulo_fora_do_intervalo(self):
+        for capitulo in (0, 1000, 1001):
+            with self.subTest(capitulo=capitulo):
+                with self.assertRaises(ReferenciaInvalida):
+                    Versiculo.chave('GN', capitulo, 1)
+                with self.assertRaises(ReferenciaInvalida):
+                    Versiculo.inicio_capitulo('GN', capitulo)
+
+    def test_versiculo_fora_do_intervalo(self):
+        for numero in (0, 1000):
+            with self.subTest(numero=numero):
+                with self.assertRaises(ReferenciaInvalida):
+                    Versiculo.chave('GN', 1, numero)
+
+    def test_referencia_fora_do_intervalo(self):
+        for referencia in ('GN 0', 'GN 1:0', 'GN 0-2'):
+            with self.subTest(referencia=referencia):
+                with self.assertRaises(ReferenciaInvalida):
+                    interpretar_referencia(referencia)
+
+        self.assertEqual(interpretar_referencia('GN 1'), (1001000, 1001999))
+
+
+class RotasCapituloTests(SimpleTestCase):
+    '''
+    As rotas pela chave natural do capítulo aceitam no máximo 3 dígitos, como VersiculoViewSet.get_by_key
+    '''
+
+    rotas = (
+        '/api/v1/bible/chapter/read/SINT-01/GN/{}/',
+        '/api/v1/bible/async/chapter/read/SINT-01/GN/{}/',
+        '/api/v1/bible/chapter/get_by_key/SINT-01/GN/{}/',
+    )
+
+    def test_capitulo_com_mais_de_tres_digitos(self):
+        for rota in self.rotas:
+            with self.subTest(rota=rota):
+                resolve(rota.format(999))
+                with self.assertRaises(Resolver404):
+                    resolve(rota.format(1001))
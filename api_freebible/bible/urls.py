@@ -2,7 +2,9 @@ from bible.views.bible import BibliaViewSet
 from bible.views.book import LivroViewSet 
 from bible.views.chapter import CapituloViewSet
 from bible.views.versicle import VersiculoViewSet
+from bible.views import asynchronous
 
+from django.urls import re_path
 from rest_framework.routers import DefaultRouter
 
 router_bible_version = DefaultRouter()
@@ -19,4 +21,17 @@ router_versicle.register('versicle', VersiculoViewSet)
 urlpatterns = router_bible_version.urls
 urlpatterns = router_book.urls
 urlpatterns = router_chapter.urls
-urlpatterns = router_versicle.urls
\ No newline at end of file
+urlpatterns = router_versicle.urls
+
+# Leituras assíncronas (ASGI), com os mesmos caminhos das ações dos viewsets, sob /api/v1/bible/async/
+urls_async = [
+    re_path(r'^versicle/get_by_id/(?P<pk>[^/.]+)/$', asynchronous.VersiculoGetByIdView.as_view(), name='async-versicle-get-by-id'),
+    re_path(r'^versicle/list_active/$', asynchronous.VersiculoListActiveView.as_view(), name='async-versicle-list-active'),
+    re_path(r'^versicle/search/$', asynchronous.VersiculoSearchView.as_view(), name='async-versicle-search'),
+    re_path(r'^versicle/range/$', asynchronous.VersiculoRangeView.as_view(), name='async-versicle-range'),
+    re_path(r'^chapter/get_by_id/(?P<pk>[^/.]+)/$', asynchronous.CapituloGetByIdView.as_view(), name='async-chapter-get-by-id'),
+    re_path(r'^chapter/list_active/$', asynchronous.CapituloListActiveView.as_view(), name='async-chapter-list-active'),
+    re_path(r'^chapter/search/$', asynchronous.CapituloSearchView.as_view(), name='async-chapter-search'),
+    re_path(r'^chapter/read/(?P<versao>[^/]+)/(?P<livro>[^/.]+)/(?P<numero>[0-9]{1,3})/$',
+            asynchronous.CapituloReadView.as_view(), name='async-chapter-read'),
+]
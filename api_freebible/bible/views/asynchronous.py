@@ -0,0 +1,295 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import aget_object_or_404
+
+from api_freebible.async_views import LeituraAssincronaView, RequisicaoInvalida
+
+from bible.cache import em_cache_async, tags_chave, tags_lista, tags_objeto
+from bible.corpus import indice_versao
+from bible.models import Capitulo, ConteudoCapitulo, Livro, Versiculo
+from bible.references import ULTIMO_VERSICULO, ReferenciaInvalida, codigo_livro, decompor_chave, interpretar_referencia
+from bible.search import buscar_versiculos, limite_top_k
+from bible.serializers.chapter import CapituloValoresSerializer
+from bible.serializers.versicle import VersiculoBuscaValoresSerializer, VersiculoValoresSerializer
+from bible.views.chapter import CapituloViewSet, filtrar_capitulos
+from bible.views.versicle import (MAXIMO_VERSICULOS_COMPACTO, ORDENACAO_INTERVALO, VersiculoViewSet, filtrar_versiculos,
+                                   parametro_invalido)
+
+# Leituras assíncronas (ASGI) da Bíblia: as mesmas respostas das ações de leitura dos viewsets
+# (mesmos serializers, cache, validadores e paginação), com o ORM assíncrono. As rotas ficam em
+# /api/v1/bible/async/ (ver bible/urls.py) e atendem também sob WSGI, mas só liberam o worker
+# durante as consultas quando servidas por um servidor ASGI.
+
+
+## Versículos
+
+class VersiculoGetByIdView(LeituraAssincronaView):
+    '''
+    Versículo por ID (VersiculoViewSet.get_by_id)
+    '''
+
+    action = 'get_by_id'
+
+    @em_cache_async(lambda request, pk: tags_objeto('Versiculo', pk))
+    async def get(self, request, pk=None):
+        instance = await aget_object_or_404(VersiculoValoresSerializer.valores(Versiculo.objects.all()), pk=pk)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+
+        return VersiculoValoresSerializer(instance).data
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/async/versicle/get_by_id/1/ \
+            -u "admin@admin.com:admin"
+        '''
+
+
+class VersiculoListActiveView(LeituraAssincronaView):
+    '''
+    Versículos ativos, paginados por cursor (VersiculoViewSet.list_active)
+    '''
+
+    action = 'list_active'
+    ordering = VersiculoViewSet.ordering
+
+    @em_cache_async(lambda request: tags_lista('Versiculo'))
+    async def get(self, request):
+        page = await self.paginar(VersiculoValoresSerializer.valores(Versiculo.objects.all(), *self.ordering))
+
+        return self.paginator.dados_paginados(VersiculoValoresSerializer(page, many=True).data)
+
+        '''  # Shell
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/async/versicle/list_active/?page_size=500" \
+            -u "admin@admin.com:admin"
+        '''
+
+
+class VersiculoSearchView(LeituraAssincronaView):
+    '''
+    Busca de versículos por filtros ou, com `q`, busca textual ranqueada (VersiculoViewSet.search)
+    '''
+
+    action = 'search'
+    ordering = VersiculoViewSet.ordering
+
+    @em_cache_async(lambda request: tags_lista('Versiculo', request.query_params, [('capitulo', 'Capitulo'), ('biblia', 'Biblia')]))
+    async def get(self, request):
+        query_params = request.query_params
+
+        invalido = parametro_invalido(query_params)
+        if invalido:
+            raise RequisicaoInvalida(f'O parâmetro `{invalido}` deve ser um número inteiro.')
+
+        queryset = filtrar_versiculos(Versiculo.objects.all(), query_params)
+
+        # Busca textual ranqueada (índice GIN sobre `search_vector`), limitada ao top-k
+        termo = query_params.get('q')
+        if termo:
+            linguas = query_params.getlist('lingua') or None
+            resultados = [linha async for linha in VersiculoBuscaValoresSerializer.valores(
+                buscar_versiculos(queryset, termo, linguas, limite_top_k(query_params.get('limite'))))]
+            self.validar_registros(resultados, datado=False)
+            return VersiculoBuscaValoresSerializer(resultados, many=True).data
+
+        page = await self.paginar(VersiculoValoresSerializer.valores(queryset, *self.ordering))
+
+        return self.paginator.dados_paginados(VersiculoValoresSerializer(page, many=True).data)
+
+        '''  # Shell
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/async/versicle/search/?capitulo=1" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/async/versicle/search/?q=haja luz&lingua=PT&limite=10" -u "admin@admin.com:admin"
+        '''
+
+
+class VersiculoRangeView(LeituraAssincronaView):
+    '''
+    Intervalo de referências, inclusive entre capítulos (VersiculoViewSet.range)
+    '''
+
+    action = 'range'
+    ordering = ORDENACAO_INTERVALO
+
+    @em_cache_async(lambda request: tags_lista('Versiculo', request.query_params, [('biblia', 'Biblia')]))
+    async def get(self, request):
+        biblia = request.query_params.get('biblia')
+        referencia = request.query_params.get('ref')
+
+        if not biblia or not biblia.isdigit() or not referencia:
+            raise RequisicaoInvalida('Informe os parâmetros `biblia` e `ref`.')
+
+        try:
+            inicio, fim = interpretar_referencia(referencia)
+        except ReferenciaInvalida as erro:
+            raise RequisicaoInvalida(str(erro))
+
+        if request.query_params.get('compacto') in ('1', 'true', 'True'):
+            return await self.compacto(biblia, referencia, inicio, fim)
+
+        queryset = (Versiculo.objects
+            .filter(biblia_id=biblia, referencia__range=(inicio, fim))
+            .filter(capitulo__is_active=True, capitulo__deleted_at__isnull=True,
+                    capitulo__livro__is_active=True, capitulo__livro__deleted_at__isnull=True))
+        page = await self.paginar(VersiculoValoresSerializer.valores(queryset, *self.ordering))
+
+        return self.paginator.dados_paginados(VersiculoValoresSerializer(page, many=True).data)
+
+        '''  # Shell
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/async/versicle/range/?biblia=1&ref=JO 3:16-4:2" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/async/versicle/range/?biblia=1&ref=GN 1-50&page_size=500" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/async/versicle/range/?biblia=1&ref=SL 23&compacto=1" -u "admin@admin.com:admin"
+        '''
+
+    async def compacto(self, biblia, referencia, inicio, fim):
+        '''
+        Formato compacto [[livro, capitulo, numero, texto], ...]: do corpus em memória ou do snapshot
+        publicado (sem consultas), senão do banco (VersiculoViewSet.range_compacto), com no máximo
+        MAXIMO_VERSICULOS_COMPACTO versículos
+        '''
+
+        indice = indice_versao(biblia_id=biblia)
+        if indice is not None:
+            linhas = list(islice(indice.intervalo(inicio, fim), MAXIMO_VERSICULOS_COMPACTO + 1))
+            if len(linhas) > MAXIMO_VERSICULOS_COMPACTO:
+                raise self.compacto_excedido()
+            self.validar(indice.gerado_em, len(linhas), indice.hash)
+        else:
+            # A exclusão lógica de um capítulo ou livro também muda o resultado
+            await self.avalidar_escopo(Versiculo.all_objects.filter(biblia_id=biblia, referencia__range=(inicio, fim)),
+                                       Capitulo.all_objects.filter(livro__biblia_id=biblia),
+                                       Livro.all_objects.filter(biblia_id=biblia))
+            linhas = [linha async for linha in Versiculo.objects
+                .filter(biblia_id=biblia, referencia__range=(inicio, fim))
+                .filter(capitulo__is_active=True, capitulo__deleted_at__isnull=True,
+                        capitulo__livro__is_active=True, capitulo__livro__deleted_at__isnull=True)
+                .order_by('referencia')
+                .values_list('referencia', 'versiculo')[:MAXIMO_VERSICULOS_COMPACTO + 1]]
+            if len(linhas) > MAXIMO_VERSICULOS_COMPACTO:
+                raise self.compacto_excedido()
+
+        return {
+            'biblia': int(biblia),
+            'ref': referencia,
+            'versiculos': [[*decompor_chave(chave), texto] for chave, texto in linhas],
+        }
+
+    def compacto_excedido(self):
+        return RequisicaoInvalida(f'O formato compacto aceita no máximo {MAXIMO_VERSICULOS_COMPACTO} versículos; '
+                                  'leia intervalos maiores sem `compacto`, em páginas.')
+
+
+## Capítulos
+
+class CapituloGetByIdView(LeituraAssincronaView):
+    '''
+    Capítulo por ID (CapituloViewSet.get_by_id)
+    '''
+
+    action = 'get_by_id'
+
+    @em_cache_async(lambda request, pk: tags_objeto('Capitulo', pk))
+    async def get(self, request, pk=None):
+        instance = await aget_object_or_404(CapituloValoresSerializer.valores(Capitulo.objects.all()), pk=pk)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+
+        return CapituloValoresSerializer(instance).data
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/async/chapter/get_by_id/1/ \
+            -u "admin@admin.com:admin"
+        '''
+
+
+class CapituloListActiveView(LeituraAssincronaView):
+    '''
+    Capítulos ativos, paginados por cursor (CapituloViewSet.list_active)
+    '''
+
+    action = 'list_active'
+    ordering = CapituloViewSet.ordering
+
+    @em_cache_async(lambda request: tags_lista('Capitulo'))
+    async def get(self, request):
+        page = await self.paginar(CapituloValoresSerializer.valores(Capitulo.objects.all(), *self.ordering))
+
+        return self.paginator.dados_paginados(CapituloValoresSerializer(page, many=True).data)
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/async/chapter/list_active/ \
+            -u "admin@admin.com:admin"
+        '''
+
+
+class CapituloSearchView(LeituraAssincronaView):
+    '''
+    Busca de capítulos por filtros (CapituloViewSet.search)
+    '''
+
+    action = 'search'
+    ordering = CapituloViewSet.ordering
+
+    @em_cache_async(lambda request: tags_lista('Capitulo', request.query_params, [('livro', 'Livro')]))
+    async def get(self, request):
+        queryset = filtrar_capitulos(Capitulo.objects.all(), request.query_params)
+        page = await self.paginar(CapituloValoresSerializer.valores(queryset, *self.ordering))
+
+        return self.paginator.dados_paginados(CapituloValoresSerializer(page, many=True).data)
+
+        '''  # Shell
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/async/chapter/search/?livro=1" -u "admin@admin.com:admin"
+        '''
+
+
+class CapituloReadView(LeituraAssincronaView):
+    '''
+    Capítulo inteiro no formato compacto, do corpus em memória, do snapshot publicado ou do conteúdo
+    pré-calculado no banco (CapituloViewSet.read)
+    '''
+
+    action = 'read'
+
+    @em_cache_async(lambda request, versao, livro, numero: tags_chave(versao, livro, numero, descendentes=True))
+    async def get(self, request, versao=None, livro=None, numero=None):
+        # Corpus do processo ou snapshot mapeado em memória: leitura sem consultas ao banco
+        indice = indice_versao(versao=versao)
+        if indice is not None:
+            try:
+                inicio = Versiculo.inicio_capitulo(codigo_livro(livro), int(numero))
+            except ReferenciaInvalida:
+                raise Http404
+
+            versiculos = [[referencia % 1000, texto] for referencia, texto in
+                          indice.intervalo(inicio, inicio + ULTIMO_VERSICULO)]
+
+            if versiculos:
+                self.validar(indice.gerado_em, len(versiculos), indice.hash)
+                return {'biblia': versao, 'livro': livro.upper(), 'capitulo': int(numero), 'versiculos': versiculos}
+
+        # Capítulo e conteúdo pré-calculado em uma única consulta
+        capitulo = await aget_object_or_404(
+            Capitulo.objects.select_related('livro__biblia', 'conteudo'),
+            livro__biblia__versao=versao, livro__livro=livro.upper(), numero=numero)
+
+        # Validadores pelo escopo dos versículos (inclusive os excluídos, que guardam a data da exclusão)
+        await self.avalidar_escopo(Versiculo.all_objects.filter(capitulo_id=capitulo.pk))
+
+        try:
+            versiculos = capitulo.conteudo.versiculos
+        except ConteudoCapitulo.DoesNotExist:
+            # Conteúdo ainda não calculado: montado (e gravado) pelo ORM síncrono
+            versiculos = await sync_to_async(capitulo.versiculos_compactos)()
+
+        return {
+            'biblia': capitulo.livro.biblia.versao,
+            'livro': capitulo.livro.livro,
+            'capitulo': capitulo.numero,
+            'versiculos': versiculos,  # [[número, texto], ...]
+        }
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/async/chapter/read/Almeida/GN/1/ \
+            -u "admin@admin.com:admin"
+        '''
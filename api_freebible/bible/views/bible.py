@@ -1,15 +1,25 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import content_disposition_header
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from bible.models import Biblia
+from api_freebible.compression import codificacao_aceita
+from api_freebible.conditional import RespostaCondicionalMixin
+
+from bible.cache import em_cache, tags_chave, tags_lista, tags_objeto
+from bible.exporters import CONTENT_TYPES, FORMATOS, exportar, exportar_async, registros_versao
+from bible.models import Biblia, Versiculo
 from bible.serializers.bible import (BibliaSerializer,
                                      BibliaCreateSerializer,
-                                     BibliaUpdateSerializer)
+                                     BibliaUpdateSerializer,
+                                     BibliaValoresSerializer)
+from bible.snapshots import caminho, publicado
 
-class BibliaViewSet(viewsets.ModelViewSet):
+class BibliaViewSet(RespostaCondicionalMixin, viewsets.ModelViewSet):
 
     ## Operacional Methods para urls
 
@@ -17,6 +27,9 @@ class BibliaViewSet(viewsets.ModelViewSet):
     queryset = Biblia.objects.all()
     serializer_class = BibliaSerializer
 
+    # Ordenação indexada e única usada pela paginação por cursor (keyset)
+    ordering = ('id',)
+
     def get_serializer_class(self):
         '''
         Método que seleciona o serializer correto dependendo da ação
@@ -111,14 +124,16 @@ class BibliaViewSet(viewsets.ModelViewSet):
         '''
     
     @action(detail=False, methods=['get'], url_path='get_by_id/(?P<pk>[^/.]+)')
+    @em_cache(lambda request, pk: tags_objeto('Biblia', pk))
     def get_by_id(self, request, pk=None):
         '''
         Ação personalizada para recuperar Biblia por ID
         '''
 
         # Busca o Biblia por ID ou código
-        instance = get_object_or_404(Biblia, pk=pk)
-        serializer = self.get_serializer(instance)
+        instance = get_object_or_404(BibliaValoresSerializer.valores(Biblia.objects.all()), pk=pk)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = BibliaValoresSerializer(instance)
 
         return Response(serializer.data)  # Retorna os dados do usuário encontrado
     
@@ -127,16 +142,99 @@ class BibliaViewSet(viewsets.ModelViewSet):
             -u "admin@admin.com:admin"
         '''
     
+    @action(detail=False, methods=['get'], url_path='get_by_key/(?P<versao>[^/]+)')
+    @em_cache(lambda request, versao: tags_chave(versao))
+    def get_by_key(self, request, versao=None):
+        '''
+        Ação personalizada para recuperar Biblia pela chave natural (versão)
+        '''
+
+        # Busca pela restrição única de `versao`
+        instance = get_object_or_404(BibliaValoresSerializer.valores(self.queryset), versao=versao)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = BibliaValoresSerializer(instance)
+
+        return Response(serializer.data)
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/bible_version/get_by_key/Almeida/ \
+            -u "admin@admin.com:admin"
+        '''
+
+    @action(detail=False, methods=['get'], url_path='export/(?P<versao>[^/]+)')
+    def export(self, request, versao=None):
+        '''
+        Ação personalizada para exportar uma versão inteira em fluxo (NDJSON ou JSON), na ordem canônica
+        '''
+
+        formato = request.query_params.get('formato', 'ndjson')
+        if formato not in FORMATOS:
+            return Response({'detail': f'Formato inválido; use {" ou ".join(FORMATOS)}.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        biblia = get_object_or_404(self.queryset, versao=versao)
+
+        # Versão publicada: arquivo NDJSON pré-comprimido, entregue pelo servidor com sendfile (FileResponse)
+        snapshot = publicado(biblia_id=biblia.pk)
+        if snapshot is not None and formato == 'ndjson':
+            return self.export_publicado(request, biblia, snapshot)
+
+        # Validadores da versão inteira (uma agregação), para não repetir o download de uma versão sem edições
+        self.validar_escopo(Versiculo.all_objects.filter(biblia_id=biblia.pk))
+
+        # Resposta em fluxo: o primeiro byte sai antes da leitura completa e a memória não cresce com a
+        # versão; sob ASGI, apenas com um iterador assíncrono (um síncrono seria lido por inteiro antes)
+        blocos = exportar(registros_versao(biblia), formato)
+        if isinstance(request._request, ASGIRequest):
+            blocos = exportar_async(blocos)
+
+        response = StreamingHttpResponse(blocos, content_type=CONTENT_TYPES[formato])
+        response['Content-Disposition'] = content_disposition_header(True, f'{biblia.versao}.{formato}')
+
+        return response
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/bible_version/export/Almeida/ \
+            -u "admin@admin.com:admin" -o Almeida.ndjson
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/bible_version/export/Almeida/?formato=json" \
+            -u "admin@admin.com:admin" -o Almeida.json
+
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/bible_version/export/Almeida/ \
+            -H "Accept-Encoding: br, gzip" -u "admin@admin.com:admin" -o Almeida.ndjson.br
+        '''
+
+    def export_publicado(self, request, biblia, snapshot):
+        '''
+        Entrega a variante publicada da exportação na melhor codificação aceita pelo cliente
+        '''
+
+        variantes = [codificacao for codificacao in ('br', 'gzip') if codificacao in snapshot.entrada['variantes']]
+        codificacao = (variantes and codificacao_aceita(request, variantes)) or 'identity'
+
+        self.validar(snapshot.gerado_em, snapshot.entrada['total'], snapshot.hash, codificacao)
+
+        response = FileResponse(open(caminho(snapshot.entrada['variantes'][codificacao]), 'rb'),
+                                content_type=CONTENT_TYPES['ndjson'])
+        response['Content-Disposition'] = content_disposition_header(True, f'{biblia.versao}.ndjson')
+        response['Vary'] = 'Accept-Encoding'
+        if codificacao != 'identity':
+            response['Content-Encoding'] = codificacao
+
+        return response
+
     @action(detail=False, methods=['get'], url_path='list_active')
+    @em_cache(lambda request: tags_lista('Biblia'))
     def list_active(self, request):
         '''
         Ação personalizada para listar usuários ativos
         '''
 
-        queryset = Biblia.all_objects.filter(is_active=True)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = Biblia.objects.all()  # Registros vivos (mesmo predicado do BaseManager)
+        page = self.paginate_queryset(BibliaValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = BibliaValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/bible_version/list_active/ \
@@ -150,9 +248,10 @@ class BibliaViewSet(viewsets.ModelViewSet):
         '''
 
         queryset = Biblia.all_objects.filter(is_active=False)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(BibliaValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = BibliaValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/bible_version/list_inactive/ \
@@ -160,6 +259,7 @@ class BibliaViewSet(viewsets.ModelViewSet):
         '''
 
     @action(detail=False, methods=['get'], url_path='search')
+    @em_cache(lambda request: tags_lista('Biblia'))
     def search(self, request):
         '''
         Ação personalizada para buscar registros da Bíblia com parâmetros específicos.
@@ -178,8 +278,9 @@ class BibliaViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(versao__icontains=value)
 
         # Serializa a lista de resultados encontrados
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(BibliaValoresSerializer.valores(queryset, *self.ordering))
+        serializer = BibliaValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
+        return self.get_paginated_response(serializer.data)
     
         '''  # Shell
         curl -X GET "http://127.0.0.1:8000/api/v1/bible/bible_version/search/?lingua=PT" -u "admin@admin.com:admin"
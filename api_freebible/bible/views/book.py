@@ -4,12 +4,16 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from api_freebible.conditional import RespostaCondicionalMixin
+
+from bible.cache import em_cache, tags_chave, tags_lista, tags_objeto
 from bible.models import Livro
 from bible.serializers.book import (LivroSerializer,
                                     LivroCreateSerializer,
-                                    LivroUpdateSerializer)
+                                    LivroUpdateSerializer,
+                                    LivroValoresSerializer)
 
-class LivroViewSet(viewsets.ModelViewSet):
+class LivroViewSet(RespostaCondicionalMixin, viewsets.ModelViewSet):
 
     ## Operacional Methods para urls
 
@@ -17,6 +21,9 @@ class LivroViewSet(viewsets.ModelViewSet):
     queryset = Livro.objects.all()
     serializer_class = LivroSerializer
 
+    # Ordenação indexada e única usada pela paginação por cursor (keyset)
+    ordering = ('biblia_id', 'id')
+
     def get_serializer_class(self):
         '''
         Método que seleciona o serializer correto dependendo da ação
@@ -113,14 +120,16 @@ class LivroViewSet(viewsets.ModelViewSet):
         '''
     
     @action(detail=False, methods=['get'], url_path='get_by_id/(?P<pk>[^/.]+)')
+    @em_cache(lambda request, pk: tags_objeto('Livro', pk))
     def get_by_id(self, request, pk=None):
         '''
         Ação personalizada para recuperar Livro por ID
         '''
 
         # Busca o Livro por ID ou código
-        instance = get_object_or_404(Livro, pk=pk)
-        serializer = self.get_serializer(instance)
+        instance = get_object_or_404(LivroValoresSerializer.valores(Livro.objects.all()), pk=pk)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = LivroValoresSerializer(instance)
 
         return Response(serializer.data)  # Retorna os dados do usuário encontrado
     
@@ -129,16 +138,37 @@ class LivroViewSet(viewsets.ModelViewSet):
             -u "admin@admin.com:admin"
         '''
     
+    @action(detail=False, methods=['get'], url_path='get_by_key/(?P<versao>[^/]+)/(?P<livro>[^/.]+)')
+    @em_cache(lambda request, versao, livro: tags_chave(versao, livro))
+    def get_by_key(self, request, versao=None, livro=None):
+        '''
+        Ação personalizada para recuperar Livro pela chave natural (versão, livro)
+        '''
+
+        # Uma consulta com junção em Biblia, atendida pelas restrições únicas de `versao` e (biblia, livro)
+        instance = get_object_or_404(LivroValoresSerializer.valores(self.queryset), biblia__versao=versao, livro=livro.upper())
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = LivroValoresSerializer(instance)
+
+        return Response(serializer.data)
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/book/get_by_key/Almeida/GN/ \
+            -u "admin@admin.com:admin"
+        '''
+
     @action(detail=False, methods=['get'], url_path='list_active')
+    @em_cache(lambda request: tags_lista('Livro'))
     def list_active(self, request):
         '''
         Ação personalizada para listar usuários ativos
         '''
 
-        queryset = Livro.all_objects.filter(is_active=True)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = Livro.objects.all()  # Registros vivos: mesmo predicado dos índices parciais
+        page = self.paginate_queryset(LivroValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = LivroValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/book/list_active/ \
@@ -152,9 +182,10 @@ class LivroViewSet(viewsets.ModelViewSet):
         '''
 
         queryset = Livro.all_objects.filter(is_active=False)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(LivroValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = LivroValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/book/list_inactive/ \
@@ -162,6 +193,7 @@ class LivroViewSet(viewsets.ModelViewSet):
         '''
 
     @action(detail=False, methods=['get'], url_path='search')
+    @em_cache(lambda request: tags_lista('Livro', request.query_params, [('biblia', 'Biblia')]))
     def search(self, request):
         '''
         Ação personalizada para buscar registros da Bíblia com parâmetros específicos.
@@ -183,8 +215,9 @@ class LivroViewSet(viewsets.ModelViewSet):
                 queryset = queryset.filter(testamento=value)
 
         # Serializa a lista de resultados encontrados
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(LivroValoresSerializer.valores(queryset, *self.ordering))
+        serializer = LivroValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
+        return self.get_paginated_response(serializer.data)
     
         '''  # Shell
         curl -X GET "http://127.0.0.1:8000/api/v1/bible/book/search/?biblia=1" -u "admin@admin.com:admin"
@@ -1,15 +1,43 @@
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from bible.models import Capitulo
+from api_freebible.conditional import RespostaCondicionalMixin
+
+from bible.bulk import excluir_lote, upsert_lote_capitulos, validar_lista
+from bible.cache import em_cache, tags_chave, tags_lista, tags_objeto
+from bible.corpus import indice_versao
+from bible.models import Capitulo, Versiculo
+from bible.references import ULTIMO_VERSICULO, ReferenciaInvalida, codigo_livro
 from bible.serializers.chapter import (CapituloSerializer,
                                     CapituloCreateSerializer,
-                                    CapituloUpdateSerializer)
+                                    CapituloUpdateSerializer,
+                                       CapituloValoresSerializer)
+
+
+def filtrar_capitulos(queryset, query_params):
+    '''
+    Filtros da busca de capítulos (`search`) a partir dos parâmetros da consulta
+    '''
+
+    for param, value in query_params.items():
+        if param == 'livro':
+            # Filtro para o campo `livro` (relacionamento com o modelo Livro)
+            queryset = queryset.filter(livro__id=value)
+        elif param == 'numero':
+            # Filtro para o campo `numero` (número do capítulo)
+            queryset = queryset.filter(numero=value)
+        elif param == 'autor':
+            # Filtro para o campo `autor` (autor do capítulo)
+            queryset = queryset.filter(autor__icontains=value)  # Uso de `icontains` para correspondência parcial
 
-class CapituloViewSet(viewsets.ModelViewSet):
+    return queryset
+
+
+class CapituloViewSet(RespostaCondicionalMixin, viewsets.ModelViewSet):
 
     ## Operacional Methods para urls
 
@@ -17,6 +45,9 @@ class CapituloViewSet(viewsets.ModelViewSet):
     queryset = Capitulo.objects.all()
     serializer_class = CapituloSerializer
 
+    # Ordenação indexada e única usada pela paginação por cursor (keyset)
+    ordering = ('livro_id', 'numero')
+
     def get_serializer_class(self):
         '''
         Método que seleciona o serializer correto dependendo da ação
@@ -112,15 +143,67 @@ class CapituloViewSet(viewsets.ModelViewSet):
             -u "admin@admin.com:admin"
         '''
     
+    @action(detail=False, methods=['post'], url_path='bulk_upsert')
+    def bulk_upsert(self, request):
+        '''
+        Ação personalizada para criar ou atualizar Capitulos em lote, pela chave natural (livro, numero)
+        '''
+
+        erro = validar_lista(request.data)
+        if erro:
+            return Response({'detail': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validação item a item e gravação dos válidos com um único INSERT ... ON CONFLICT por lote
+        gravados, erros = upsert_lote_capitulos(request.data)
+
+        # Sucesso parcial retorna 200 com os erros por item; 400 apenas se nada foi gravado
+        return Response({'gravados': gravados, 'erros': erros},
+                        status=status.HTTP_200_OK if gravados else status.HTTP_400_BAD_REQUEST)
+
+        '''  # Shell
+        curl -X POST http://127.0.0.1:8000/api/v1/bible/chapter/bulk_upsert/ \
+            -H "Content-Type: application/json" \
+            -d '[{"livro": 1, "numero": 1, "autor": "Moises"}, {"livro": 1, "numero": 2, "autor": "Moises"}]' \
+            -u "admin@admin.com:admin"
+        '''
+
+    @action(detail=False, methods=['post'], url_path='bulk_delete')
+    def bulk_delete(self, request):
+        '''
+        Ação personalizada para excluir (logicamente) Capitulos em lote, por ID
+        '''
+
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        erro = validar_lista(ids)
+        if erro is None and not all(isinstance(pk, int) for pk in ids):
+            erro = 'Os IDs devem ser números inteiros.'
+        if erro:
+            return Response({'detail': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Um único UPDATE para todos os registros encontrados
+        excluidos, erros = excluir_lote(Capitulo, ids)
+
+        return Response({'excluidos': excluidos, 'erros': erros},
+                        status=status.HTTP_200_OK if excluidos else status.HTTP_400_BAD_REQUEST)
+
+        '''  # Shell
+        curl -X POST http://127.0.0.1:8000/api/v1/bible/chapter/bulk_delete/ \
+            -H "Content-Type: application/json" \
+            -d '{"ids": [1, 2, 3]}' \
+            -u "admin@admin.com:admin"
+        '''
+    
     @action(detail=False, methods=['get'], url_path='get_by_id/(?P<pk>[^/.]+)')
+    @em_cache(lambda request, pk: tags_objeto('Capitulo', pk))
     def get_by_id(self, request, pk=None):
         '''
         Ação personalizada para recuperar Capitulo por ID
         '''
 
         # Busca o Capitulo por ID ou código
-        instance = get_object_or_404(Capitulo, pk=pk)
-        serializer = self.get_serializer(instance)
+        instance = get_object_or_404(CapituloValoresSerializer.valores(Capitulo.objects.all()), pk=pk)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = CapituloValoresSerializer(instance)
 
         return Response(serializer.data)  # Retorna os dados do usuário encontrado
     
@@ -129,16 +212,80 @@ class CapituloViewSet(viewsets.ModelViewSet):
             -u "admin@admin.com:admin"
         '''
     
+    @action(detail=False, methods=['get'], url_path='get_by_key/(?P<versao>[^/]+)/(?P<livro>[^/.]+)/(?P<numero>[0-9]{1,3})')
+    @em_cache(lambda request, versao, livro, numero: tags_chave(versao, livro, numero))
+    def get_by_key(self, request, versao=None, livro=None, numero=None):
+        '''
+        Ação personalizada para recuperar Capitulo pela chave natural (versão, livro, número)
+        '''
+
+        # Uma consulta com junções atendidas pelas restrições únicas (biblia, livro) e (livro, numero)
+        instance = get_object_or_404(CapituloValoresSerializer.valores(self.queryset), livro__biblia__versao=versao, livro__livro=livro.upper(), numero=numero)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = CapituloValoresSerializer(instance)
+
+        return Response(serializer.data)
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/chapter/get_by_key/Almeida/GN/1/ \
+            -u "admin@admin.com:admin"
+        '''
+
+    @action(detail=False, methods=['get'], url_path='read/(?P<versao>[^/]+)/(?P<livro>[^/.]+)/(?P<numero>[0-9]{1,3})')
+    @em_cache(lambda request, versao, livro, numero: tags_chave(versao, livro, numero, descendentes=True))
+    def read(self, request, versao=None, livro=None, numero=None):
+        '''
+        Ação personalizada para ler um capítulo inteiro com o conteúdo compacto pré-calculado
+        (do corpus em memória ou do snapshot publicado, se disponíveis, ou do banco)
+        '''
+
+        # Corpus do processo ou snapshot mapeado em memória: leitura sem consultas ao banco
+        indice = indice_versao(versao=versao)
+        if indice is not None:
+            try:
+                inicio = Versiculo.inicio_capitulo(codigo_livro(livro), int(numero))
+            except ReferenciaInvalida:
+                raise Http404
+
+            versiculos = [[referencia % 1000, texto] for referencia, texto in
+                          indice.intervalo(inicio, inicio + ULTIMO_VERSICULO)]
+
+            if versiculos:
+                self.validar(indice.gerado_em, len(versiculos), indice.hash)
+                return Response({'biblia': versao, 'livro': livro.upper(), 'capitulo': int(numero), 'versiculos': versiculos})
+
+        # Capítulo e conteúdo pré-calculado em uma única consulta
+        capitulo = get_object_or_404(
+            self.queryset.select_related('livro__biblia', 'conteudo'),
+            livro__biblia__versao=versao, livro__livro=livro.upper(), numero=numero)
+
+        # Validadores pelo escopo dos versículos (inclusive os excluídos, que guardam a data da exclusão)
+        self.validar_escopo(Versiculo.all_objects.filter(capitulo_id=capitulo.pk))
+
+        return Response({
+            'biblia': capitulo.livro.biblia.versao,
+            'livro': capitulo.livro.livro,
+            'capitulo': capitulo.numero,
+            'versiculos': capitulo.versiculos_compactos(),  # [[número, texto], ...]
+        })
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/chapter/read/Almeida/GN/1/ \
+            -u "admin@admin.com:admin"
+        '''
+
     @action(detail=False, methods=['get'], url_path='list_active')
+    @em_cache(lambda request: tags_lista('Capitulo'))
     def list_active(self, request):
         '''
         Ação personalizada para listar usuários ativos
         '''
 
-        queryset = Capitulo.all_objects.filter(is_active=True)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = Capitulo.objects.all()  # Registros vivos: mesmo predicado dos índices parciais
+        page = self.paginate_queryset(CapituloValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = CapituloValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/chapter/list_active/ \
@@ -152,9 +299,10 @@ class CapituloViewSet(viewsets.ModelViewSet):
         '''
 
         queryset = Capitulo.all_objects.filter(is_active=False)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(CapituloValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = CapituloValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/chapter/list_inactive/ \
@@ -162,29 +310,19 @@ class CapituloViewSet(viewsets.ModelViewSet):
         '''
 
     @action(detail=False, methods=['get'], url_path='search')
+    @em_cache(lambda request: tags_lista('Capitulo', request.query_params, [('livro', 'Livro')]))
     def search(self, request):
         '''
         Ação personalizada para buscar registros da Bíblia com parâmetros específicos.
         '''
 
         query_params = request.query_params
-        queryset = self.queryset
-
-        # Aplica filtros baseados nos parâmetros da consulta
-        for param, value in query_params.items():
-            if param == 'livro':
-                # Filtro para o campo `livro` (relacionamento com o modelo Livro)
-                queryset = queryset.filter(livro__id=value)
-            elif param == 'numero':
-                # Filtro para o campo `numero` (número do capítulo)
-                queryset = queryset.filter(numero=value)
-            elif param == 'autor':
-                # Filtro para o campo `autor` (autor do capítulo)
-                queryset = queryset.filter(autor__icontains=value)  # Uso de `icontains` para correspondência parcial
+        queryset = filtrar_capitulos(self.queryset, query_params)  # Aplica filtros baseados nos parâmetros da consulta
 
         # Serializa a lista de resultados encontrados
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(CapituloValoresSerializer.valores(queryset, *self.ordering))
+        serializer = CapituloValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
+        return self.get_paginated_response(serializer.data)
     
         '''  # Shell
         curl -X GET "http://127.0.0.1:8000/api/v1/bible/chapter/search/?livro=1" -u "admin@admin.com:admin"
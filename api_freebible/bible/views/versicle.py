@@ -1,15 +1,83 @@
+from itertools import islice
+
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 
-from bible.models import Versiculo
+from api_freebible.conditional import RespostaCondicionalMixin
+
+from bible.bulk import excluir_lote, upsert_lote_versiculos, validar_lista
+from bible.cache import em_cache, tags_chave, tags_lista, tags_objeto, tags_versoes
+from bible.corpus import indice_versao
+from bible.models import Biblia, Capitulo, Livro, Versiculo
+from bible.references import ReferenciaInvalida, codigo_livro, decompor_chave, interpretar_referencia
+from bible.search import buscar_versiculos, limite_top_k
 from bible.serializers.versicle import (VersiculoSerializer,
                                         VersiculoCreateSerializer,
-                                        VersiculoUpdateSerializer)
+                                        VersiculoUpdateSerializer,
+                                        VersiculoValoresSerializer,
+                                        VersiculoBuscaValoresSerializer)
+
+# Quantidade máxima de versões lado a lado na comparação
+MAXIMO_VERSOES_COMPARACAO = 10
+
+# Páginas do intervalo pela chave canônica (índice parcial (biblia, referencia) dos registros vivos)
+ORDENACAO_INTERVALO = ('referencia',)
+
+# O formato compacto não é paginado: no máximo um livro inteiro (Salmos tem 2.461 versículos)
+MAXIMO_VERSICULOS_COMPACTO = 2500
+
+
+def versoes_comparacao(query_params):
+    '''
+    Versões pedidas na comparação, na ordem informada e sem repetições
+    (`versoes=Almeida,KJV` ou `versoes=Almeida&versoes=KJV`)
+    '''
+
+    versoes = [versao.strip() for valor in query_params.getlist('versoes') for versao in valor.split(',')]
+    return list(dict.fromkeys(versao for versao in versoes if versao))
+
+
+# Parâmetros inteiros da busca, conferidos antes dos filtros (texto em um filtro de id seria um erro 500)
+PARAMETROS_INTEIROS_BUSCA = ('biblia', 'capitulo', 'numero')
+
+
+def parametro_invalido(query_params):
+    '''
+    Primeiro parâmetro inteiro da busca com valor não numérico, ou None
+    '''
+
+    return next((param for param in PARAMETROS_INTEIROS_BUSCA
+                 if param in query_params and not query_params[param].isdigit()), None)
 
-class VersiculoViewSet(viewsets.ModelViewSet):
+
+def filtrar_versiculos(queryset, query_params):
+    '''
+    Filtros da busca de versículos (`search`) a partir dos parâmetros da consulta
+    '''
+
+    for param, value in query_params.items():
+        if param == 'capitulo':
+            # Filtro para o campo `capitulo` (relacionamento com o modelo Capitulo)
+            queryset = queryset.filter(capitulo__id=value)
+        elif param == 'numero':
+            # Filtro para o campo `numero` (número do versículo)
+            queryset = queryset.filter(numero=value)
+        elif param == 'versiculo':
+            # Filtro para o campo `versiculo` (conteúdo do versículo)
+            queryset = queryset.filter(versiculo__icontains=value)  # Uso de `icontains` para correspondência parcial
+        elif param == 'biblia':
+            # Filtro para a versão da Bíblia do versículo
+            queryset = queryset.filter(biblia_id=value)  # Coluna desnormalizada, sem junções
+
+    return queryset
+
+
+class VersiculoViewSet(RespostaCondicionalMixin, viewsets.ModelViewSet):
 
     ## Operacional Methods para urls
 
@@ -17,6 +85,9 @@ class VersiculoViewSet(viewsets.ModelViewSet):
     queryset = Versiculo.objects.all()
     serializer_class = VersiculoSerializer
 
+    # Ordenação indexada e única usada pela paginação por cursor (keyset)
+    ordering = ('capitulo_id', 'numero')
+
     def get_serializer_class(self):
         '''
         Método que seleciona o serializer correto dependendo da ação
@@ -112,15 +183,67 @@ class VersiculoViewSet(viewsets.ModelViewSet):
             -u "admin@admin.com:admin"
         '''
     
+    @action(detail=False, methods=['post'], url_path='bulk_upsert')
+    def bulk_upsert(self, request):
+        '''
+        Ação personalizada para criar ou atualizar Versiculos em lote, pela chave natural (capitulo, numero)
+        '''
+
+        erro = validar_lista(request.data)
+        if erro:
+            return Response({'detail': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validação item a item e gravação dos válidos com um único INSERT ... ON CONFLICT por lote
+        gravados, erros = upsert_lote_versiculos(request.data)
+
+        # Sucesso parcial retorna 200 com os erros por item; 400 apenas se nada foi gravado
+        return Response({'gravados': gravados, 'erros': erros},
+                        status=status.HTTP_200_OK if gravados else status.HTTP_400_BAD_REQUEST)
+
+        '''  # Shell
+        curl -X POST http://127.0.0.1:8000/api/v1/bible/versicle/bulk_upsert/ \
+            -H "Content-Type: application/json" \
+            -d '[{"capitulo": 1, "numero": 1, "versiculo": "No princípio criou Deus os céus e a terra."}, {"capitulo": 1, "numero": 2, "versiculo": "E a terra era sem forma e vazia."}]' \
+            -u "admin@admin.com:admin"
+        '''
+
+    @action(detail=False, methods=['post'], url_path='bulk_delete')
+    def bulk_delete(self, request):
+        '''
+        Ação personalizada para excluir (logicamente) Versiculos em lote, por ID
+        '''
+
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        erro = validar_lista(ids)
+        if erro is None and not all(isinstance(pk, int) for pk in ids):
+            erro = 'Os IDs devem ser números inteiros.'
+        if erro:
+            return Response({'detail': erro}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Um único UPDATE para todos os registros encontrados
+        excluidos, erros = excluir_lote(Versiculo, ids)
+
+        return Response({'excluidos': excluidos, 'erros': erros},
+                        status=status.HTTP_200_OK if excluidos else status.HTTP_400_BAD_REQUEST)
+
+        '''  # Shell
+        curl -X POST http://127.0.0.1:8000/api/v1/bible/versicle/bulk_delete/ \
+            -H "Content-Type: application/json" \
+            -d '{"ids": [1, 2, 3]}' \
+            -u "admin@admin.com:admin"
+        '''
+    
     @action(detail=False, methods=['get'], url_path='get_by_id/(?P<pk>[^/.]+)')
+    @em_cache(lambda request, pk: tags_objeto('Versiculo', pk))
     def get_by_id(self, request, pk=None):
         '''
         Ação personalizada para recuperar Versiculo por ID
         '''
 
         # Busca o Versiculo por ID ou código
-        instance = get_object_or_404(Versiculo, pk=pk)
-        serializer = self.get_serializer(instance)
+        instance = get_object_or_404(VersiculoValoresSerializer.valores(Versiculo.objects.all()), pk=pk)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = VersiculoValoresSerializer(instance)
 
         return Response(serializer.data)  # Retorna os dados do usuário encontrado
     
@@ -129,20 +252,53 @@ class VersiculoViewSet(viewsets.ModelViewSet):
             -u "admin@admin.com:admin"
         '''
     
+    @action(detail=False, methods=['get'],
+            url_path='get_by_key/(?P<versao>[^/]+)/(?P<livro>[^/.]+)/(?P<capitulo>[0-9]{1,3})/(?P<numero>[0-9]{1,3})')
+    @em_cache(lambda request, versao, livro, capitulo, numero: tags_chave(versao, livro, capitulo, numero))
+    def get_by_key(self, request, versao=None, livro=None, capitulo=None, numero=None):
+        '''
+        Ação personalizada para recuperar Versiculo pela chave natural (versão, livro, capítulo, número)
+        '''
+
+        try:
+            referencia = Versiculo.chave(codigo_livro(livro), int(capitulo), int(numero))
+        except ReferenciaInvalida:
+            raise Http404
+
+        # Uma consulta: Biblia pela restrição única de `versao`, versículo pelo índice parcial (biblia, referencia)
+        instance = get_object_or_404(VersiculoValoresSerializer.valores(self.queryset), biblia__versao=versao, referencia=referencia)
+        self.validar_registros([instance])  # Responde 304 antes da serialização se o cliente já tem esta versão
+        serializer = VersiculoValoresSerializer(instance)
+
+        return Response(serializer.data)
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/versicle/get_by_key/Almeida/GN/1/1/ \
+            -u "admin@admin.com:admin"
+
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/Almeida/GN/1/1/ \
+            -u "admin@admin.com:admin"
+        '''
+
     @action(detail=False, methods=['get'], url_path='list_active')
+    @em_cache(lambda request: tags_lista('Versiculo'))
     def list_active(self, request):
         '''
         Ação personalizada para listar usuários ativos
         '''
 
-        queryset = Versiculo.all_objects.filter(is_active=True)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = Versiculo.objects.all()  # Registros vivos: mesmo predicado dos índices parciais
+        page = self.paginate_queryset(VersiculoValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = VersiculoValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/versicle/list_active/ \
             -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/list_active/?page_size=500&cursor=WzEsIDUwMCwgNTAwXQ==" \
+            -u "admin@admin.com:admin"
         '''
 
     @action(detail=False, methods=['get'], url_path='list_inactive')
@@ -152,9 +308,10 @@ class VersiculoViewSet(viewsets.ModelViewSet):
         '''
 
         queryset = Versiculo.all_objects.filter(is_active=False)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(VersiculoValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = VersiculoValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/bible/versicle/list_inactive/ \
@@ -162,29 +319,34 @@ class VersiculoViewSet(viewsets.ModelViewSet):
         '''
 
     @action(detail=False, methods=['get'], url_path='search')
+    @em_cache(lambda request: tags_lista('Versiculo', request.query_params, [('capitulo', 'Capitulo'), ('biblia', 'Biblia')]))
     def search(self, request):
         '''
         Ação personalizada para buscar registros da Bíblia com parâmetros específicos.
         '''
 
         query_params = request.query_params
-        queryset = self.queryset
-
-        # Aplica filtros baseados nos parâmetros da consulta
-        for param, value in query_params.items():
-            if param == 'capitulo':
-                # Filtro para o campo `capitulo` (relacionamento com o modelo Capitulo)
-                queryset = queryset.filter(capitulo__id=value)
-            elif param == 'numero':
-                # Filtro para o campo `numero` (número do versículo)
-                queryset = queryset.filter(numero=value)
-            elif param == 'versiculo':
-                # Filtro para o campo `versiculo` (conteúdo do versículo)
-                queryset = queryset.filter(versiculo__icontains=value)  # Uso de `icontains` para correspondência parcial
+
+        invalido = parametro_invalido(query_params)
+        if invalido:
+            return Response({'detail': f'O parâmetro `{invalido}` deve ser um número inteiro.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = filtrar_versiculos(self.queryset, query_params)  # Aplica filtros baseados nos parâmetros da consulta
+
+        # Busca textual ranqueada (índice GIN sobre `search_vector`), limitada ao top-k
+        termo = query_params.get('q')
+        if termo:
+            linguas = query_params.getlist('lingua') or None
+            resultados = list(VersiculoBuscaValoresSerializer.valores(
+                buscar_versiculos(queryset, termo, linguas, limite_top_k(query_params.get('limite')))))
+            self.validar_registros(resultados, datado=False)
+            serializer = VersiculoBuscaValoresSerializer(resultados, many=True)
+            return Response(serializer.data)
 
         # Serializa a lista de resultados encontrados
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(VersiculoValoresSerializer.valores(queryset, *self.ordering))
+        serializer = VersiculoValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
+        return self.get_paginated_response(serializer.data)
     
         '''
         curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/search/?capitulo=1" -u "admin@admin.com:admin"
@@ -194,4 +356,165 @@ class VersiculoViewSet(viewsets.ModelViewSet):
         curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/search/?versiculo=João" -u "admin@admin.com:admin"
 
         curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/search/?capitulo=1&versiculo=E disse Deus: Haja luz; e houve luz." -u "admin@admin.com:admin"
-        '''
\ No newline at end of file
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/search/?q=haja luz&lingua=PT&limite=10" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/search/?q=criacao&biblia=1" -u "admin@admin.com:admin"
+        '''
+
+    @action(detail=False, methods=['get'], url_path='range')
+    @em_cache(lambda request: tags_lista('Versiculo', request.query_params, [('biblia', 'Biblia')]))
+    def range(self, request):
+        '''
+        Ação personalizada para ler um intervalo de referências, inclusive entre capítulos
+        '''
+
+        biblia = request.query_params.get('biblia')
+        referencia = request.query_params.get('ref')
+
+        if not biblia or not biblia.isdigit() or not referencia:
+            return Response({'detail': 'Informe os parâmetros `biblia` e `ref`.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            inicio, fim = interpretar_referencia(referencia)
+        except ReferenciaInvalida as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Formato compacto [[livro, capitulo, numero, texto], ...]: do corpus em memória ou do snapshot, se disponíveis
+        if request.query_params.get('compacto') in ('1', 'true', 'True'):
+            return self.range_compacto(biblia, referencia, inicio, fim)
+
+        # Paginado pela referência: cada página é uma faixa do índice parcial (biblia, referencia), qualquer que seja o intervalo.
+        # Somente capítulos e livros vivos, como no formato compacto, nas exportações e no corpus.
+        self.ordering = ORDENACAO_INTERVALO
+        queryset = (self.queryset
+            .filter(biblia_id=biblia, referencia__range=(inicio, fim))
+            .filter(capitulo__is_active=True, capitulo__deleted_at__isnull=True,
+                    capitulo__livro__is_active=True, capitulo__livro__deleted_at__isnull=True))
+        page = self.paginate_queryset(VersiculoValoresSerializer.valores(queryset, *self.ordering))  # Página atual, a partir do cursor informado
+        serializer = VersiculoValoresSerializer(page, many=True)  # Mesma saída do serializer padrão, sem instâncias
+
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
+
+        '''  # Shell
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/range/?biblia=1&ref=GN 1:1-31" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/range/?biblia=1&ref=JO 3:16-4:2" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/range/?biblia=1&ref=GN 1-50&page_size=500" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/range/?biblia=1&ref=SL 23&compacto=1" -u "admin@admin.com:admin"
+        '''
+
+    def range_compacto(self, biblia, referencia, inicio, fim):
+        '''
+        Intervalo no formato compacto, lido do corpus em memória, do snapshot publicado ou do banco,
+        com no máximo MAXIMO_VERSICULOS_COMPACTO versículos (400 acima disso)
+        '''
+
+        indice = indice_versao(biblia_id=biblia)
+        if indice is not None:
+            linhas = list(islice(indice.intervalo(inicio, fim), MAXIMO_VERSICULOS_COMPACTO + 1))
+            if len(linhas) > MAXIMO_VERSICULOS_COMPACTO:
+                return self.compacto_excedido()
+            self.validar(indice.gerado_em, len(linhas), indice.hash)
+        else:
+            versiculos = (self.queryset
+                .filter(biblia_id=biblia, referencia__range=(inicio, fim))
+                .filter(capitulo__is_active=True, capitulo__deleted_at__isnull=True,
+                        capitulo__livro__is_active=True, capitulo__livro__deleted_at__isnull=True)
+                .order_by('referencia'))
+            # A exclusão lógica de um capítulo ou livro também muda o resultado
+            self.validar_escopo(Versiculo.all_objects.filter(biblia_id=biblia, referencia__range=(inicio, fim)),
+                                Capitulo.all_objects.filter(livro__biblia_id=biblia),
+                                Livro.all_objects.filter(biblia_id=biblia))
+            linhas = list(versiculos.values_list('referencia', 'versiculo')[:MAXIMO_VERSICULOS_COMPACTO + 1])
+            if len(linhas) > MAXIMO_VERSICULOS_COMPACTO:
+                return self.compacto_excedido()
+
+        return Response({
+            'biblia': int(biblia),
+            'ref': referencia,
+            'versiculos': [[*decompor_chave(chave), texto] for chave, texto in linhas],
+        })
+
+    def compacto_excedido(self):
+        return Response({'detail': f'O formato compacto aceita no máximo {MAXIMO_VERSICULOS_COMPACTO} versículos; '
+                                   'leia intervalos maiores sem `compacto`, em páginas.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=['get'], url_path='compare')
+    @em_cache(lambda request: tags_versoes(versoes_comparacao(request.query_params)))
+    def compare(self, request):
+        '''
+        Ação personalizada para ler o mesmo trecho em várias versões, com os versículos alinhados pela
+        referência (livro, capítulo, número); o versículo ausente em uma versão vem como nulo
+        '''
+
+        versoes = versoes_comparacao(request.query_params)
+        referencia = request.query_params.get('ref')
+
+        if not versoes or not referencia:
+            return Response({'detail': 'Informe os parâmetros `versoes` e `ref`.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(versoes) > MAXIMO_VERSOES_COMPARACAO:
+            return Response({'detail': f'Compare no máximo {MAXIMO_VERSOES_COMPARACAO} versões por requisição.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            inicio, fim = interpretar_referencia(referencia)
+        except ReferenciaInvalida as erro:
+            return Response({'detail': str(erro)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Todas as versões no corpus em memória (ou publicadas): nenhuma consulta ao banco
+        indices = [indice_versao(versao=versao) for versao in versoes]
+        if all(indice is not None for indice in indices):
+            textos = {versao: dict(indice.intervalo(inicio, fim)) for versao, indice in zip(versoes, indices)}
+            self.validar(max((indice.gerado_em for indice in indices if indice.gerado_em), default=None),
+                         sum(len(linhas) for linhas in textos.values()), [indice.hash for indice in indices])
+        else:
+            textos = self.textos_comparacao(versoes, inicio, fim)
+
+        # Alinhamento pela chave canônica: a união das referências de todas as versões, em ordem
+        referencias = sorted(set().union(*textos.values()))
+
+        return Response({
+            'ref': referencia,
+            'versoes': versoes,
+            'versiculos': [[*decompor_chave(chave), [textos[versao].get(chave) for versao in versoes]]
+                           for chave in referencias],
+        })
+
+        '''  # Shell
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/compare/?versoes=Almeida,KJV&ref=JO 3:16-18" -u "admin@admin.com:admin"
+
+        curl -X GET "http://127.0.0.1:8000/api/v1/bible/versicle/compare/?versoes=Almeida&versoes=KJV&ref=SL 23" -u "admin@admin.com:admin"
+        '''
+
+    def textos_comparacao(self, versoes, inicio, fim):
+        '''
+        Textos do trecho em cada versão, {versao: {referencia: texto}}, lidos do banco em uma única
+        consulta para todas as versões (a quantidade de versões não muda o número de consultas)
+        '''
+
+        ids = dict(Biblia.objects.filter(versao__in=versoes).values_list('pk', 'versao'))
+
+        ausentes = set(versoes) - set(ids.values())
+        if ausentes:
+            raise NotFound(f'Versões não encontradas: {", ".join(sorted(ausentes))}.')
+
+        # Índice parcial (biblia, referencia) dos registros vivos, um intervalo por versão
+        linhas = list(self.queryset
+            .filter(biblia_id__in=ids, referencia__range=(inicio, fim))
+            .filter(capitulo__is_active=True, capitulo__deleted_at__isnull=True,
+                    capitulo__livro__is_active=True, capitulo__livro__deleted_at__isnull=True)
+            .values_list('pk', 'updated_at', 'biblia_id', 'referencia', 'versiculo'))
+
+        # Validadores pelas linhas lidas: os ids cobrem versículos que saíram ou voltaram ao trecho
+        self.validar(max((linha[1] for linha in linhas), default=None), len(linhas), sorted(linha[0] for linha in linhas),
+                     datado=False)
+
+        textos = {versao: {} for versao in versoes}
+        for _, _, biblia_id, chave, texto in linhas:
+            textos[ids[biblia_id]][chave] = texto
+
+        return textos
@@ -0,0 +1,42 @@
+import multiprocessing
+import os
+
+# Configuração do gunicorn para produção (scripts/runserver.sh com APP_ENV=prod), lida
+# automaticamente quando o gunicorn é iniciado neste diretório. Os valores podem ser ajustados
+# pelas variáveis GUNICORN_* dos dotenv_files; vazias, valem os padrões abaixo.
+
+
+def variavel(nome, padrao):
+    return os.getenv(nome) or padrao
+
+
+# Aplicação WSGI; para as leituras assíncronas, `api_freebible.asgi:application` com
+# GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker
+wsgi_app = variavel('GUNICORN_APP', 'api_freebible.wsgi:application')
+worker_class = variavel('GUNICORN_WORKER_CLASS', 'sync')
+
+bind = variavel('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Workers pela quantidade de CPUs: (2 x CPUs) + 1, a recomendação do gunicorn para workers síncronos
+workers = int(variavel('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(variavel('GUNICORN_THREADS', 1))
+
+# A aplicação (e o corpus em memória, ver api_freebible/wsgi.py) é carregada no processo mestre
+# antes do fork: os workers compartilham essas páginas por cópia-na-escrita
+preload_app = True
+
+# Reciclagem dos workers após N requisições (com variação aleatória, para não reiniciarem juntos):
+# limita o crescimento de memória, e o substituto nasce do mestre já carregado
+max_requests = int(variavel('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(variavel('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# Requisição mais longa permitida e prazo para o worker terminar as requisições em curso ao
+# reiniciar (HUP, reciclagem) ou encerrar (TERM)
+timeout = int(variavel('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(variavel('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(variavel('GUNICORN_KEEPALIVE', 5))
+
+# Logs na saída padrão do contêiner
+accesslog = variavel('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = variavel('GUNICORN_LOGLEVEL', 'info')
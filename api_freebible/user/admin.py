@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import CustomUser
+from .models import ApiToken, CustomUser
 
 @admin.register(CustomUser)
 class CustomUserAdmin(BaseUserAdmin):
@@ -36,4 +36,24 @@ class CustomUserAdmin(BaseUserAdmin):
         }),
     )
     
-    filter_horizontal = ()
\ No newline at end of file
+    filter_horizontal = ()
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+
+    # Campos exibidos na lista de tokens (o usuário vem na mesma consulta)
+    list_display = ('id', 'prefixo', 'nome', 'usuario', 'expira_em', 'ultimo_uso', 'is_active')
+    list_select_related = ('usuario',)
+
+    # Campos utilizados para pesquisa no painel administrativo
+    search_fields = ('prefixo', 'nome', 'usuario__email')
+
+    # Filtros disponíveis para filtrar tokens na lista
+    list_filter = ('is_active',)
+
+    # A chave não é guardada; revogar é desmarcar "Is Active"
+    fields = ('usuario', 'nome', 'prefixo', 'expira_em', 'ultimo_uso', 'is_active')
+    readonly_fields = ('usuario', 'prefixo', 'ultimo_uso')
+
+    def has_add_permission(self, request):
+        return False  # Emissão pela API (api_token/create), que exibe a chave uma única vez
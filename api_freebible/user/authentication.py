@@ -0,0 +1,191 @@
+import hmac
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from user.models import ApiToken, CustomUser
+
+# Verificação dos tokens de API em três camadas, da mais barata à mais cara:
+#
+#     memória do processo    dicionário {SHA-256 da chave: entrada}, sem ida à rede
+#     cache compartilhado    a mesma entrada para os demais workers (file/redis; locmem é por processo)
+#     banco                  busca pelo prefixo (índice único) e comparação do SHA-256
+#
+# A entrada guarda apenas o id e os campos do usuário usados nas permissões (nunca o hash da senha);
+# o usuário da requisição é montado a partir deles, com os demais campos carregados sob demanda, então
+# uma requisição autenticada por token em memória não faz consulta nem cálculo de hash de senha. Cada
+# entrada vale por TOKEN_CACHE_TIMEOUT segundos nas duas camadas de cache. A revogação usa uma geração única no cache compartilhado
+# (como as tags de bible/cache.py): qualquer alteração em um token ou usuário existente troca a
+# geração após o commit, e entradas de outra geração são ignoradas. Cada processo confere a geração
+# a cada TOKEN_VERIFICACAO segundos (o próprio processo da revogação, na hora), então um token
+# revogado deixa de valer em todos os workers dentro desse intervalo.
+
+CHAVE_GERACAO = 'user:tokens:geracao'
+
+_estado = {'geracao': None, 'verificado': 0.0}
+_verificados = {}  # {digest: (geração, campos do usuário, expira_em, prefixo, válida até)}
+
+# Campos do usuário guardados nas entradas, na ordem dos campos do modelo (exigida por `from_db`)
+CAMPOS_USUARIO = [campo.attname for campo in CustomUser._meta.concrete_fields
+                  if campo.attname in {'id', 'email', 'nome', 'is_active', 'is_staff', 'is_superuser', 'deleted_at'}]
+_trava = threading.Lock()
+
+
+def chave_cache(digest):
+    return 'user:token:' + digest
+
+
+def geracao_atual():
+    '''
+    Geração atual no cache compartilhado, criando-a se ainda não existe
+    '''
+
+    geracao = cache.get(CHAVE_GERACAO)
+    if geracao is None:
+        # `add` não sobrescreve uma geração criada por outro processo nesse meio tempo
+        cache.add(CHAVE_GERACAO, uuid.uuid4().hex, timeout=None)
+        geracao = cache.get(CHAVE_GERACAO)
+
+    return geracao
+
+
+def geracao_local():
+    '''
+    Geração conhecida pelo processo, conferida no cache compartilhado passado o intervalo de
+    verificação; quando muda, as verificações guardadas em memória são descartadas
+    '''
+
+    agora = time.monotonic()
+    if _estado['geracao'] is None or agora - _estado['verificado'] >= settings.TOKEN_VERIFICACAO:
+        geracao = geracao_atual()
+        with _trava:
+            if geracao != _estado['geracao']:
+                _verificados.clear()
+            _estado.update(geracao=geracao, verificado=agora)
+
+    return _estado['geracao']
+
+
+def invalidar():
+    '''
+    Troca a geração após o commit (antes dele, uma verificação concorrente guardaria o estado antigo)
+    e descarta as verificações deste processo
+    '''
+
+    def aplicar():
+        cache.set(CHAVE_GERACAO, uuid.uuid4().hex, timeout=None)
+        with _trava:
+            _verificados.clear()
+            _estado['verificado'] = 0.0  # A próxima verificação relê a geração nova
+
+    transaction.on_commit(aplicar)
+
+
+def consultar(chave, digest, geracao):
+    '''
+    Verificação pelo banco: entrada para o cache, ou None se o token não existe, foi revogado,
+    expirou ou pertence a um usuário inativo
+    '''
+
+    prefixo = ApiToken.separar(chave)
+    if prefixo is None:
+        return None
+
+    token = ApiToken.objects.select_related('usuario').filter(prefixo=prefixo).first()
+    if token is None or not hmac.compare_digest(token.digest, digest) or token.expirado():
+        return None
+
+    usuario = token.usuario
+    if not usuario.is_active or usuario.deleted_at is not None:
+        return None
+
+    # Último uso registrado apenas nas verificações pelo banco (no máximo uma vez por validade do cache)
+    ApiToken.all_objects.filter(pk=token.pk).update(ultimo_uso=timezone.now())
+
+    campos = tuple(getattr(usuario, campo) for campo in CAMPOS_USUARIO)
+    return (geracao, campos, token.expira_em, prefixo, time.time() + settings.TOKEN_CACHE_TIMEOUT)
+
+
+def usuario_entrada(campos):
+    '''
+    Usuário da requisição a partir dos campos da entrada, como se lido do banco com `only()`: os
+    demais campos (senha, datas) são carregados apenas se acessados
+    '''
+
+    return CustomUser.from_db(DEFAULT_DB_ALIAS, CAMPOS_USUARIO, campos)
+
+
+def guardar(digest, entrada):
+    with _trava:
+        if len(_verificados) >= settings.TOKEN_CACHE_MAXIMO:
+            _verificados.pop(next(iter(_verificados)))  # Descarta a verificação mais antiga
+        _verificados[digest] = entrada
+
+
+def vigente(entrada, geracao):
+    return entrada is not None and entrada[0] == geracao and entrada[4] > time.time()
+
+
+def verificar(chave):
+    '''
+    (usuário, prefixo) do token, ou None se inválido. O usuário é montado a cada requisição a partir
+    dos campos da entrada em cache, que é compartilhada pelas requisições simultâneas do processo.
+    '''
+
+    digest = ApiToken.resumo(chave)
+    geracao = geracao_local()
+
+    entrada = _verificados.get(digest)
+    if not vigente(entrada, geracao):
+        entrada = cache.get(chave_cache(digest))
+        if not vigente(entrada, geracao):
+            entrada = consultar(chave, digest, geracao)
+            if entrada is None:
+                return None
+            cache.set(chave_cache(digest), entrada, timeout=settings.TOKEN_CACHE_TIMEOUT)
+        guardar(digest, entrada)
+
+    _, campos, expira_em, prefixo, _ = entrada
+    if expira_em is not None and expira_em <= timezone.now():
+        return None
+
+    return usuario_entrada(campos), prefixo
+
+
+class ApiTokenAuthentication(BaseAuthentication):
+    '''
+    Autenticação pelo cabeçalho `Authorization: Bearer <chave>` com um token emitido em
+    /api/v1/user/api_token/create/. `request.auth` recebe o prefixo do token.
+    '''
+
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        partes = get_authorization_header(request).split()
+        if not partes or partes[0].lower() != self.keyword.lower().encode():
+            return None  # Outro esquema (Basic, sessão): fica com as demais classes
+
+        if len(partes) != 2:
+            raise exceptions.AuthenticationFailed('Cabeçalho Bearer inválido: informe apenas o token.')
+
+        try:
+            chave = partes[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Cabeçalho Bearer inválido: o token contém caracteres inválidos.')
+
+        verificado = verificar(chave)
+        if verificado is None:
+            raise exceptions.AuthenticationFailed('Token inválido, revogado ou expirado.')
+
+        return verificado
+
+    def authenticate_header(self, request):
+        return f'{self.keyword} realm="api"'
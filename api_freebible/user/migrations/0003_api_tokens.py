@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0002_partial_live_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('deleted_at', models.DateTimeField(blank=True, null=True, verbose_name='Deleted At')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Is Active')),
+                ('nome', models.CharField(blank=True, max_length=100, verbose_name='Nome')),
+                ('prefixo', models.CharField(editable=False, max_length=16, unique=True, verbose_name='Prefixo')),
+                ('digest', models.CharField(editable=False, max_length=64, verbose_name='SHA-256 da chave')),
+                ('expira_em', models.DateTimeField(blank=True, null=True, verbose_name='Expira em')),
+                ('ultimo_uso', models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Último uso')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tokens', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('deleted_at__isnull', True), ('is_active', True)), fields=['usuario', 'id'], name='apitoken_vivo_usuario_idx')],
+            },
+        ),
+    ]
@@ -1,15 +1,28 @@
+import hashlib
+import secrets
 import uuid
+from datetime import timedelta
+
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from django.contrib.auth.models import BaseUserManager, AbstractBaseUser, PermissionsMixin
 
+# Predicado dos registros vivos: usado pelo BaseManager e como condição dos índices parciais,
+# que só são aproveitados pelo planejador quando a consulta repete exatamente estas condições
+VIVOS = models.Q(deleted_at__isnull=True, is_active=True)
+
 class BaseModelQuerySet(models.QuerySet):
     def delete(self):
-        self.update(deleted_at=timezone.now(), is_active=False)
+        pks = list(self.values_list('pk', flat=True))
+        agora = timezone.now()
+        self.model.all_objects.filter(pk__in=pks).update(deleted_at=agora, is_active=False, updated_at=agora)
+        self.model.apos_exclusao_em_lote(pks)
 
 class BaseManager(models.Manager):
     def get_queryset(self):
-        return BaseModelQuerySet(self.model, using=self._db).filter(deleted_at__isnull=True, is_active=True)
+        return BaseModelQuerySet(self.model, using=self._db).filter(VIVOS)
 
 class BaseModel(models.Model):
     created_at = models.DateTimeField('Created At', auto_now_add=True)
@@ -33,6 +46,13 @@ class BaseModel(models.Model):
         self.is_active = True
         self.save()
 
+    @classmethod
+    def apos_exclusao_em_lote(cls, pks):
+        '''
+        Chamado após a exclusão lógica em lote (BaseModelQuerySet.delete), que não passa por `save()`
+        '''
+        pass
+
     class Meta:
         abstract = True
 
@@ -74,5 +94,123 @@ class CustomUser(AbstractBaseUser, PermissionsMixin, BaseModel):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            # Índice parcial dos usuários vivos, na ordenação da paginação por cursor (list_active)
+            models.Index(fields=['id'], condition=VIVOS, name='user_vivo_id_idx'),
+        ]
+
+    # Campos que afetam as verificações de token em cache (user.authentication): só a mudança deles
+    # invalida as verificações, e não o registro do último login, por exemplo
+    CAMPOS_TOKEN = ('password', 'email', 'is_active', 'is_staff', 'is_superuser', 'deleted_at')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        usuario = super().from_db(db, field_names, values)
+        usuario._valores_token = usuario.valores_token()
+        return usuario
+
+    def valores_token(self):
+        # Campos adiados (only/defer) ficam de fora: não são gravados sem terem sido lidos
+        return {campo: self.__dict__[campo] for campo in self.CAMPOS_TOKEN if campo in self.__dict__}
+
+    def save(self, *args, **kwargs):
+        existente = self.pk is not None
+        anteriores = getattr(self, '_valores_token', None)
+        super().save(*args, **kwargs)
+        self._valores_token = self.valores_token()
+
+        # Desativação, exclusão ou mudança de senha e de permissões valem também para as verificações
+        # de token em cache; sem o estado lido do banco, invalida por precaução
+        if existente and (anteriores is None or anteriores != self._valores_token):
+            invalidar_tokens()
+
+    @classmethod
+    def apos_exclusao_em_lote(cls, pks):
+        invalidar_tokens()
+
+    def __str__(self):
+        return self.email
+
+class ApiToken(BaseModel):
+    '''
+    Token de acesso à API de um usuário (user.authentication.ApiTokenAuthentication).
+
+    A chave completa (`fb_<prefixo>_<segredo>`) só é exibida na emissão; o banco guarda o prefixo,
+    usado na busca, e o SHA-256 da chave. Com 256 bits aleatórios, um hash rápido basta: não há
+    senha a proteger de ataques de dicionário, e a verificação não paga o custo do PBKDF2.
+    A revogação é a exclusão lógica.
+    '''
+
+    usuario = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='tokens', verbose_name='Usuário')
+    nome = models.CharField('Nome', max_length=100, blank=True)
+    prefixo = models.CharField('Prefixo', max_length=16, unique=True, editable=False)
+    digest = models.CharField('SHA-256 da chave', max_length=64, editable=False)
+    expira_em = models.DateTimeField('Expira em', null=True, blank=True)
+    ultimo_uso = models.DateTimeField('Último uso', null=True, blank=True, editable=False)
+
+    PREFIXO_CHAVE = 'fb_'
+
+    class Meta:
+        indexes = [
+            # Índice parcial dos tokens vivos de cada usuário, na ordenação da paginação por cursor (list_active)
+            models.Index(fields=['usuario', 'id'], condition=VIVOS, name='apitoken_vivo_usuario_idx'),
+        ]
+
+    @staticmethod
+    def resumo(chave):
+        return hashlib.sha256(chave.encode()).hexdigest()
+
+    @classmethod
+    def separar(cls, chave):
+        '''
+        Prefixo de uma chave no formato `fb_<prefixo>_<segredo>`; None se o formato não confere
+        '''
+
+        if not chave.startswith(cls.PREFIXO_CHAVE):
+            return None
+        prefixo, separador, segredo = chave[len(cls.PREFIXO_CHAVE):].partition('_')
+        return prefixo if separador and prefixo and segredo else None
+
+    @classmethod
+    def emitir(cls, usuario, nome='', validade_dias=None):
+        '''
+        Cria um token para o usuário e retorna (token, chave); a chave não pode ser recuperada depois
+        '''
+
+        prefixo = secrets.token_hex(6)
+        chave = f'{cls.PREFIXO_CHAVE}{prefixo}_{secrets.token_urlsafe(32)}'
+        expira_em = timezone.now() + timedelta(days=validade_dias) if validade_dias else None
+
+        token = cls.objects.create(usuario=usuario, nome=nome, prefixo=prefixo, digest=cls.resumo(chave), expira_em=expira_em)
+        return token, chave
+
+    def expirado(self, agora=None):
+        return self.expira_em is not None and self.expira_em <= (agora or timezone.now())
+
+    def save(self, *args, **kwargs):
+        existente = self.pk is not None
+        super().save(*args, **kwargs)
+
+        # Revogação (soft_delete), recuperação ou nova validade; um token novo ainda não está em cache
+        if existente:
+            invalidar_tokens()
+
+    @classmethod
+    def apos_exclusao_em_lote(cls, pks):
+        invalidar_tokens()
+
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return f'{self.PREFIXO_CHAVE}{self.prefixo}… ({self.usuario_id})'
+
+def invalidar_tokens():
+    # Importação tardia: user.authentication depende dos modelos
+    from user.authentication import invalidar
+
+    invalidar()
+
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=ApiToken)
+def apos_exclusao_definitiva(sender, **kwargs):
+    # Exclusões definitivas (delete, hard_delete, cascata e querysets de all_objects) não passam por save()
+    invalidar_tokens()
\ No newline at end of file
@@ -1,5 +1,7 @@
+from django.conf import settings
+
 from rest_framework import serializers
-from .models import CustomUser
+from .models import ApiToken, CustomUser
 
 # Serializer base para CustomUser
 class CustomUserSerializer(serializers.ModelSerializer):
@@ -63,4 +65,37 @@ class CustomUserUpdateByIDSerializer(serializers.ModelSerializer):
         if password:
             instance.set_password(password)
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+# Serializer dos tokens de API (sem a chave, que só é exibida na emissão)
+class ApiTokenSerializer(serializers.ModelSerializer):
+    """
+    Serializer para listagem dos tokens de API de um usuário.
+    """
+
+    class Meta:
+        model = ApiToken
+        fields = (
+            'id',                # ID do token
+            'nome',              # Nome dado pelo usuário (ex.: aplicação que usa o token)
+            'prefixo',           # Prefixo público, que identifica o token sem revelar a chave
+            'usuario',           # ID do usuário dono do token
+            'expira_em',         # Data de expiração (nula: sem expiração)
+            'ultimo_uso',        # Última verificação pelo banco (atualizada a cada expiração do cache)
+            'created_at',        # Data de emissão
+            'is_active'          # Falso após a revogação
+        )
+
+# Serializer para emissão de um token de API
+class ApiTokenCreateSerializer(serializers.Serializer):
+    """
+    Serializer para emissão de um token de API do usuário autenticado.
+    """
+
+    nome = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    validade_dias = serializers.IntegerField(min_value=0, max_value=3650, required=False)
+
+    def create(self, validated_data):
+        validade_dias = validated_data.get('validade_dias', settings.TOKEN_VALIDADE_DIAS)
+        token, chave = ApiToken.emitir(self.context['request'].user, validated_data['nome'], validade_dias)
+        return {**ApiTokenSerializer(token).data, 'token': chave}
@@ -1,4 +1,4 @@
-from .views import CustomUserViewSet
+from .views import ApiTokenViewSet, CustomUserViewSet
 from rest_framework.routers import DefaultRouter
 
 router_user = DefaultRouter()
@@ -6,4 +6,7 @@ router_user = DefaultRouter()
 # Registrando o CustomUserViewSet no roteador
 router_user.register('custom_user', CustomUserViewSet)
 
+# Registrando o ApiTokenViewSet (emissão, listagem e revogação dos tokens de API)
+router_user.register('api_token', ApiTokenViewSet)
+
 urlpatterns = router_user.urls
\ No newline at end of file
@@ -4,8 +4,10 @@ from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-from .models import CustomUser
-from .serializers import (CustomUserSerializer,
+from .models import VIVOS, ApiToken, CustomUser
+from .serializers import (ApiTokenSerializer,
+                          ApiTokenCreateSerializer,
+                          CustomUserSerializer,
                           CustomUserCreateWithIDSerializer,
                           CustomUserUpdateByIDSerializer)
 
@@ -17,6 +19,9 @@ class CustomUserViewSet(viewsets.ModelViewSet):
     queryset = CustomUser.objects.all()
     serializer_class = CustomUserSerializer
 
+    # Ordenação indexada e única usada pela paginação por cursor (keyset)
+    ordering = ('id',)
+
     def get_serializer_class(self):
         '''
         Método que seleciona o serializer correto dependendo da ação
@@ -135,10 +140,11 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         Ação personalizada para listar usuários ativos
         '''
 
-        queryset = CustomUser.all_objects.filter(is_active=True)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        queryset = CustomUser.all_objects.filter(VIVOS)  # Registros vivos: mesmo predicado do índice parcial
+        page = self.paginate_queryset(queryset)  # Página atual, a partir do cursor informado
+        serializer = self.get_serializer(page, many=True)
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/user/custom_user/list_active/ \
@@ -152,9 +158,10 @@ class CustomUserViewSet(viewsets.ModelViewSet):
         '''
 
         queryset = CustomUser.all_objects.filter(is_active=False)  # Filtra usuários pela condição de ativo/inativo
-        serializer = self.get_serializer(queryset, many=True)
+        page = self.paginate_queryset(queryset)  # Página atual, a partir do cursor informado
+        serializer = self.get_serializer(page, many=True)
 
-        return Response(serializer.data)  # Retorna a lista de usuários filtrados
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
     
         '''  # Shell
         curl -X GET http://127.0.0.1:8000/api/v1/user/custom_user/list_inactive/ \
@@ -184,10 +191,87 @@ class CustomUserViewSet(viewsets.ModelViewSet):
                     users = users.filter(**{f"{param}__icontains": value})
 
         # Serializa a lista de usuários encontrados
-        serializer = self.get_serializer(users, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(users)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
     
         '''  # Shell
         curl -X GET "http://127.0.0.1:8000/api/v1/user/custom_user/search/?is_active=True&name=João" \
             -u "admin@admin.com:admin"
-        '''
\ No newline at end of file
+        '''
+
+class ApiTokenViewSet(viewsets.GenericViewSet):
+
+    ## Operacional Methods para urls
+
+    # Tokens vivos; cada usuário enxerga apenas os seus (a equipe, todos)
+    queryset = ApiToken.objects.all()
+    serializer_class = ApiTokenSerializer
+
+    # Ordenação indexada e única usada pela paginação por cursor (keyset)
+    ordering = ('id',)
+
+    def get_queryset(self):
+        queryset = ApiToken.all_objects.filter(VIVOS)  # Mesmo predicado do índice parcial
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(usuario=self.request.user)
+        return queryset
+
+    ## Endpoints
+
+    @action(detail=False, methods=['post'], url_path='create')
+    def create_token(self, request):
+        '''
+        Ação personalizada para emitir um token de API do usuário autenticado. A chave só é exibida
+        nesta resposta; as requisições seguintes usam `Authorization: Bearer <token>`
+        '''
+
+        serializer = ApiTokenCreateSerializer(data=request.data, context=self.get_serializer_context())
+
+        if serializer.is_valid():
+            return Response(serializer.save(), status=status.HTTP_201_CREATED)  # Dados do token e a chave
+        else:
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)  # Retorna erros se inválido
+
+        '''  # Shell
+        curl -X POST http://127.0.0.1:8000/api/v1/user/api_token/create/ \
+            -d "nome=leitor" \
+            -d "validade_dias=30" \
+            -u "admin@admin.com:admin"
+
+        curl -X GET http://127.0.0.1:8000/api/v1/bible/versicle/get_by_id/1/ \
+            -H "Authorization: Bearer fb_..."
+        '''
+
+    @action(detail=False, methods=['get'], url_path='list_active')
+    def list_active(self, request):
+        '''
+        Ação personalizada para listar os tokens ativos
+        '''
+
+        page = self.paginate_queryset(self.get_queryset())  # Página atual, a partir do cursor informado
+        serializer = self.get_serializer(page, many=True)
+
+        return self.get_paginated_response(serializer.data)  # Retorna a página com o link para a próxima
+
+        '''  # Shell
+        curl -X GET http://127.0.0.1:8000/api/v1/user/api_token/list_active/ \
+            -H "Authorization: Bearer fb_..."
+        '''
+
+    @action(detail=False, methods=['delete'], url_path='revoke/(?P<pk>[^/.]+)')
+    def revoke(self, request, pk=None):
+        '''
+        Ação personalizada para revogar um token por ID; deixa de valer em todos os workers em até
+        TOKEN_VERIFICACAO segundos
+        '''
+
+        instance = get_object_or_404(self.get_queryset(), pk=pk)
+        instance.soft_delete()  # Revoga o token (exclusão lógica)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)  # Retorna resposta de sucesso
+
+        '''  # Shell
+        curl -X DELETE http://127.0.0.1:8000/api/v1/user/api_token/revoke/2/ \
+            -u "admin@admin.com:admin"
+        '''
@@ -12,9 +12,11 @@ collectstatic.sh
 # Executa as migrações do Django
 migrate.sh
 
-# Injeta os dados teste (OPCIONAL)
-python manage.py shell < /scripts/datas/bible.py
-python manage.py shell < /scripts/datas/user.py
+# Injeta os dados teste (OPCIONAL), apenas fora de produção
+if [ "$APP_ENV" != "prod" ]; then
+  python manage.py shell < /scripts/datas/bible.py
+  python manage.py shell < /scripts/datas/user.py
+fi
 
-# Inicia o servidor de desenvolvimento do Django
+# Inicia o servidor: gunicorn com APP_ENV=prod, servidor de desenvolvimento do Django nos demais casos
 runserver.sh
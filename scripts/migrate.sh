@@ -1,4 +1,5 @@
 #!/bin/sh
-makemigrations.sh
+# Em produção as migrações vêm do repositório; não são geradas na inicialização
+[ "$APP_ENV" = "prod" ] || makemigrations.sh
 echo 'Executando migrate.sh'
 python manage.py migrate --noinput
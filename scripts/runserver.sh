@@ -1,3 +1,11 @@
 #!/bin/sh
 . /venv/bin/activate
+cd /api_freebible
+
+# APP_ENV=prod: gunicorn com vários workers (configuração em api_freebible/gunicorn.conf.py);
+# demais valores: servidor de desenvolvimento, com recarga automática
+if [ "$APP_ENV" = "prod" ]; then
+  exec gunicorn --config /api_freebible/gunicorn.conf.py
+fi
+
 exec python /api_freebible/manage.py runserver 0.0.0.0:8000